@@ -0,0 +1,201 @@
+"""
+backend/algorithms/all_pairs.py
+All-pairs shortest paths: NumPy Floyd–Warshall or repeated Dijkstra.
+
+Floyd–Warshall runs on a dense matrix with blocked, in-place min-plus
+updates, so the O(V^3) work happens in C and mostly in cache.  For sparse
+graphs V heap Dijkstras (O(V E log V)) beat that, so ``method="auto"``
+picks by a rough cost model.  Both produce the ``distances`` / ``next``
+matrices that graph.js ``floydWarshall()`` returns: ``next[u][v]`` is the
+first hop from ``u`` towards ``v``.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from .checkpoint import checkpoint
+from .dijkstra import shortest_paths
+from .graph_core import as_csr
+
+METHODS = ("auto", "floyd-warshall", "dijkstra")
+
+# rough per-op costs (seconds): a numpy cell update (add + minimum) vs. one
+# python edge relaxation.  Only the ratio matters; auto picks the smaller total
+FW_CELL_COST = 1.5e-9
+DIJKSTRA_EDGE_COST = 1e-6
+
+FW_BLOCK = 64                 # pivots per block of the blocked Floyd-Warshall
+FW_CHUNK_BYTES = 256 * 1024   # rows updated together, sized to stay in L2
+
+
+def choose_method(graph) -> str:
+    n, m = len(graph), graph.num_edges
+    if len(graph.weights) and min(graph.weights) < 0:
+        return "floyd-warshall"  # dijkstra can't do negative weights
+    if n * (n + m) * DIJKSTRA_EDGE_COST < n ** 3 * FW_CELL_COST:
+        return "dijkstra"
+    return "floyd-warshall"
+
+
+def floyd_warshall_matrix(graph):
+    """
+    Return ``(dist, nxt)``: distances (inf = none), int32 hops (-1 = none).
+    Distances are float64, or float32 when every value the recurrence can
+    produce is an integer float32 holds exactly (see ``_matrix_dtype``).
+    """
+    n = len(graph)
+    offsets = np.asarray(graph.offsets)
+    dst = np.asarray(graph.targets, dtype=np.int32)
+    dtype = _matrix_dtype(graph)
+    w = np.asarray(graph.weights, dtype=dtype)
+
+    dist = np.full((n, n), np.inf, dtype=dtype)
+    src = np.repeat(np.arange(n, dtype=np.int32), np.diff(offsets))
+    dist[src, dst] = w  # the CSR has no parallel edges, so no duplicates to reduce
+    diag = np.arange(n)
+    dist[diag, diag] = np.minimum(dist[diag, diag], 0)
+
+    # blocked Floyd-Warshall: pivots go FW_BLOCK at a time.  Under the pivots
+    # of block K the rows and columns K only depend on each other, so they
+    # are brought up to date first; then the rows take all of K's pivots a
+    # chunk at a time, so the chunk and its scratch buffer stay in cache
+    # instead of streaming the whole matrix through memory once per pivot.
+    # Only the min-plus update runs here; tracking ``next`` in the same loop
+    # would double the memory traffic, so it is derived afterwards
+    chunk = max(1, FW_CHUNK_BYTES // (dist.itemsize * max(n, 1)))
+    alt = np.empty((chunk, n), dtype=dtype)
+    for lo in range(0, n, FW_BLOCK):
+        hi = min(lo + FW_BLOCK, n)
+        rows, cols = dist[lo:hi], dist[:, lo:hi]
+        for k in range(lo, hi):
+            checkpoint()
+            np.minimum(rows, rows[:, k, None] + dist[k], out=rows)
+            np.minimum(cols, dist[:, k, None] + cols[k], out=cols)
+        for top in range(0, n, chunk):
+            checkpoint()
+            part = dist[top:top + chunk]
+            scratch = alt[:len(part)]
+            # only pivots some row of the chunk reaches can improve it
+            for k in lo + np.flatnonzero(np.isfinite(part[:, lo:hi]).any(axis=0)):
+                np.add(part[:, k, None], dist[k], out=scratch)
+                np.minimum(part, scratch, out=part)
+
+    return dist, _next_hops(dist, offsets, dst, w)
+
+
+def _matrix_dtype(graph):
+    """
+    float32 when the weights are non-negative integers and any sum of two
+    paths stays below 2**24, so every distance (and every candidate the
+    update compares) is exact; float64 otherwise.  float32 halves the
+    memory traffic of the O(V^3) update.
+    """
+    weights = graph.weights
+    if weights.typecode != "q" or not len(weights):
+        return np.float64
+    if min(weights) >= 0 and 2 * max(len(graph) - 1, 1) * max(weights) < 2 ** 24:
+        return np.float32
+    return np.float64
+
+
+def _next_hops(dist, offsets, dst, w):
+    """
+    First hop ``u -> v``: the out-neighbour ``h`` minimising ``w(u, h) + dist[h, v]``.
+    One (degree x V) argmin per node, O(E V) in total.  (With zero-weight
+    cycles the chosen hops can go round the cycle; graph.js has the same
+    problem with its strict ``<``.)
+    """
+    n = len(dist)
+    nxt = np.full((n, n), -1, dtype=np.int32)
+    for u in range(n):
+        checkpoint()
+        lo, hi = offsets[u], offsets[u + 1]
+        if lo == hi:
+            continue
+        hops = dst[lo:hi]
+        cand = w[lo:hi, None] + dist[hops]
+        row = hops[np.argmin(cand, axis=0)]
+        row[~np.isfinite(dist[u])] = -1
+        nxt[u] = row
+    np.fill_diagonal(nxt, -1)
+    return nxt
+
+
+def dijkstra_matrix(graph):
+    """Same output as ``floyd_warshall_matrix``, via one heap Dijkstra per source."""
+    n = len(graph)
+    dist = np.full((n, n), np.inf, dtype=np.float64)
+    nxt = np.full((n, n), -1, dtype=np.int32)
+    for s in range(n):
+        checkpoint()
+        d, prev = shortest_paths(graph, s)
+        dist[s] = d
+        # first hop: children of s are their own hop, everything else inherits
+        # its parent's; resolve iteratively with memoisation
+        hop = [-1] * n
+        for t in range(n):
+            if prev[t] < 0 or hop[t] >= 0:
+                continue
+            chain = []
+            v = t
+            while hop[v] < 0 and prev[v] != s:
+                chain.append(v)
+                v = prev[v]
+            h = v if prev[v] == s else hop[v]
+            hop[v] = h
+            for c in chain:
+                hop[c] = h
+        nxt[s] = hop
+    return dist, nxt
+
+
+def all_pairs(graph, start=None, end=None, method: str = "auto", rows: bool = False):
+    """
+    Step generator for /api/run.  ``start`` / ``end`` are unused.
+
+    With ``rows`` each source's row is yielded as a step
+    (``{"c": u, "d": distances, "x": next hops}`` by node id) so big
+    matrices can be streamed, and the result only names the method.
+    Otherwise nothing is yielded and the result holds name-keyed
+    ``distances`` / ``next`` dicts like the Node server's.  Raises
+    ValueError here for an unknown method, or for ``method="dijkstra"`` on
+    a graph with negative weights.
+    """
+    graph = as_csr(graph)
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {', '.join(METHODS)}")
+    if method == "auto":
+        method = choose_method(graph)
+    elif method == "dijkstra" and len(graph.weights) and min(graph.weights) < 0:
+        raise ValueError("Dijkstra needs non-negative edge weights; use method 'floyd-warshall'")
+    return _all_pairs_steps(graph, method, rows)
+
+
+def _all_pairs_steps(graph, method, rows):
+    if method == "floyd-warshall":
+        dist, nxt = floyd_warshall_matrix(graph)
+    else:
+        dist, nxt = dijkstra_matrix(graph)
+
+    names = graph.names
+    integral = graph.weights.typecode == "q"
+
+    def row_lists(u):
+        d = [(int(x) if integral else x) if x != math.inf else None for x in dist[u].tolist()]
+        return d, nxt[u].tolist()
+
+    if rows:
+        for u in range(len(names)):
+            d, x = row_lists(u)
+            yield {"c": u, "d": d, "x": x}
+        return {"method": method, "nodeCount": len(names)}
+
+    distances, next_hop = {}, {}
+    for u, name in enumerate(names):
+        checkpoint()
+        d, x = row_lists(u)
+        distances[name] = dict(zip(names, d))
+        next_hop[name] = {names[v]: (names[h] if h >= 0 else None) for v, h in enumerate(x)}
+    return {"method": method, "distances": distances, "next": next_hop}
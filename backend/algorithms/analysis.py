@@ -0,0 +1,139 @@
+"""
+backend/algorithms/analysis.py
+Structural summary of a graph from a single depth-first sweep.
+
+One iterative Tarjan pass over the CSR arrays yields everything at once:
+
+    strong components  Tarjan's lowlinks, on explicit stacks (no recursion limit)
+    weak components    each DFS tree is weakly connected, so a union-find only
+                       has to merge trees joined by an edge between them
+    reachability       the sweep starts at ``start``, so the first DFS tree
+                       is exactly what ``start`` reaches
+    degree histograms  ``bincount`` over the CSR offsets and targets
+
+Every edge is looked at once and every stack push / pop is O(1), so the
+whole analysis is O(V + E) whatever the graph's depth or size.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from .graph_core import as_csr
+
+
+def degree_histograms(graph) -> dict:
+    """``{"out": [...], "in": [...]}``: entry ``d`` counts the nodes of degree ``d``."""
+    if not len(graph):
+        return {"out": [], "in": []}
+    out_degree = np.diff(np.asarray(graph.offsets))
+    in_degree = np.bincount(np.asarray(graph.targets), minlength=len(graph))
+    return {"out": np.bincount(out_degree).tolist(), "in": np.bincount(in_degree).tolist()}
+
+
+def analyze(graph, start=None, end=None):
+    """
+    Step generator: one trace delta per node as the sweep discovers it, then
+    returns ``{"weak", "strong", "reachable", "degrees"}``.  ``weak`` and
+    ``strong`` hold a component ``count`` and ``labels`` (``{name: index}``);
+    strong components are numbered in reverse topological order of the
+    condensation, weak ones by their lowest node id (``start``'s first).
+    ``reachable`` is ``{"count", "unreachable"}`` for ``start`` (``None``
+    without one).  ``end`` is unused.
+    """
+    graph = as_csr(graph)
+    s = graph.id_of(start) if start is not None else -1
+    return _analyze_steps(graph, s)
+
+
+def _analyze_steps(graph, s):
+    names = graph.names
+    n = len(graph)
+    # plain lists: this loop does a handful of indexed reads per edge, and
+    # list items are ready-made ints where array items get boxed on each read
+    offsets, targets = graph.offsets.tolist(), graph.targets.tolist()
+
+    order = [-1] * n       # discovery index, -1 = not seen yet
+    low = [0] * n
+    scc = [-1] * n         # strong component, -1 while still on the Tarjan stack
+    pos = offsets[:-1]     # next out-edge to scan per node
+    tree = [-1] * n        # DFS tree each node was discovered in
+    parent, rank = [], []  # union-find over the trees, for the weak components
+    tarjan, work = [], []
+    seen = count = 0
+    reached = None
+
+    def find(x: int) -> int:
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:  # path compression
+            parent[x], x = root, parent[x]
+        return root
+
+    roots = range(n) if s < 0 else [s, *range(n)]
+    for root in roots:
+        if order[root] >= 0:
+            continue
+        t, first = len(parent), seen  # this tree's id and first discovery index
+        parent.append(t)
+        rank.append(0)
+        tree[root] = t
+        order[root] = low[root] = seen
+        seen += 1
+        tarjan.append(root)
+        work.append(root)
+        yield {"c": root, "n": graph.neighbors(root)}
+
+        while work:
+            v = work[-1]
+            i = pos[v]
+            if i < offsets[v + 1]:
+                pos[v] = i + 1
+                w = targets[i]
+                if order[w] < 0:
+                    tree[w] = t
+                    order[w] = low[w] = seen
+                    seen += 1
+                    tarjan.append(w)
+                    work.append(w)
+                    yield {"c": w, "n": graph.neighbors(w)}
+                    continue
+                if scc[w] < 0 and order[w] < low[v]:  # w is still on the Tarjan stack
+                    low[v] = order[w]
+                elif order[w] < first:  # an edge back into an earlier tree
+                    ru, rw = find(t), find(tree[w])
+                    if ru != rw:  # union by rank
+                        if rank[ru] < rank[rw]:
+                            ru, rw = rw, ru
+                        parent[rw] = ru
+                        if rank[ru] == rank[rw]:
+                            rank[ru] += 1
+                continue
+
+            work.pop()  # all of v's edges are done
+            if work and low[v] < low[work[-1]]:
+                low[work[-1]] = low[v]
+            if low[v] == order[v]:  # v roots a strong component: pop it off
+                while True:
+                    u = tarjan.pop()
+                    scc[u] = count
+                    if u == v:
+                        break
+                count += 1
+
+        if root == s:
+            reached = seen  # the first tree holds exactly what start reaches
+
+    weak = {}
+    label = [weak.setdefault(find(t), len(weak)) for t in range(len(parent))]
+    weak_labels = [label[t] for t in tree]
+
+    return {
+        "weak": {"count": len(weak), "labels": dict(zip(names, weak_labels))},
+        "strong": {"count": count, "labels": dict(zip(names, scc))},
+        "reachable": None if s < 0 else {
+            "count": reached,
+            "unreachable": [names[v] for v in range(n) if order[v] >= reached],
+        },
+        "degrees": degree_histograms(graph),
+    }
@@ -0,0 +1,124 @@
+"""
+backend/algorithms/astar.py
+A* point-to-point search guided by node coordinates.
+
+The heuristic is ``scale * euclidean(v, end)`` with ``scale`` the smallest
+``weight / euclidean length`` over all edges, so no edge is ever "shorter"
+than the straight line it covers.  That makes the heuristic consistent for
+any weights, and on geometric graphs (weight ~ length) it is tight enough
+that the search expands a narrow band around the straight line instead of
+Dijkstra's whole ball.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+
+import numpy as np
+
+from .graph_core import as_csr, path_to
+
+
+def coordinates(graph, positions) -> tuple[list, list]:
+    """
+    ``(xs, ys)`` lists by node id from ``{name: [x, y]}`` or
+    ``{name: {"x": x, "y": y}}`` (the visualizer's and frontend's node form).
+    """
+    if not isinstance(positions, dict):
+        raise ValueError("Option 'positions' must map node names to [x, y]")
+    xs, ys = [0.0] * len(graph), [0.0] * len(graph)
+    for v, name in enumerate(graph.names):
+        p = positions.get(name)
+        if isinstance(p, dict):
+            p = (p.get("x"), p.get("y"))
+        try:
+            xs[v], ys[v] = float(p[0]), float(p[1])
+        except (TypeError, ValueError, IndexError):
+            raise ValueError(f"No [x, y] position for node '{name}'") from None
+    return xs, ys
+
+
+def heuristic_scale(graph, xs, ys) -> float:
+    """Largest factor that keeps ``scale * euclidean`` below every edge weight."""
+    if not graph.num_edges:
+        return 0.0
+    x, y = np.asarray(xs), np.asarray(ys)
+    src = np.repeat(np.arange(len(graph)), np.diff(np.asarray(graph.offsets)))
+    dst = np.asarray(graph.targets)
+    length = np.hypot(x[src] - x[dst], y[src] - y[dst])
+    w = np.asarray(graph.weights, dtype=np.float64)
+    if (w < 0).any():
+        raise ValueError("A* needs non-negative edge weights")
+    moving = length > 0  # edges between coincident nodes don't constrain the scale
+    if not moving.any():
+        return 0.0
+    # shave off a hair so float rounding can't make the heuristic overshoot
+    return float(np.min(w[moving] / length[moving])) * (1 - 1e-9)
+
+
+def astar(graph, start, end=None, positions=None):
+    """
+    Step generator like ``dijkstra()``, ordered by ``distance + heuristic``.
+    ``positions`` gives every node's coordinates (see ``coordinates()``).
+
+    Returns ``{"distances", "previous", "path", "distance", "expanded"}``:
+    distances / previous cover only the nodes the search reached, and
+    ``expanded`` counts settled nodes -- compare it with dijkstra's.
+    Missing ``end`` / ``positions`` raise ValueError here rather than on the
+    first ``next()``.
+    """
+    graph = as_csr(graph)
+    if end is None:
+        raise ValueError("A* needs an 'end' node")
+    if positions is None:
+        raise ValueError("A* needs node 'positions'")
+    xs, ys = coordinates(graph, positions)
+    return _astar_steps(graph, start, end, xs, ys, heuristic_scale(graph, xs, ys))
+
+
+def _astar_steps(graph, start, end, xs, ys, scale):
+    names = graph.names
+    n = len(graph)
+    s, t = graph.id_of(start), graph.id_of(end)
+    tx, ty = xs[t], ys[t]
+
+    dist = [math.inf] * n
+    prev = [-1] * n
+    settled = bytearray(n)
+    dist[s] = 0
+    heap = [(scale * math.hypot(xs[s] - tx, ys[s] - ty), s)]
+    reached = [s]
+    expanded = 0
+
+    while heap:
+        _, u = heapq.heappop(heap)
+        if settled[u]:
+            continue  # stale entry; with a consistent heuristic settled is final
+        settled[u] = 1
+        expanded += 1
+        d = dist[u]
+
+        frontier, relaxed = [], []
+        if u != t:
+            for v, w in graph.edges(u):
+                alt = d + w
+                if alt < dist[v]:
+                    if dist[v] == math.inf:
+                        frontier.append(v)
+                    dist[v] = alt
+                    prev[v] = u
+                    heapq.heappush(heap, (alt + scale * math.hypot(xs[v] - tx, ys[v] - ty), v))
+                    relaxed.append((v, alt))
+
+        reached += frontier
+        yield {"c": u, "f": frontier, "r": relaxed, "n": graph.neighbors(u)}
+        if u == t:
+            break
+
+    return {
+        "distances": {names[v]: dist[v] for v in reached},
+        "previous": {names[v]: (names[prev[v]] if prev[v] >= 0 else None) for v in reached},
+        "path": [names[v] for v in path_to(prev, t)] if settled[t] else None,
+        "distance": dist[t] if settled[t] else None,
+        "expanded": expanded,
+    }
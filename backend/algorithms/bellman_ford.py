@@ -0,0 +1,102 @@
+"""
+backend/algorithms/bellman_ford.py
+Single-source shortest paths with negative weights (queue-based Bellman-Ford).
+
+graph.js relaxes every edge V - 1 times.  This is the SPFA variant: only
+the out-edges of nodes whose distance dropped since they were last scanned
+are relaxed, from a FIFO queue, so the run ends as soon as nothing changes
+-- usually after a few passes' worth of work instead of V - 1.
+
+Negative cycles are caught by hop counts: a label reached over V or more
+edges must have come round a cycle, and only a negative one can lower a
+label.  The run then stops and reports that cycle instead of spinning.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+
+from .graph_core import as_csr, path_to
+
+
+def _prev_cycle(prev, v: int) -> list | None:
+    """The cycle on ``v``'s predecessor chain (in edge order), or None."""
+    seen = {}
+    while v >= 0 and v not in seen:
+        seen[v] = len(seen)
+        v = prev[v]
+    if v < 0:
+        return None
+    cycle = [u for u, i in seen.items() if i >= seen[v]]
+    cycle.reverse()
+    return cycle
+
+
+def bellman_ford(graph, start, end=None):
+    """
+    Step generator: one trace delta per dequeued node (a node can come up
+    again after its distance drops), then returns ``{"distances",
+    "previous", "path", "negativeCycle"}`` keyed by node name.
+
+    ``end`` only selects the ``path``; negative weights rule out stopping
+    early.  If a negative cycle is reachable from ``start`` the run stops,
+    ``negativeCycle`` lists its nodes in edge order (first node repeated at
+    the end) and the other fields are ``None``.
+    """
+    graph = as_csr(graph)
+    return _bellman_ford_steps(graph, start, end)
+
+
+def _bellman_ford_steps(graph, start, end):
+    names = graph.names
+    n = len(graph)
+    s = graph.id_of(start)
+    t = graph.id_of(end) if end is not None else -1
+
+    dist = [math.inf] * n
+    prev = [-1] * n
+    hops = [0] * n         # edges on the walk behind each label
+    queued = bytearray(n)
+    dist[s] = 0
+    queue = deque([s])
+    queued[s] = 1
+
+    while queue:
+        u = queue.popleft()
+        queued[u] = 0
+        d = dist[u]
+
+        frontier, relaxed = [], []
+        cycle = None
+        for v, w in graph.edges(u):
+            alt = d + w
+            if alt < dist[v]:
+                if dist[v] == math.inf:
+                    frontier.append(v)
+                dist[v] = alt
+                prev[v] = u
+                hops[v] = hops[u] + 1
+                relaxed.append((v, alt))
+                if hops[v] >= n:
+                    cycle = _prev_cycle(prev, v)
+                    if cycle is not None:
+                        break
+                if not queued[v]:
+                    queued[v] = 1
+                    queue.append(v)
+
+        yield {"c": u, "f": frontier, "r": relaxed, "n": graph.neighbors(u)}
+        if cycle is not None:
+            return {
+                "distances": None,
+                "previous": None,
+                "path": None,
+                "negativeCycle": [names[v] for v in cycle + cycle[:1]],
+            }
+
+    return {
+        "distances": {names[v]: (dist[v] if dist[v] < math.inf else None) for v in range(n)},
+        "previous": {names[v]: (names[prev[v]] if prev[v] >= 0 else None) for v in range(n)},
+        "path": [names[v] for v in path_to(prev, t)] if t >= 0 and dist[t] < math.inf else None,
+        "negativeCycle": None,
+    }
@@ -0,0 +1,52 @@
+"""
+backend/algorithms/bfs.py
+Breadth-first search step generator over a CSRGraph.
+"""
+from __future__ import annotations
+
+from collections import deque
+
+from .graph_core import as_csr, path_to
+
+
+def bfs(graph, start, end=None):
+    """
+    Yield one trace delta per dequeued node (see trace.py), then return
+    ``{"traversal", "parent", "path"}`` keyed by node name.  With an
+    ``end`` the run stops once it is dequeued and ``path`` holds the
+    fewest-hops route to it.
+    """
+    graph = as_csr(graph)
+    names = graph.names
+    s = graph.id_of(start)
+    t = graph.id_of(end) if end is not None else -1
+
+    seen = bytearray(len(graph))  # one byte per node instead of a set of names
+    seen[s] = 1
+    queue = deque([s])
+    visited = []
+    prev = [-1] * len(graph)
+
+    while queue:
+        u = queue.popleft()
+        visited.append(names[u])
+
+        nbrs = graph.neighbors(u)
+        frontier = []
+        for v in nbrs:
+            if not seen[v]:
+                seen[v] = 1
+                prev[v] = u
+                queue.append(v)
+                frontier.append(v)
+
+        yield {"c": u, "f": frontier, "n": nbrs}
+        if u == t:
+            break
+
+    return {
+        "traversal": visited,
+        "parent": {names[v]: (names[prev[v]] if prev[v] >= 0 else None)
+                   for v in range(len(graph)) if seen[v]},
+        "path": [names[v] for v in path_to(prev, t)] if t >= 0 and seen[t] else None,
+    }
@@ -0,0 +1,146 @@
+"""
+backend/algorithms/bidirectional.py
+Bidirectional point-to-point searches over a CSRGraph.
+
+One search grows forward from ``start`` over out-edges and one backward
+from ``end`` over in-edges (``graph.reversed()``); they stop once the two
+balls provably contain a shortest path.  Two balls of radius r/2 hold far
+fewer nodes than Dijkstra's / BFS's single ball of radius r.
+
+Steps use the usual trace deltas; steps of the backward search carry
+``"s": 1`` and their ``"r"`` distances are distances *to* ``end``.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+
+from .graph_core import as_csr, path_to
+
+
+def _join(names, prev_f, prev_b, meet: int) -> list:
+    """start .. meet from the forward tree, then meet .. end from the backward one."""
+    path = path_to(prev_f, meet)
+    v = prev_b[meet]
+    while v >= 0:
+        path.append(v)
+        v = prev_b[v]
+    return [names[v] for v in path]
+
+
+def _result(names, prev_f, prev_b, meet, distance, expanded) -> dict:
+    found = meet >= 0
+    return {
+        "path": _join(names, prev_f, prev_b, meet) if found else None,
+        "distance": distance if found else None,
+        "meeting": names[meet] if found else None,
+        "expanded": expanded,
+    }
+
+
+def bidirectional_dijkstra(graph, start, end=None):
+    """
+    Step generator; returns ``{"path", "distance", "meeting", "expanded"}``.
+    Each round expands the side whose queue top is smaller, and the run
+    stops once the two tops add up to at least the best path seen.
+    Raises ValueError here if ``end`` is missing or a weight is negative.
+    """
+    graph = as_csr(graph)
+    if end is None:
+        raise ValueError("Bidirectional search needs an 'end' node")
+    if len(graph.weights) and min(graph.weights) < 0:
+        raise ValueError("Dijkstra needs non-negative edge weights")
+    return _dijkstra_steps(graph, graph.reversed(), start, end)
+
+
+def _dijkstra_steps(graph, reverse, start, end):
+    n = len(graph)
+    s, t = graph.id_of(start), graph.id_of(end)
+    sides = (graph, reverse)
+    dist = ([math.inf] * n, [math.inf] * n)
+    prev = ([-1] * n, [-1] * n)
+    settled = (bytearray(n), bytearray(n))
+    heaps = ([(0, s)], [(0, t)])
+    dist[0][s] = dist[1][t] = 0
+    best, meet = (0, s) if s == t else (math.inf, -1)  # shortest start-end path seen so far
+    expanded = 0
+
+    while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        d, u = heapq.heappop(heaps[side])
+        if settled[side][u]:
+            continue
+        settled[side][u] = 1
+        expanded += 1
+        mine, other = dist[side], dist[1 - side]
+
+        frontier, relaxed = [], []
+        for v, w in sides[side].edges(u):
+            alt = d + w
+            if alt < mine[v]:
+                if mine[v] == math.inf:
+                    frontier.append(v)
+                mine[v] = alt
+                prev[side][v] = u
+                heapq.heappush(heaps[side], (alt, v))
+                relaxed.append((v, alt))
+            if alt + other[v] < best:  # an edge that links the two trees
+                best, meet = alt + other[v], v
+
+        step = {"c": u, "f": frontier, "r": relaxed, "n": sides[side].neighbors(u)}
+        if side:
+            step["s"] = 1
+        yield step
+
+    return _result(graph.names, prev[0], prev[1], meet, best, expanded)
+
+
+def bidirectional_bfs(graph, start, end=None):
+    """
+    Step generator for the fewest-hops path; returns ``{"path", "distance",
+    "meeting", "expanded"}``.  Each round expands a whole level of the side
+    with the smaller frontier, so the two searches meet in the middle.
+    """
+    graph = as_csr(graph)
+    if end is None:
+        raise ValueError("Bidirectional search needs an 'end' node")
+    return _bfs_steps(graph, graph.reversed(), start, end)
+
+
+def _bfs_steps(graph, reverse, start, end):
+    n = len(graph)
+    s, t = graph.id_of(start), graph.id_of(end)
+    sides = (graph, reverse)
+    depth = ([-1] * n, [-1] * n)
+    prev = ([-1] * n, [-1] * n)
+    depth[0][s] = depth[1][t] = 0
+    levels = ([s], [t])
+    meet = s if s == t else -1
+    expanded = 0
+
+    while meet < 0 and levels[0] and levels[1]:
+        side = 0 if len(levels[0]) <= len(levels[1]) else 1
+        mine, other = depth[side], depth[1 - side]
+        nxt = []
+        best = math.inf
+        for u in levels[side]:
+            expanded += 1
+            frontier = []
+            nbrs = sides[side].neighbors(u)
+            for v in nbrs:
+                if mine[v] < 0:
+                    mine[v] = mine[u] + 1
+                    prev[side][v] = u
+                    nxt.append(v)
+                    frontier.append(v)
+                    # finish the level: another node of it may meet closer
+                    if other[v] >= 0 and mine[v] + other[v] < best:
+                        best, meet = mine[v] + other[v], v
+            step = {"c": u, "f": frontier, "n": nbrs}
+            if side:
+                step["s"] = 1
+            yield step
+        levels[side][:] = nxt
+
+    distance = depth[0][meet] + depth[1][meet] if meet >= 0 else None
+    return _result(graph.names, prev[0], prev[1], meet, distance, expanded)
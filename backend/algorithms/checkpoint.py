@@ -0,0 +1,29 @@
+"""
+backend/algorithms/checkpoint.py
+Cooperative cancellation for work that yields no steps.
+
+The executor stops a run between the steps it yields, but some algorithms
+do most of their work before (or without) yielding any: Floyd-Warshall's
+pivots, one Dijkstra per source, building an all-pairs result.  Such loops
+call ``checkpoint()`` every so often.  While the executor is producing a
+step of a guarded run, that raises whatever the run's guard raises (a
+timeout or a cancellation); anywhere else it does nothing.
+"""
+from __future__ import annotations
+
+import threading
+
+_local = threading.local()
+
+
+def checkpoint() -> None:
+    check = getattr(_local, "check", None)
+    if check is not None:
+        check()
+
+
+def set_check(check):
+    """Install ``check`` (a callable, or None) for this thread; returns the previous one."""
+    previous = getattr(_local, "check", None)
+    _local.check = check
+    return previous
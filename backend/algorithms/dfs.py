@@ -0,0 +1,59 @@
+"""
+backend/algorithms/dfs.py
+Depth-first search step generator over a CSRGraph.
+"""
+from __future__ import annotations
+
+from .graph_core import as_csr, path_to
+
+
+def dfs(graph, start, end=None):
+    """
+    Yield one trace delta per newly visited node (see trace.py), then return
+    ``{"traversal", "parent", "path"}`` keyed by node name.
+
+    Iterative, so deep graphs don't hit the recursion limit, but it visits
+    nodes in the same order as the recursive version in graph.js.  With an
+    ``end`` the run stops once it is visited and ``path`` is the DFS-tree
+    route to it.
+    """
+    graph = as_csr(graph)
+    names = graph.names
+    s = graph.id_of(start)
+    t = graph.id_of(end) if end is not None else -1
+
+    seen = bytearray(len(graph))
+    stacked = bytearray(len(graph))  # already reported as entering the frontier
+    stacked[s] = 1
+    stack = [(s, -1)]  # (node, parent) so each node keeps the parent that reached it
+    visited = []
+    prev = [-1] * len(graph)
+
+    while stack:
+        u, p = stack.pop()
+        if seen[u]:
+            continue
+        seen[u] = 1
+        visited.append(names[u])
+        prev[u] = p
+
+        nbrs = graph.neighbors(u)
+        frontier = []
+        # push in reverse so the first neighbour is explored first
+        for v in reversed(nbrs):
+            if not seen[v]:
+                stack.append((v, u))
+                if not stacked[v]:
+                    stacked[v] = 1
+                    frontier.append(v)
+
+        yield {"c": u, "f": frontier, "n": nbrs}
+        if u == t:
+            break
+
+    return {
+        "traversal": visited,
+        "parent": {names[v]: (names[prev[v]] if prev[v] >= 0 else None)
+                   for v in range(len(graph)) if seen[v]},
+        "path": [names[v] for v in path_to(prev, t)] if t >= 0 and seen[t] else None,
+    }
@@ -0,0 +1,116 @@
+"""
+backend/algorithms/dijkstra.py
+Dijkstra's shortest paths over a CSRGraph.
+
+    shortest_paths()  plain engine on int ids, for callers that only want
+                      the distance / predecessor arrays
+    dijkstra()        step generator for the visualizer and /api/run
+
+Both take an optional target and stop as soon as it is settled, so a
+point-to-point query only explores the ball around the source that reaches
+it instead of the whole graph.
+"""
+from __future__ import annotations
+
+import math
+
+from .graph_core import as_csr, path_to
+from .priority_queues import make_queue
+
+
+def shortest_paths(graph, source: int, target: int = -1, queue: str = "heap"):
+    """
+    Return ``(dist, prev)`` lists indexed by node id.
+
+    Unreached nodes keep ``math.inf`` / ``-1``.  With a ``target`` the search
+    stops once it is settled, so only nodes settled before it are final.
+    """
+    graph = as_csr(graph)
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    n = len(graph)
+
+    dist = [math.inf] * n
+    prev = [-1] * n
+    settled = bytearray(n)
+    dist[source] = 0
+    pq = make_queue(queue, weights)
+    push, pop = pq.push, pq.pop
+    push(0, source)
+
+    while pq:
+        d, u = pop()
+        if settled[u]:
+            continue  # stale entry, a shorter path was already settled
+        settled[u] = 1
+        if u == target:
+            break
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            alt = d + weights[i]
+            if alt < dist[v]:
+                dist[v] = alt
+                prev[v] = u
+                push(alt, v)
+
+    return dist, prev
+
+
+def dijkstra(graph, start, end=None, queue: str = "heap"):
+    """
+    Step generator: one trace delta per settled node (see trace.py), then
+    returns ``{"distances", "previous", "path", "expanded"}`` keyed by node
+    name, ``expanded`` being the number of settled nodes.
+
+    ``end`` stops the run as soon as that node is settled; ``path`` is the
+    start-to-end name list (``None`` without an ``end`` or if unreachable).
+    Unreachable or unexplored nodes get a distance of ``None`` (JSON has no
+    Infinity).  Bad ``queue`` names raise ValueError here rather than on the
+    first ``next()``.
+    """
+    graph = as_csr(graph)
+    pq = make_queue(queue, graph.weights)
+    return _dijkstra_steps(graph, start, end, pq)
+
+
+def _dijkstra_steps(graph, start, end, pq):
+    names = graph.names
+    n = len(graph)
+    s = graph.id_of(start)
+    t = graph.id_of(end) if end is not None else -1
+
+    dist = [math.inf] * n
+    prev = [-1] * n
+    settled = bytearray(n)
+    dist[s] = 0
+    pq.push(0, s)
+    expanded = 0
+
+    while pq:
+        d, u = pq.pop()
+        if settled[u]:
+            continue  # stale entry, a shorter path was already settled
+        settled[u] = 1
+        expanded += 1
+
+        frontier, relaxed = [], []
+        if u != t:  # the target is final once settled, no need to relax it
+            for v, w in graph.edges(u):
+                alt = d + w
+                if alt < dist[v]:
+                    if dist[v] == math.inf:
+                        frontier.append(v)
+                    dist[v] = alt
+                    prev[v] = u
+                    pq.push(alt, v)
+                    relaxed.append((v, alt))
+
+        yield {"c": u, "f": frontier, "r": relaxed, "n": graph.neighbors(u)}
+        if u == t:
+            break
+
+    return {
+        "distances": {names[v]: (dist[v] if dist[v] < math.inf else None) for v in range(n)},
+        "previous": {names[v]: (names[prev[v]] if prev[v] >= 0 else None) for v in range(n)},
+        "path": [names[v] for v in path_to(prev, t)] if t >= 0 and settled[t] else None,
+        "expanded": expanded,
+    }
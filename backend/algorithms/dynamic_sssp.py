@@ -0,0 +1,234 @@
+"""
+backend/algorithms/dynamic_sssp.py
+Single-source shortest paths kept up to date under graph edits.
+
+After an edge insert, weight change or deletion only the part of the
+shortest-path tree that can change is recomputed, in the style of
+Ramalingam & Reps:
+
+  1. Tree edges that got longer (or vanished) cut their subtree loose: those
+     nodes are "affected" and restart from their best unaffected in-neighbour.
+  2. Edges that got shorter (or appeared) seed their target with a new
+     tentative distance.
+  3. A Dijkstra run from those seeds settles the affected region; it stops
+     spreading wherever a distance doesn't improve.
+
+Every tentative distance is the length of a real path, so the run ends at
+the same distances a from-scratch run computes, in time proportional to the
+changed region rather than the graph.
+
+Predecessors are then re-derived for the touched nodes with the tie-break
+the heap ``dijkstra()`` ends up with -- among in-neighbours on a shortest
+path, the one with the smallest ``(distance, node id)`` -- so ``previous``
+matches a from-scratch run too.  (With zero-weight edges ties can resolve
+differently; the tree is still a valid shortest-path tree.)
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from collections import defaultdict
+
+from .dijkstra import shortest_paths
+from .graph_core import CSRGraph
+
+
+class DynamicSSSP:
+    """
+    Shortest-path tree from ``source`` over a live ``{u: {v: weight}}`` dict.
+
+    The owner edits ``adjacency`` itself and then reports the edits to
+    ``repair()`` as ``(op, u, v, old_weight)`` tuples -- the form
+    ``GraphSession.apply`` returns.  ``incoming`` (``v -> set of u``) may be
+    shared with the owner; repair() keeps it in sync either way.
+    """
+
+    def __init__(self, adjacency, source, nodes=(), incoming=None):
+        graph = CSRGraph.from_adjacency(adjacency, nodes=nodes)
+        if source not in graph:
+            raise ValueError(f"Start node '{source}' not present in graph")
+        if len(graph.weights) and min(graph.weights) < 0:
+            raise ValueError("Dynamic shortest paths need non-negative edge weights")
+        self.adjacency = adjacency
+        self.source = source
+        names = graph.names
+        self.rank = dict(graph.index)  # from-scratch node ids: the heap's tie-break
+        self._next_rank = len(names)
+
+        dist, prev = shortest_paths(graph, graph.id_of(source))
+        self.dist = dict(zip(names, dist))
+        self.expanded = sum(d < math.inf for d in dist)  # nodes settled by the last build or repair
+        self.prev = {names[v]: (names[p] if p >= 0 else None) for v, p in enumerate(prev)}
+        self.children = defaultdict(set)
+        for v, p in self.prev.items():
+            if p is not None:
+                self.children[p].add(v)
+        if incoming is None:
+            incoming = {name: set() for name in names}
+            for u in range(len(names)):
+                for v in graph.neighbors(u):
+                    incoming[names[v]].add(names[u])
+        self.incoming = incoming
+
+    # ── queries ─────────────────────────────────────────────────────────
+    def path_to(self, target) -> list | None:
+        if self.dist.get(target, math.inf) == math.inf:
+            return None
+        path = []
+        while target is not None:
+            path.append(target)
+            target = self.prev[target]
+        path.reverse()
+        return path
+
+    def result(self, end=None, names=None) -> dict:
+        """
+        ``dijkstra()``-style result, for all nodes or just ``names``;
+        ``expanded`` counts the nodes settled to reach this tree.
+        """
+        names = self.dist if names is None else names
+        dist, prev = self.dist, self.prev
+        return {
+            "distances": {v: (dist[v] if dist[v] < math.inf else None) for v in names},
+            "previous": {v: prev[v] for v in names},
+            "path": self.path_to(end) if end is not None else None,
+            "expanded": self.expanded,
+        }
+
+    # ── updates ─────────────────────────────────────────────────────────
+    def repair(self, changes) -> set:
+        """
+        Bring the tree up to date with ``changes`` (already applied to
+        ``adjacency``).  Returns the names whose distance or predecessor
+        changed, including added and removed nodes.  Raises ValueError if
+        the source was removed or a weight went negative; the tree is
+        unusable then.
+        """
+        adjacency, incoming = self.adjacency, self.incoming
+        dist, prev, rank = self.dist, self.prev, self.rank
+        roots, seeds, touched, removed, added = [], [], set(), set(), set()
+
+        for op, u, v, old in changes:
+            if op == "add_node":
+                if u not in rank:
+                    rank[u] = self._next_rank
+                    self._next_rank += 1
+                dist.setdefault(u, math.inf)
+                prev.setdefault(u, None)
+                incoming.setdefault(u, set())
+                added.add(u)
+                removed.discard(u)
+                continue
+            if op == "remove_node":
+                if u == self.source:
+                    raise ValueError(f"Start node '{u}' was removed")
+                removed.add(u)
+                added.discard(u)
+                continue
+            new = adjacency.get(u, {}).get(v)
+            if new is None:
+                incoming.get(v, set()).discard(u)
+            else:
+                if new < 0:
+                    raise ValueError("Dynamic shortest paths need non-negative edge weights")
+                incoming[v].add(u)
+            if old is not None and prev.get(v) == u and (new is None or new > old):
+                roots.append(v)  # a tree edge got longer: v's subtree may move
+            if new is not None and (old is None or new < old):
+                seeds.append((u, v))
+            touched.add(v)
+
+        # 1. cut loose the subtrees hanging off lengthened tree edges
+        affected = set()
+        stack = roots
+        while stack:
+            x = stack.pop()
+            if x not in affected:
+                affected.add(x)
+                stack.extend(self.children.get(x, ()))
+        for x in removed:
+            self.children.get(prev.get(x), set()).discard(x)
+            for table in (dist, prev, rank, self.children, incoming):
+                table.pop(x, None)
+        affected -= removed
+        touched -= removed
+
+        old = {x: dist[x] for x in affected}
+        heap = []
+        for x in affected:
+            dist[x] = math.inf
+        for x in affected:
+            best = min((dist[s] + adjacency[s][x] for s in incoming[x] if s not in affected),
+                       default=math.inf)
+            if best < math.inf:
+                dist[x] = best
+                heap.append((best, rank[x], x))
+
+        # 2. edges that got shorter
+        for u, v in seeds:
+            if u in dist and v in dist:
+                alt = dist[u] + adjacency[u][v]
+                if alt < dist[v]:
+                    old.setdefault(v, dist[v])
+                    dist[v] = alt
+                    heap.append((alt, rank[v], v))
+
+        # 3. settle the affected region
+        heapq.heapify(heap)
+        done = set()
+        while heap:
+            d, _, x = heapq.heappop(heap)
+            if x in done or d > dist[x]:
+                continue
+            done.add(x)
+            for y, w in adjacency.get(x, {}).items():
+                alt = d + w
+                if alt < dist[y]:
+                    old.setdefault(y, dist[y])
+                    dist[y] = alt
+                    heapq.heappush(heap, (alt, rank[y], y))
+
+        self.expanded = len(done)
+
+        # predecessors: anything whose distance or in-edges changed, plus
+        # the out-neighbours of nodes whose distance changed (their ties moved)
+        moved = [x for x, d in old.items() if d != dist[x]]
+        touched.update(old)
+        for x in moved:
+            touched.update(adjacency.get(x, ()))
+        changed = set(moved) | removed | added
+        for v in touched:
+            p = self._best_prev(v)
+            if p != prev[v]:
+                if prev[v] in self.children:
+                    self.children[prev[v]].discard(v)
+                if p is not None:
+                    self.children[p].add(v)
+                prev[v] = p
+                changed.add(v)
+        return changed
+
+    def _best_prev(self, v):
+        d = self.dist[v]
+        if v == self.source or d == math.inf:
+            return None
+        dist, rank, adjacency = self.dist, self.rank, self.adjacency
+        best, key, zero = None, None, []
+        for u in self.incoming[v]:
+            du = dist[u]
+            if du + adjacency[u][v] != d:
+                continue
+            if du < d:
+                k = (du, rank[u])
+                if key is None or k < key:
+                    best, key = u, k
+            else:
+                zero.append(u)
+        if best is not None or not zero:
+            return best
+        # only zero-weight ties: keep the current parent if it still works so
+        # the tree can't close a zero-weight cycle
+        current = self.prev.get(v)
+        if current in zero:
+            return current
+        return min(zero, key=rank.__getitem__)
@@ -0,0 +1,529 @@
+"""
+backend/algorithms/export.py
+Headless export of algorithm runs to PNG sequences, animated PNGs and GIFs.
+
+Run from the repo root:
+    python -m backend.algorithms.export graph.json --algo dijkstra --start A --start B --format apng -o out/
+
+Each run is traced once in the parent process (one pass of the step
+generator, see trace.py).  Its frames -- the initial state, then one per
+step -- are cut into chunks that a process pool renders and encodes in
+parallel.  A chunk carries the replayed state at its first frame, so no
+worker replays from step 0.  Workers draw on offscreen pygame surfaces
+under SDL's dummy video driver (no window) and draw each run's edges and
+idle nodes only once.
+
+    png   numbered frame files, written by the workers
+    apng  workers encode each frame as a PNG; its image data is then spliced
+          into one animated PNG
+    gif   workers encode each frame as a GIF image block with its own
+          palette (needs Pillow); the blocks are concatenated
+
+The chunks of every run share one pool, so a batch of runs keeps all the
+workers busy until the last frame.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import math
+import multiprocessing
+import os
+import pathlib
+import struct
+import sys
+import time
+import uuid
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # never open a window
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame  # noqa: E402
+
+from .graph_core import CSRGraph, as_csr  # noqa: E402
+from .trace import TraceState, encode_trace  # noqa: E402
+
+try:
+    from PIL import Image
+except ImportError:  # optional: only GIF output needs it
+    Image = None
+
+FORMATS = ("png", "apng", "gif")
+FRAMES_PER_TASK = 24       # frames one pool task renders and encodes
+SIZE = (800, 600)
+MARGIN = 40                # pixels kept clear around the layout (the title sits in it)
+HOLD_LAST = 2.0            # seconds the final frame stays up in animations
+MAX_WEIGHT_LABELS = 300    # more edges than this: weights would be unreadable, skip them
+PNG_LEVEL = 3              # zlib level of frame PNGs: ~5x faster than pygame's, ~30% bigger
+
+# the visualizer's colours
+WHITE   = (255, 255, 255)
+BLACK   = (  0,   0,   0)
+BLUE    = (  0, 120, 215)
+YELLOW  = (255, 255,   0)
+RED     = (200,   0,   0)
+GREEN   = (  0, 255,   0)
+LIGHT   = (100, 180, 255)   # out-neighbours of the current node
+ORANGE  = (255, 140,   0)   # the result path, on the last frame
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class ExportJob:
+    """One run to export: algorithm, graph and start, and where the frames go."""
+
+    __slots__ = ("graph", "algo", "start", "end", "options", "output", "format", "positions", "title")
+
+    def __init__(self, graph, algo, start=None, end=None, options=None, output="run.apng",
+                 format: str = "apng", positions: dict | None = None, title: str = ""):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format '{format}', expected one of {', '.join(FORMATS)}")
+        if format == "gif" and Image is None:
+            raise ValueError("GIF export needs Pillow (pip install pillow)")
+        self.graph = as_csr(graph)
+        self.algo, self.start, self.end = algo, start, end
+        self.options = options or {}
+        self.output = pathlib.Path(output)
+        self.format = format
+        self.positions = positions   # {name: (x, y)}; nodes go on a circle without it
+        self.title = title or getattr(algo, "__name__", "run")
+
+
+# ── layout ──────────────────────────────────────────────────────────────
+
+def layout(graph: CSRGraph, positions: dict | None, size=SIZE) -> tuple[list, int]:
+    """Pixel centre per node id, scaled into ``size``, and a node radius that fits."""
+    n = len(graph)
+    width, height = size
+    if positions and all(name in positions for name in graph.names):
+        xs = [float(positions[name][0]) for name in graph.names]
+        ys = [float(positions[name][1]) for name in graph.names]
+    else:
+        xs = [math.cos(2 * math.pi * i / max(n, 1)) for i in range(n)]
+        ys = [math.sin(2 * math.pi * i / max(n, 1)) for i in range(n)]
+    radius = int(max(2, min(20, 0.35 * math.sqrt(width * height / max(n, 1)))))
+    pad = MARGIN + radius
+    x0, y0 = min(xs, default=0), min(ys, default=0)
+    span_x, span_y = (max(xs, default=0) - x0) or 1, (max(ys, default=0) - y0) or 1
+    scale = min((width - 2 * pad) / span_x, (height - 2 * pad) / span_y)
+    # centre the drawing
+    ox = (width - span_x * scale) / 2
+    oy = (height - span_y * scale) / 2
+    return [(round(ox + (x - x0) * scale), round(oy + (y - y0) * scale)) for x, y in zip(xs, ys)], radius
+
+
+# ── workers ─────────────────────────────────────────────────────────────
+
+_backgrounds: dict = {}   # scene token -> (background surface, fonts), per worker process
+
+
+def _fonts(radius: int):
+    return pygame.font.Font(None, max(12, int(radius * 1.2))), pygame.font.Font(None, 24)
+
+
+def _background(scene: dict):
+    """Edges, weights and every node in its idle colour; drawn once per run per worker."""
+    cached = _backgrounds.get(scene["token"])
+    if cached is not None:
+        return cached
+    pygame.font.init()
+    label_font, title_font = _fonts(scene["radius"])
+    xy, r = scene["xy"], scene["radius"]
+    surface = pygame.Surface(scene["size"])
+    surface.fill(WHITE)
+    weights = len(scene["edges"]) <= MAX_WEIGHT_LABELS
+    for u, v, w in scene["edges"]:
+        _arrow(surface, xy[u], xy[v], r, BLACK, 1 if r < 8 else 2)
+        if weights:
+            label = label_font.render(f"{w:g}", True, RED)
+            surface.blit(label, ((xy[u][0] + xy[v][0]) // 2, (xy[u][1] + xy[v][1]) // 2))
+    for v in range(len(xy)):
+        _node(surface, scene, v, BLUE, label_font)
+    if len(_backgrounds) >= 8:  # a worker only ever serves a few runs at once
+        _backgrounds.clear()
+    _backgrounds[scene["token"]] = cached = (surface, label_font, title_font)
+    return cached
+
+
+def _arrow(surface, a, b, radius, color, width):
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length = math.hypot(dx, dy)
+    if length <= radius + 2:
+        return
+    tip = (b[0] - dx * (radius + 2) / length, b[1] - dy * (radius + 2) / length)
+    pygame.draw.line(surface, color, a, tip, width)
+    size = max(4, radius * 0.4)
+    angle = math.atan2(dy, dx)
+    pygame.draw.polygon(surface, color, [tip] + [
+        (tip[0] - size * math.cos(angle + turn), tip[1] - size * math.sin(angle + turn))
+        for turn in (-math.pi / 6, math.pi / 6)
+    ])
+
+
+def _node(surface, scene, v, color, font):
+    x, y = scene["xy"][v]
+    pygame.draw.circle(surface, color, (x, y), scene["radius"])
+    if scene["radius"] >= 8:
+        label = font.render(scene["names"][v], True, BLACK if color in (YELLOW, GREEN) else WHITE)
+        surface.blit(label, label.get_rect(center=(x, y)))
+
+
+def _draw(surface, base, scene, state: TraceState, frame: int, path, fonts):
+    """One frame: ``base`` already shows the visited nodes, the rest changes every step."""
+    _, label_font, title_font = fonts
+    surface.blit(base, (0, 0))
+    xy = scene["xy"]
+    if path:
+        for u, v in zip(path, path[1:]):
+            pygame.draw.line(surface, ORANGE, xy[u], xy[v], max(3, scene["radius"] // 3))
+    for v in state.frontier:
+        _node(surface, scene, v, RED, label_font)
+    for v in state.neighbors:
+        if not state.visited[v] and v not in state.frontier:
+            _node(surface, scene, v, LIGHT, label_font)
+    if state.current >= 0:
+        _node(surface, scene, state.current, YELLOW, label_font)
+    if path:
+        for v in path:
+            _node(surface, scene, v, ORANGE, label_font)
+    title = f"{scene['title']}   step {frame}/{scene['frames'] - 1}"
+    surface.blit(title_font.render(title, True, BLACK), (10, 10))
+
+
+def _encode_png(surface) -> bytes:
+    """
+    ``surface`` as an RGB PNG.  Frames are flat colour, so unfiltered rows
+    at a low zlib level compress nearly as well as pygame's encoder (filter
+    search, level 6), which took most of an export's time.
+    """
+    width, height = surface.get_size()
+    rows = np.zeros((height, 3 * width + 1), dtype=np.uint8)  # column 0: filter type 0
+    rows[:, 1:] = np.frombuffer(pygame.image.tobytes(surface, "RGB"), np.uint8).reshape(height, -1)
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"".join((PNG_SIGNATURE, _png_chunk(b"IHDR", ihdr),
+                     _png_chunk(b"IDAT", zlib.compress(rows.tobytes(), PNG_LEVEL)),
+                     _png_chunk(b"IEND", b"")))
+
+
+def _encode_gif_block(surface) -> bytes:
+    """One frame as a GIF image block (descriptor, local palette, LZW data)."""
+    image = Image.frombytes("RGB", surface.get_size(), pygame.image.tobytes(surface, "RGB"))
+    out = io.BytesIO()
+    image.quantize(colors=64, dither=Image.Dither.NONE).save(out, "GIF")
+    return _gif_image_block(out.getvalue())
+
+
+def _render_chunk(task) -> list:
+    """
+    Render frames ``lo .. lo + len(steps)`` of a run from the state at
+    ``lo``; returns the encoded frames (PNG bytes / GIF blocks), or for
+    PNG sequences writes them and returns their paths.
+    """
+    scene, snapshot, lo, steps, path, fmt, output = task
+    fonts = _background(scene)
+    state = TraceState(len(scene["xy"]))
+    state.current, visited, frontier, neighbors = snapshot
+    state.visited, state.frontier, state.neighbors = bytearray(visited), set(frontier), frozenset(neighbors)
+    # visited only grows, so settled nodes are painted once onto ``base``
+    # instead of every frame (which made long runs quadratic)
+    base = fonts[0].copy()
+    for v, seen in enumerate(state.visited):
+        if seen:
+            _node(base, scene, v, GREEN, fonts[1])
+    surface = pygame.Surface(scene["size"])
+    encoded = []
+    for k in range(len(steps) + 1):
+        if k:
+            state.apply(steps[k - 1])
+            _node(base, scene, steps[k - 1]["c"], GREEN, fonts[1])
+        frame = lo + k
+        last = frame == scene["frames"] - 1
+        _draw(surface, base, scene, state, frame, path if last else None, fonts)
+        if fmt == "png":
+            target = pathlib.Path(output) / f"frame_{frame:05d}.png"
+            target.write_bytes(_encode_png(surface))
+            encoded.append(str(target))
+        elif fmt == "apng":
+            encoded.append(_encode_png(surface))
+        else:
+            encoded.append(_encode_gif_block(surface))
+    return encoded
+
+
+# ── containers ──────────────────────────────────────────────────────────
+
+def _png_chunks(data: bytes):
+    """``(type, payload)`` of each chunk of a PNG file."""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+    at = len(PNG_SIGNATURE)
+    while at < len(data):
+        length, kind = struct.unpack_from(">I4s", data, at)
+        yield kind, data[at + 8:at + 8 + length]
+        at += 12 + length
+
+
+def _png_chunk(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", zlib.crc32(kind + payload))
+
+
+class _APNGWriter:
+    """Animated PNG from per-frame PNG files: their IDAT data becomes fdAT chunks."""
+
+    def __init__(self, f, frames: int, fps: float, hold: float):
+        self.f, self.frames, self.fps, self.hold = f, frames, fps, hold
+        self.seq = 0     # fcTL and fdAT chunks share one sequence
+        self.index = 0
+
+    def add(self, png: bytes) -> None:
+        chunks = list(_png_chunks(png))
+        ihdr = next(payload for kind, payload in chunks if kind == b"IHDR")
+        if self.index == 0:
+            self.f.write(PNG_SIGNATURE + _png_chunk(b"IHDR", ihdr))
+            self.f.write(_png_chunk(b"acTL", struct.pack(">II", self.frames, 0)))
+        width, height = struct.unpack_from(">II", ihdr)
+        delay = self.hold if self.index == self.frames - 1 else 1 / self.fps
+        self.f.write(_png_chunk(b"fcTL", struct.pack(
+            ">IIIIIHHBB", self.seq, width, height, 0, 0, round(delay * 1000), 1000, 0, 0)))
+        self.seq += 1
+        for kind, payload in chunks:
+            if kind != b"IDAT":
+                continue
+            if self.index == 0:  # the first frame doubles as the static image
+                self.f.write(_png_chunk(b"IDAT", payload))
+            else:
+                self.f.write(_png_chunk(b"fdAT", struct.pack(">I", self.seq) + payload))
+                self.seq += 1
+        self.index += 1
+
+    def close(self) -> None:
+        self.f.write(_png_chunk(b"IEND", b""))
+
+
+def _gif_image_block(gif: bytes) -> bytes:
+    """
+    The first image of a GIF file as a self-contained block: descriptor,
+    then (moved there from the file's global table if need be) its palette,
+    then the LZW data.
+    """
+    packed = gif[10]
+    at = 13
+    palette, global_bits = b"", 0
+    if packed & 0x80:
+        size = 3 << ((packed & 7) + 1)
+        palette, global_bits = gif[at:at + size], packed & 7
+        at += size
+    while gif[at] == 0x21:  # extensions: label, then sub-blocks up to an empty one
+        at += 2
+        while gif[at]:
+            at += gif[at] + 1
+        at += 1
+    if gif[at] != 0x2C:
+        raise ValueError("GIF has no image")
+    descriptor = bytearray(gif[at:at + 10])
+    at += 10
+    if descriptor[9] & 0x80:  # already has a local palette
+        size = 3 << ((descriptor[9] & 7) + 1)
+        palette = gif[at:at + size]
+        at += size
+    else:
+        descriptor[9] = (descriptor[9] & 0x40) | 0x80 | global_bits
+    start = at
+    at += 1  # LZW minimum code size
+    while gif[at]:
+        at += gif[at] + 1
+    return bytes(descriptor) + palette + gif[start:at + 1]
+
+
+class _GIFWriter:
+    """Looping GIF from image blocks, each with a graphic control block for its delay."""
+
+    def __init__(self, f, size, frames: int, fps: float, hold: float):
+        self.f, self.frames, self.fps, self.hold = f, frames, fps, hold
+        self.index = 0
+        f.write(b"GIF89a" + struct.pack("<HHBBB", size[0], size[1], 0, 0, 0))
+        f.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")  # loop forever
+
+    def add(self, block: bytes) -> None:
+        delay = self.hold if self.index == self.frames - 1 else 1 / self.fps
+        self.f.write(b"\x21\xf9\x04\x00" + struct.pack("<H", round(delay * 100)) + b"\x00\x00")
+        self.f.write(block)
+        self.index += 1
+
+    def close(self) -> None:
+        self.f.write(b"\x3b")
+
+
+# ── driver ──────────────────────────────────────────────────────────────
+
+def _prepare(job: ExportJob, size, chunk: int) -> list:
+    """Trace the run and cut its frames into pool tasks, in frame order."""
+    graph = job.graph
+    trace, result = encode_trace(job.algo(graph, job.start, job.end, **job.options), graph.names, sys.maxsize)
+    steps = trace["steps"]
+    xy, radius = layout(graph, job.positions, size)
+    scene = {
+        "token": uuid.uuid4().hex, "size": size, "xy": xy, "radius": radius, "names": graph.names,
+        "edges": [(u, v, w) for u in range(len(graph)) for v, w in graph.edges(u)],
+        "title": job.title, "frames": len(steps) + 1,
+    }
+    path = result.get("path") if isinstance(result, dict) else None
+    path = [graph.index[name] for name in path] if path else None
+    if job.format == "png":
+        job.output.mkdir(parents=True, exist_ok=True)
+    else:
+        job.output.parent.mkdir(parents=True, exist_ok=True)
+
+    tasks = []
+    state = TraceState(len(graph))
+    for lo in range(0, len(steps) + 1, chunk):
+        snapshot = (state.current, bytes(state.visited), tuple(state.frontier), tuple(state.neighbors))
+        part = steps[lo:lo + chunk - 1]
+        tasks.append((scene, snapshot, lo, part, path, job.format, str(job.output)))
+        for step in steps[lo:lo + chunk]:  # on to the state at the next chunk's first frame
+            state.apply(step)
+    return tasks
+
+
+def export_runs(jobs: list, workers: int | None = None, size=SIZE, fps: float = 4.0,
+                hold: float = HOLD_LAST, chunk: int = FRAMES_PER_TASK) -> list:
+    """
+    Export every job; returns ``(job, frame count, seconds)`` per job.  All
+    jobs' chunks go through one process pool (``workers`` 0 renders in this
+    process), and animations are written in order as their chunks complete.
+    """
+    timings = []
+    if workers == 0:
+        pool = _Inline()
+    else:  # like executor.py: don't fork a process that may be running threads
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        pool = ProcessPoolExecutor(workers, mp_context=context)
+    with pool:
+        pending = []
+        for job in jobs:  # trace everything up front so the pool never waits on the parent
+            t = time.perf_counter()
+            tasks = _prepare(job, size, chunk)
+            pending.append((job, tasks, [pool.submit(_render_chunk, task) for task in tasks], t))
+        for job, tasks, futures, t in pending:
+            frames = tasks[0][0]["frames"]
+            if job.format == "png":
+                for future in futures:
+                    future.result()
+            else:
+                with open(job.output, "wb") as f:
+                    writer = (_APNGWriter(f, frames, fps, hold) if job.format == "apng"
+                              else _GIFWriter(f, size, frames, fps, hold))
+                    for future in futures:
+                        for frame in future.result():
+                            writer.add(frame)
+                    writer.close()
+            timings.append((job, frames, time.perf_counter() - t))
+    return timings
+
+
+class _Inline:
+    """Just enough of an executor to render in this process (workers=0)."""
+
+    class _Done:
+        def __init__(self, value):
+            self.value = value
+
+        def result(self):
+            return self.value
+
+    def submit(self, fn, *args):
+        return self._Done(fn(*args))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+# ── CLI ─────────────────────────────────────────────────────────────────
+
+def read_graph(path) -> tuple[CSRGraph, dict | None]:
+    """
+    ``(graph, positions)`` from a JSON file -- an adjacency object, or
+    ``{"graph", "positions"}`` as /api/graph/generate's ``adjacency`` format
+    returns it, or ``{"nodes": [{name, x, y}], "edges": [{from, to, weight}],
+    "directed"}`` like its ``frontend`` one -- or from any edge-list file
+    graph_files.py reads (no positions).
+    """
+    path = pathlib.Path(path)
+    if path.suffix.lower() != ".json":
+        from backend.graph_files import load
+        return load(path), None
+    data = json.loads(path.read_text())
+    if isinstance(data, dict) and isinstance(data.get("nodes"), list):
+        names = {}
+        positions = {}
+        for node in data["nodes"]:
+            name = str(node.get("name", node.get("id")))
+            names[node.get("id", name)] = name
+            positions[name] = (node.get("x", 0), node.get("y", 0))
+        adjacency = {name: {} for name in positions}
+
+        def end(ref):
+            return names.get(ref["id"] if isinstance(ref, dict) else ref, str(ref))
+
+        for edge in data.get("edges", []):
+            u, v, w = end(edge["from"]), end(edge["to"]), edge.get("weight", 1)
+            adjacency.setdefault(u, {})[v] = w
+            if data.get("directed") is False:  # undirected edges are listed once
+                adjacency.setdefault(v, {})[u] = w
+        return CSRGraph.from_adjacency(adjacency), positions
+    if isinstance(data, dict) and isinstance(data.get("graph"), dict):
+        return CSRGraph.from_adjacency(data["graph"]), data.get("positions")
+    return CSRGraph.from_adjacency(data), None
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("graph", help="JSON graph, or a SNAP / DIMACS / CSV edge list")
+    parser.add_argument("--algo", action="append", help="algorithm (repeatable; default dijkstra)")
+    parser.add_argument("--start", action="append", help="start node (repeatable: one run per start)")
+    parser.add_argument("--end")
+    parser.add_argument("--format", choices=FORMATS, default="apng")
+    parser.add_argument("-o", "--output", default="exports", help="output directory")
+    parser.add_argument("--workers", type=int, help="render processes (default: one per CPU, 0 = none)")
+    parser.add_argument("--fps", type=float, default=4.0)
+    parser.add_argument("--size", default=f"{SIZE[0]}x{SIZE[1]}", help="frame size, WIDTHxHEIGHT")
+    args = parser.parse_args(argv)
+
+    from backend.main import ALGO_MAP, _needs_start  # flask is only needed for the name table
+    try:
+        size = tuple(int(x) for x in args.size.lower().split("x"))
+        graph, positions = read_graph(args.graph)
+    except (OSError, ValueError) as exc:
+        parser.exit(1, f"error: {exc}\n")
+    jobs = []
+    for name in args.algo or ["dijkstra"]:
+        algo = ALGO_MAP.get(name)
+        if algo is None:
+            parser.exit(2, f"error: unknown algorithm '{name}'\n")
+        starts = args.start or ([graph.names[0]] if _needs_start(algo) and len(graph) else [None])
+        for start in starts:
+            for node in (start, args.end):
+                if node is not None and node not in graph:
+                    parser.exit(2, f"error: node '{node}' not in graph\n")
+            stem = name if start is None else f"{name}-{start}"
+            output = pathlib.Path(args.output) / (stem if args.format == "png" else f"{stem}.{args.format}")
+            title = name if start is None else f"{name} from {start}"
+            jobs.append(ExportJob(graph, algo, start, args.end, output=output, format=args.format,
+                                  positions=positions, title=title))
+
+    t = time.perf_counter()
+    for job, frames, seconds in export_runs(jobs, args.workers, size, args.fps):
+        print(f"{job.output}: {frames} frames, done after {seconds:.2f}s")
+    print(f"{len(jobs)} runs in {time.perf_counter() - t:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
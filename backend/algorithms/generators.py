@@ -0,0 +1,276 @@
+"""
+backend/algorithms/generators.py
+Seeded synthetic graphs for load tests and demos, sampled in NumPy batches.
+
+    erdos-renyi  G(n, m): exactly m distinct edges, uniformly at random
+    grid         a near-square lattice, optionally thinned to m edges
+    geometric    the m closest pairs of uniform random points
+    scale-free   Chung-Lu: both endpoints drawn with power-law weights
+
+Edges are drawn a whole batch at a time and de-duplicated with one
+``np.unique`` per batch, so there is no per-edge Python until the graph is
+serialised and the edge count is exact, not "whatever fit in 3m attempts".
+The same ``seed`` always gives the same graph.  Undirected graphs list
+each edge once, like server.js.
+"""
+from __future__ import annotations
+
+import math
+from itertools import islice, product
+from string import ascii_uppercase
+
+import numpy as np
+
+MODELS = ("erdos-renyi", "grid", "geometric", "scale-free")
+BOX = (100.0, 100.0, 800.0, 400.0)  # x, y, width, height of server.js' layout area
+MAX_ROUNDS = 64                     # rejection rounds before giving up on distinct edges
+
+
+def node_name(i: int) -> str:
+    """Spreadsheet-column name of node ``i``: A .. Z, AA .. ZZ, AAA, ..."""
+    name = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        name = ascii_uppercase[r] + name
+    return name
+
+
+def node_names(n: int) -> list:
+    """``[node_name(i) for i in range(n)]``, built a name length at a time."""
+    names: list = []
+    length = 1
+    while len(names) < n:
+        words = product(ascii_uppercase, repeat=length)
+        names.extend(map("".join, islice(words, n - len(names))))
+        length += 1
+    return names
+
+
+def max_edges(n: int, directed: bool) -> int:
+    return n * (n - 1) if directed else n * (n - 1) // 2
+
+
+class Generated:
+    """A generated graph as parallel NumPy arrays, plus its serialisations."""
+
+    __slots__ = ("src", "dst", "weight", "x", "y", "directed")
+
+    def __init__(self, src, dst, weight, x, y, directed: bool):
+        self.src, self.dst, self.weight = src, dst, weight  # one entry per edge
+        self.x, self.y = x, y                               # one entry per node
+        self.directed = directed
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.src)
+
+    def frontend(self, names: list) -> dict:
+        """server.js' ``{nodes: [{id, name, x, y}], edges: [{from, to, weight}]}``."""
+        nodes = [
+            {"id": i, "name": name, "x": x, "y": y}
+            for i, (name, x, y) in enumerate(zip(names, self.x.tolist(), self.y.tolist()))
+        ]
+        edges = [
+            {"from": nodes[u], "to": nodes[v], "weight": w}
+            for u, v, w in zip(self.src.tolist(), self.dst.tolist(), self.weight.tolist())
+        ]
+        return {"nodes": nodes, "edges": edges}
+
+    def adjacency(self, names: list) -> dict:
+        """``{"graph": {u: {v: w}}, "positions": {u: [x, y]}}``, ready for /api/run."""
+        graph: dict = {name: {} for name in names}
+        src = map(names.__getitem__, self.src.tolist())
+        dst = map(names.__getitem__, self.dst.tolist())
+        for u, v, w in zip(src, dst, self.weight.tolist()):
+            graph[u][v] = w
+            if not self.directed:
+                graph[v][u] = w
+        positions = dict(zip(names, zip(self.x.tolist(), self.y.tolist())))
+        return {"graph": graph, "positions": positions}
+
+    def columns(self, names: list) -> dict:
+        """Column lists by node id, the cheapest form to encode and parse."""
+        return {
+            "nodes": names, "x": self.x.tolist(), "y": self.y.tolist(),
+            "from": self.src.tolist(), "to": self.dst.tolist(), "weight": self.weight.tolist(),
+        }
+
+    def chunks(self, names: list, size: int):
+        """``("nodes" | "edges", columns)`` pieces of at most ``size`` rows."""
+        for lo in range(0, len(names), size):
+            hi = lo + size
+            yield "nodes", {"offset": lo, "names": names[lo:hi],
+                            "x": self.x[lo:hi].tolist(), "y": self.y[lo:hi].tolist()}
+        for lo in range(0, self.num_edges, size):
+            hi = lo + size
+            yield "edges", {"from": self.src[lo:hi].tolist(), "to": self.dst[lo:hi].tolist(),
+                            "weight": self.weight[lo:hi].tolist()}
+
+
+# ── sampling ────────────────────────────────────────────────────────────
+
+def _scatter(rng, n: int):
+    bx, by, w, h = BOX
+    return np.round(bx + rng.random(n) * w, 2), np.round(by + rng.random(n) * h, 2)
+
+
+def _distinct_pairs(rng, n: int, m: int, directed: bool, draw):
+    """
+    Call ``draw(size) -> (u, v)`` for batches of candidate edges until ``m``
+    distinct ones are in, then drop a random surplus.  Self-loops are
+    rejected and undirected pairs are stored as ``u < v``.  Edges come out
+    sorted by ``(u, v)``, which is also the order a CSR build wants.
+    """
+    keys = np.empty(0, dtype=np.int64)
+    for _ in range(MAX_ROUNDS):
+        missing = m - len(keys)
+        if missing <= 0:
+            break
+        u, v = draw(missing + missing // 8 + 16)  # a little extra covers the rejects
+        keep = u != v
+        u, v = u[keep], v[keep]
+        if not directed:
+            u, v = np.minimum(u, v), np.maximum(u, v)
+        keys = np.concatenate([keys, u * n + v])
+        keys.sort()  # sort + mask: much faster than np.unique's hashing on big int arrays
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    if len(keys) < m:
+        raise ValueError(f"Could not place {m} distinct edges, try a lower edgeCount")
+    if len(keys) > m:
+        keys = np.delete(keys, rng.choice(len(keys), len(keys) - m, replace=False))
+    return keys // n, keys % n
+
+
+def _erdos_renyi(rng, n, m, directed):
+    if 2 * m > max_edges(n, directed):
+        # dense: rejection would mostly redraw taken pairs, so pick among all of them
+        u, v = np.nonzero(~np.eye(n, dtype=bool) if directed else np.triu(np.ones((n, n), bool), 1))
+        pick = rng.choice(len(u), m, replace=False)
+        return u[pick], v[pick]
+    return _distinct_pairs(rng, n, m, directed, lambda size: (rng.integers(0, n, size), rng.integers(0, n, size)))
+
+
+def _scale_free(rng, n, m, directed, exponent):
+    # node i is drawn with probability ~ (i + 1) ** -a, a = 1 / (exponent - 1),
+    # which gives a power-law degree distribution with that exponent.  Draws
+    # invert the continuous version of that density instead of searching a
+    # V-entry CDF per draw.
+    b = 1.0 - 1.0 / (exponent - 1.0)
+    top = (n + 1.0) ** b - 1.0
+
+    def endpoints(size):
+        x = (rng.random(size) * top + 1.0) ** (1.0 / b)  # in [1, n + 1)
+        return np.minimum(x.astype(np.int64) - 1, n - 1)
+
+    return _distinct_pairs(rng, n, m, directed, lambda size: (endpoints(size), endpoints(size)))
+
+
+def _grid(rng, n, m, x, y):
+    rows = max(1, math.isqrt(n))
+    cols = -(-n // rows)
+    ids = np.arange(n)
+    right = ids[(ids % cols < cols - 1) & (ids + 1 < n)]
+    down = ids[ids + cols < n]
+    src = np.concatenate([right, down])
+    dst = np.concatenate([right + 1, down + cols])
+    if m is not None:
+        if m > len(src):
+            raise ValueError(f"A {rows}x{cols} grid has only {len(src)} edges")
+        keep = np.sort(rng.choice(len(src), m, replace=False))
+        src, dst = src[keep], dst[keep]
+    bx, by, w, h = BOX
+    x[:] = bx + (ids % cols) * (w / max(cols - 1, 1))
+    y[:] = by + (ids // cols) * (h / max(rows - 1, 1))
+    return src, dst  # directed grids point right and down
+
+
+def _close_pairs(x, y, r):
+    """All ``(i, j)``, ``i != j`` unordered, with points closer than ``r``, via an ``r``-cell grid."""
+    cx = ((x - x.min()) // r).astype(np.int64)
+    cy = ((y - y.min()) // r).astype(np.int64)
+    ncols = int(cx.max()) + 2  # the spare column keeps dx = -1 / +1 from wrapping onto a real cell
+    cell = cy * ncols + cx
+    order = np.argsort(cell)
+    cell = cell[order]
+    at = np.arange(len(cell))
+    us, vs = [], []
+    # the same cell and the four "forward" neighbours cover every close pair once
+    for dx, dy in ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)):
+        target = cell + dy * ncols + dx
+        lo = at + 1 if dx == dy == 0 else np.searchsorted(cell, target, "left")
+        hi = np.searchsorted(cell, target, "right")
+        count = np.maximum(hi - lo, 0)
+        i = np.repeat(at, count)
+        j = lo[i] + np.arange(len(i)) - np.repeat(np.cumsum(count) - count, count)
+        us.append(order[i])
+        vs.append(order[j])
+    u, v = np.concatenate(us), np.concatenate(vs)
+    length = np.hypot(x[u] - x[v], y[u] - y[v])
+    close = length < r
+    return u[close], v[close], length[close]
+
+
+def _geometric(rng, n, m, directed, x, y):
+    if m > max_edges(n, False):
+        raise ValueError(f"{n} points have only {max_edges(n, False)} distinct pairs")
+    if m == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+    _, _, w, h = BOX
+    # radius whose disc holds about 1.3 m pairs (the border loses some)
+    r = math.sqrt(2.6 * m * w * h / (math.pi * n * n))
+    while True:
+        u, v, length = _close_pairs(x, y, r)
+        if len(u) >= m:
+            break
+        r *= 1.5
+    keep = np.argpartition(length, m - 1)[:m] if m < len(length) else np.arange(m)
+    keep.sort()
+    u, v, length = u[keep], v[keep], length[keep]
+    if directed:  # each pair gets a random direction
+        flip = rng.random(m) < 0.5
+        u, v = np.where(flip, v, u), np.where(flip, u, v)
+    return u, v, np.round(length, 3)
+
+
+def generate(model: str, n: int, m: int | None = None, directed: bool = False,
+             max_weight: int = 10, seed: int = 0, exponent: float = 2.5) -> Generated:
+    """
+    Sample a ``model`` graph with ``n`` nodes and exactly ``m`` edges.
+
+    ``m`` is required except for ``grid``, which keeps its whole lattice
+    without one.  Weights are uniform integers in ``[1, max_weight]``,
+    except ``geometric`` where they are the edges' euclidean lengths (so A*
+    gets a tight heuristic).  Node positions fill server.js' layout box.
+    Bad parameters raise ValueError.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model '{model}', expected one of {', '.join(MODELS)}")
+    if n < 0 or (m is not None and m < 0):
+        raise ValueError("nodeCount and edgeCount must be non-negative")
+    if m is None and model != "grid":
+        raise ValueError(f"Model '{model}' needs an edgeCount")
+    if m is not None and m > max_edges(n, directed):
+        raise ValueError(f"{n} nodes have room for at most {max_edges(n, directed)} edges")
+    if max_weight < 1:
+        raise ValueError("maxWeight must be at least 1")
+    if model == "scale-free" and not exponent > 2:
+        raise ValueError("Scale-free exponent must be greater than 2")
+
+    rng = np.random.default_rng(seed)
+    x, y = _scatter(rng, n)
+    weight = None
+    if model == "erdos-renyi":
+        src, dst = _erdos_renyi(rng, n, m, directed)
+    elif model == "scale-free":
+        src, dst = _scale_free(rng, n, m, directed, exponent)
+    elif model == "grid":
+        src, dst = _grid(rng, n, m, x, y)
+    else:
+        src, dst, weight = _geometric(rng, n, m, directed, x, y)
+    if weight is None:
+        weight = rng.integers(1, max_weight + 1, len(src))
+    return Generated(src, dst, weight, x, y, directed)
@@ -0,0 +1,205 @@
+"""
+backend/algorithms/graph_core.py
+Compact graph representation shared by the Flask API and the pygame visualizer.
+
+Node names are interned to dense integer ids once, and adjacency is stored in
+CSR (compressed sparse row) form: the out-edges of node ``u`` are
+``targets[offsets[u]:offsets[u + 1]]`` with the matching ``weights``.  All
+three are flat ``array.array`` buffers, so a graph costs a few machine words
+per edge instead of a dict entry (plus key and value objects) per edge.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Mapping
+from itertools import accumulate, repeat
+
+import numpy as np
+
+
+class CSRGraph:
+    """Immutable, array-backed directed graph with interned node names."""
+
+    __slots__ = ("names", "index", "offsets", "targets", "weights", "_reverse")
+
+    def __init__(self, names: list, offsets: array, targets: array, weights: array):
+        self.names = names                                    # id -> name
+        self.index = {name: i for i, name in enumerate(names)}  # name -> id
+        self.offsets = offsets                                # len(names) + 1 entries
+        self.targets = targets                                # target id per edge
+        self.weights = weights                                # weight per edge
+
+    # ── construction ────────────────────────────────────────────────────
+    @classmethod
+    def from_adjacency(cls, adjacency: Mapping, nodes: Iterable = ()) -> "CSRGraph":
+        """
+        Build from ``{u: {v: weight}}`` (or ``{u: [v, ...]}`` for weight 1).
+
+        ``nodes`` lists extra node names that may have no out-edges (the
+        visualizer's ``edges`` dict only holds nodes that have some).  Targets
+        that are never listed as keys are interned as sink nodes.  Raises
+        TypeError for neighbours that are neither a mapping nor a list (a
+        string would otherwise be read one character per target).
+        """
+        names: list = []
+        index: dict = {}
+
+        def intern(name) -> int:
+            i = index.get(name)
+            if i is None:
+                i = index[name] = len(names)
+                names.append(name)
+            return i
+
+        for name in nodes:
+            intern(name)
+        for name in adjacency:
+            intern(name)
+
+        offsets = array("q", [0])
+        targets = array("i")
+        weights = array("q")  # widened to float on the first non-int weight
+
+        u = 0
+        while u < len(names):  # ``names`` grows as sink targets get interned
+            nbrs = adjacency.get(names[u], ())
+            if not isinstance(nbrs, (Mapping, list, tuple)):
+                raise TypeError(f"Neighbours of {names[u]!r} must be a mapping or a list")
+            before = len(targets)
+            try:
+                targets.extend(map(index.__getitem__, nbrs))
+            except KeyError:  # a sink target that isn't a key yet
+                del targets[before:]
+                targets.extend(map(intern, nbrs))
+            if isinstance(nbrs, Mapping):
+                try:
+                    weights.extend(nbrs.values())
+                except TypeError:  # float weight in an int array: widen and retry
+                    del weights[before:]
+                    weights = array("d", weights)
+                    weights.extend(nbrs.values())
+            else:
+                weights.extend([1] * (len(targets) - before))
+            offsets.append(len(targets))
+            u += 1
+
+        graph = cls.__new__(cls)
+        graph.names, graph.index = names, index
+        graph.offsets, graph.targets, graph.weights = offsets, targets, weights
+        return graph
+
+    @classmethod
+    def from_edges(cls, names: list, src, dst, weights) -> "CSRGraph":
+        """
+        Build from parallel NumPy arrays of source ids, target ids and weights
+        (ids index ``names``).  One argsort of ``src * n + dst`` groups the
+        edges by source; of parallel edges the lightest is kept.  Weights
+        that are all whole numbers are stored as ints, like
+        ``from_adjacency`` would.
+        """
+        n = len(names)
+        src, dst, weights = np.asarray(src), np.asarray(dst), np.asarray(weights)
+        key = src.astype(np.int64) * n + dst  # ids are int32, so this can't overflow
+        order = np.argsort(key)                # much faster than a two-key lexsort
+        key, weights = key[order], weights[order]
+        if len(key):
+            first = np.ones(len(key), dtype=bool)
+            first[1:] = key[1:] != key[:-1]
+            starts = np.flatnonzero(first)
+            weights = np.minimum.reduceat(weights, starts)
+            key = key[starts]
+        src, dst = np.divmod(key, n) if n else (key, key)
+        counts = np.bincount(src, minlength=n)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        graph = cls.__new__(cls)
+        graph.names = list(names)
+        graph.index = {name: i for i, name in enumerate(graph.names)}
+        graph.offsets = array("q", offsets.tobytes())
+        graph.targets = array("i", dst.astype(np.int32).tobytes())
+        if np.array_equal(weights, np.round(weights)):
+            graph.weights = array("q", weights.astype(np.int64).tobytes())
+        else:
+            graph.weights = array("d", weights.astype(np.float64).tobytes())
+        return graph
+
+    # ── queries ─────────────────────────────────────────────────────────
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self.index
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the CSR buffers (excludes the name table)."""
+        return sum(a.itemsize * len(a) for a in (self.offsets, self.targets, self.weights))
+
+    def id_of(self, name) -> int:
+        return self.index[name]
+
+    def degree(self, u: int) -> int:
+        return self.offsets[u + 1] - self.offsets[u]
+
+    def neighbors(self, u: int):
+        """Target ids of ``u``'s out-edges."""
+        return self.targets[self.offsets[u]:self.offsets[u + 1]]
+
+    def edges(self, u: int):
+        """``(target_id, weight)`` pairs of ``u``'s out-edges."""
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        return zip(self.targets[lo:hi], self.weights[lo:hi])
+
+    def reversed(self) -> "CSRGraph":
+        """
+        Same nodes and ids with every edge flipped (in-edges become out-edges).
+        Built once per graph and kept, since the graph never changes.
+        """
+        reverse = getattr(self, "_reverse", None)
+        if reverse is not None:
+            return reverse
+        n = len(self.names)
+        sources = array("i")
+        for u in range(n):
+            sources.extend(repeat(u, self.offsets[u + 1] - self.offsets[u]))
+        # a stable sort by target keeps each node's in-edges in source order
+        order = sorted(range(len(self.targets)), key=self.targets.__getitem__)
+        counts = [0] * (n + 1)
+        for v in self.targets:
+            counts[v + 1] += 1
+        graph = CSRGraph.__new__(CSRGraph)
+        graph.names, graph.index = self.names, self.index
+        graph.offsets = array("q", accumulate(counts))
+        graph.targets = array("i", map(sources.__getitem__, order))
+        graph.weights = array(self.weights.typecode, map(self.weights.__getitem__, order))
+        graph._reverse = self
+        self._reverse = graph
+        return graph
+
+    def to_adjacency(self) -> dict:
+        """Expand back to ``{u: {v: weight}}`` keyed by node name."""
+        names = self.names
+        return {
+            names[u]: {names[v]: w for v, w in self.edges(u)}
+            for u in range(len(names))
+        }
+
+
+def path_to(prev, target: int) -> list:
+    """Walk a predecessor array (``-1`` = none) back from ``target``."""
+    path = []
+    while target >= 0:
+        path.append(target)
+        target = prev[target]
+    path.reverse()
+    return path
+
+
+def as_csr(graph) -> CSRGraph:
+    """Return ``graph`` as a CSRGraph, converting adjacency dicts on the fly."""
+    return graph if isinstance(graph, CSRGraph) else CSRGraph.from_adjacency(graph)
@@ -0,0 +1,309 @@
+"""
+backend/algorithms/layout.py
+Force-directed node positions (Fruchterman-Reingold), vectorized with NumPy.
+
+Edges pull their ends together with ``d^2 / k`` and every pair of nodes
+pushes apart with ``k^2 / d``, ``k`` being the ideal edge length; each
+iteration moves every node along its net force by at most a temperature
+that cools linearly to zero.  Layouts are computed in a unit square and
+only scaled to the canvas at the end.
+
+Exact repulsion is O(V^2) per iteration, so above EXACT_MAX_NODES nodes it
+is approximated with two grids:
+
+    near  nodes closer than REACH ideal edge lengths repel exactly; in
+          crowded cells (hubs and their leaves) a node meets a sample of
+          NEAR_SAMPLE nodes per cell, weighted to stand for the rest
+    far   on a FAR_CELLS x FAR_CELLS grid every cell but the neighbouring
+          ones acts as one body of its node count, placed at its centroid
+          (pairs in neighbouring far cells but beyond REACH are left out)
+
+which costs O(V * NEAR_SAMPLE + FAR_CELLS^4) per iteration.  The grids
+are rebuilt every GRID_EVERY iterations only; nodes move little in
+between.  A pull to the centre keeps disconnected pieces from drifting
+apart.
+
+Plain FR from random positions folds big meshes over themselves, so a
+fresh layout is multilevel: the graph is coarsened by merging every node
+into a neighbour's cluster until a few dozen nodes remain, the coarsest
+graph is laid out, and each finer level starts from its clusters'
+positions.  Given ``positions``, the drawing is refined instead, with a
+cooler start; nodes without one start at random.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from .generators import BOX
+from .graph_core import as_csr
+
+ITERATIONS = 60             # iterations per level
+COARSE_ITERATIONS = 300     # iterations on the coarsest level, where they are cheap
+COARSEST_NODES = 50         # stop coarsening at about this many nodes
+MIN_SHRINK = 0.8            # ... or once a level keeps more than this fraction of its nodes
+EXACT_MAX_NODES = 600       # up to here every pair repels; beyond, the grid approximation
+REACH = 2.0                 # near field radius, in ideal edge lengths
+NEAR_SAMPLE = 8             # nodes per neighbouring cell each node repels exactly
+FAR_CELLS = 24              # far field grid is FAR_CELLS x FAR_CELLS
+FAR_PERCENTILES = (2, 98)   # range of node coordinates the far field grid covers
+GRID_EVERY = 5              # iterations between grid rebuilds
+START_TEMPERATURE = 0.1     # largest first move on the coarsest level, in unit-square units
+LEVEL_TEMPERATURE = 3.0     # largest first move on finer levels, in ideal edge lengths
+REFINE_TEMPERATURE = 0.02   # largest first move when starting from given positions
+GRAVITY = 1.0               # pull to the centre, per unit of distance
+MIN_DIST = 1e-9
+
+
+def force_layout(graph, positions: dict | None = None, iterations: int = ITERATIONS,
+                 seed: int = 0, box=BOX):
+    """
+    ``(x, y)`` arrays by node id, fitted (aspect kept, centred) into
+    ``box = (x, y, width, height)``.  Edge directions and weights are
+    ignored.  ``positions`` maps names to ``[x, y]`` or ``{"x", "y"}``
+    starting points.  The same ``seed`` gives the same layout.
+    Bad parameters raise ValueError.
+    """
+    graph = as_csr(graph)
+    if isinstance(iterations, bool) or not isinstance(iterations, int) or iterations < 0:
+        raise ValueError("Layout iterations must be a non-negative integer")
+    if positions is not None and not isinstance(positions, dict):
+        raise ValueError("Option 'positions' must map node names to [x, y]")
+    rng = np.random.default_rng(seed)
+    u, v = _undirected_edges(graph)
+    pos, given = _initial(graph, positions, rng)
+    if given:
+        _relax(pos, u, v, iterations, REFINE_TEMPERATURE, rng)
+    elif iterations:
+        pos = _multilevel(len(graph), u, v, iterations, rng)
+    return _fit(pos, box)
+
+
+def _initial(graph, positions, rng) -> tuple[np.ndarray, bool]:
+    """Unit-square start positions, and whether any came from ``positions``."""
+    n = len(graph)
+    pos = rng.random((n, 2))
+    if not positions:
+        return pos, False
+    known = np.zeros(n, dtype=bool)
+    for v, name in enumerate(graph.names):
+        p = positions.get(name)
+        if p is None:
+            continue
+        if isinstance(p, dict):
+            p = (p.get("x"), p.get("y"))
+        try:
+            pos[v] = float(p[0]), float(p[1])
+        except (TypeError, ValueError, IndexError):
+            raise ValueError(f"Bad position for node '{name}', expected [x, y]") from None
+        known[v] = True
+    if not known.any():
+        return pos, False
+    if not np.isfinite(pos[known]).all():
+        raise ValueError("Positions must be finite numbers")
+    lo = pos[known].min(axis=0)
+    span = max(float((pos[known].max(axis=0) - lo).max()), MIN_DIST)
+    pos[known] = (pos[known] - lo) / span
+    return pos, True
+
+
+def _undirected_edges(graph) -> tuple[np.ndarray, np.ndarray]:
+    """Each connected pair once, without self-loops."""
+    n = len(graph)
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(np.asarray(graph.offsets)))
+    return _pairs(n, src, np.asarray(graph.targets, dtype=np.int64))
+
+
+def _pairs(n: int, src, dst) -> tuple[np.ndarray, np.ndarray]:
+    keep = src != dst
+    lo, hi = np.minimum(src[keep], dst[keep]), np.maximum(src[keep], dst[keep])
+    key = np.unique(lo * max(n, 1) + hi)
+    return key // max(n, 1), key % max(n, 1)
+
+
+# ── multilevel ──────────────────────────────────────────────────────────
+
+def _coarsen(n: int, u, v, rng) -> tuple[int, np.ndarray]:
+    """
+    ``(clusters, cluster_of)``: every node joins the cluster of whichever
+    node of its closed neighbourhood has the smallest random key, so
+    clusters are stars of radius one and merged nodes are always adjacent.
+    """
+    key = rng.random(n)
+    best = np.arange(n)
+    for a, b in ((u, v), (v, u)):  # both directions of every edge
+        better = key[b] < key[best[a]]
+        # several edges of one node may improve it: keep the smallest key
+        order = np.argsort(key[b[better]])[::-1]
+        best[a[better][order]] = b[better][order]
+    labels, cluster_of = np.unique(best, return_inverse=True)
+    return len(labels), cluster_of
+
+
+def _multilevel(n: int, u, v, iterations: int, rng) -> np.ndarray:
+    levels = []  # (cluster_of, edges) of each finer level, finest first
+    size = n
+    while size > COARSEST_NODES:
+        coarse, cluster_of = _coarsen(size, u, v, rng)
+        if coarse > MIN_SHRINK * size:
+            break
+        levels.append((cluster_of, u, v))
+        u, v = _pairs(coarse, cluster_of[u], cluster_of[v])
+        size = coarse
+
+    pos = rng.random((size, 2))
+    # the coarsest level settles the overall shape; while it is small that's cheap
+    _relax(pos, u, v, max(iterations, COARSE_ITERATIONS) if size <= EXACT_MAX_NODES else iterations,
+           START_TEMPERATURE, rng)
+    for cluster_of, u, v in reversed(levels):
+        k = math.sqrt(1.0 / len(cluster_of))
+        pos = pos[cluster_of] + rng.normal(0.0, k / 4, (len(cluster_of), 2))
+        _relax(pos, u, v, iterations, LEVEL_TEMPERATURE * k, rng)
+    return pos
+
+
+# ── forces ──────────────────────────────────────────────────────────────
+
+def _relax(pos, u, v, iterations: int, temperature: float, rng) -> None:
+    """Run FR iterations on ``pos`` in place."""
+    n = len(pos)
+    if n < 2:
+        return
+    k = math.sqrt(1.0 / n)
+    grid = None
+    for i in range(iterations):
+        x, y = pos[:, 0].copy(), pos[:, 1].copy()
+        if n <= EXACT_MAX_NODES:
+            fx, fy = _repulsion(x, y, k)
+        else:
+            if i % GRID_EVERY == 0:
+                grid = _Grid(x, y, REACH * k, rng)
+            fx, fy = grid.repulsion(x, y, k)
+        dx, dy = x[u] - x[v], y[u] - y[v]
+        pull = np.hypot(dx, dy) / k
+        dx *= pull
+        dy *= pull
+        fx += np.bincount(v, dx, n) - np.bincount(u, dx, n)
+        fy += np.bincount(v, dy, n) - np.bincount(u, dy, n)
+        fx -= GRAVITY * (x - x.mean())
+        fy -= GRAVITY * (y - y.mean())
+        length = np.maximum(np.hypot(fx, fy), MIN_DIST)
+        scale = np.minimum(length, temperature * (1 - i / iterations)) / length
+        pos[:, 0] += fx * scale
+        pos[:, 1] += fy * scale
+
+
+def _repulsion(x, y, k) -> tuple[np.ndarray, np.ndarray]:
+    """Every pair, exactly."""
+    dx = x[:, None] - x[None, :]
+    dy = y[:, None] - y[None, :]
+    w = np.maximum(dx * dx + dy * dy, MIN_DIST)
+    np.fill_diagonal(w, np.inf)
+    w = (k * k) / w
+    return (dx * w).sum(axis=1), (dy * w).sum(axis=1)
+
+
+class _Grid:
+    """
+    Both grids of one rebuild.  Near field: nodes hashed into cells of
+    width ``reach`` (only occupied cells exist, however far apart), and
+    for every node up to NEAR_SAMPLE nodes of each of the nine cells
+    around it, weighted by how many of the cell's nodes they stand for.
+    Far field: FAR_CELLS x FAR_CELLS cells over the bulk of the nodes.
+    """
+
+    __slots__ = ("n", "reach", "order", "i", "j", "weight", "cell", "occupied", "mass", "slot", "far")
+
+    def __init__(self, x, y, reach: float, rng):
+        n = self.n = len(x)
+        self.reach = reach
+        cx = ((x - x.min()) / reach).astype(np.int64)
+        cy = ((y - y.min()) / reach).astype(np.int64)
+        stride = int(cy.max()) + 2  # an empty row between columns: no wrap-around
+        key = cx * stride + cy
+        # pairs are built between ranks in cell order, so the pairs of one
+        # cell read neighbouring memory
+        order = self.order = np.argsort(key, kind="stable")
+        key = key[order]
+        keys, starts, counts = np.unique(key, return_index=True, return_counts=True)
+
+        ids = np.arange(n)
+        pi, pj, pw = [], [], []
+        for ox in (-1, 0, 1):
+            for oy in (-1, 0, 1):
+                want = key + (ox * stride + oy)
+                at = np.minimum(np.searchsorted(keys, want), len(keys) - 1)
+                ok = keys[at] == want
+                other = at[ok]
+                sizes = counts[other]
+                take = np.minimum(sizes, NEAR_SAMPLE)
+                # node i takes ``take`` consecutive nodes of the other cell,
+                # from a random one on, wrapping around
+                first = np.repeat(np.cumsum(take) - take, take)
+                turn = np.repeat(rng.integers(0, sizes), take) + np.arange(len(first)) - first
+                pi.append(np.repeat(ids[ok], take))
+                pj.append(np.repeat(starts[other], take) + turn % np.repeat(sizes, take))
+                pw.append(np.repeat(sizes / take, take))
+        self.i, self.j, self.weight = np.concatenate(pi), np.concatenate(pj), np.concatenate(pw)
+        self.weight[self.i == self.j] = 0.0
+
+        g = FAR_CELLS
+        # the far grid spans the bulk of the nodes; outliers (isolated nodes,
+        # small components) share the border cells instead of stretching every cell
+        (x0, x1), (y0, y1) = np.percentile(x, FAR_PERCENTILES), np.percentile(y, FAR_PERCENTILES)
+        span = max(float(x1 - x0), float(y1 - y0), MIN_DIST)
+        cx = np.clip(((x - x0) * (g / span)).astype(np.int64), 0, g - 1)
+        cy = np.clip(((y - y0) * (g / span)).astype(np.int64), 0, g - 1)
+        cell = self.cell = cx * g + cy
+        counts = np.bincount(cell, minlength=g * g)
+        occupied = self.occupied = np.flatnonzero(counts)
+        self.mass = counts[occupied].astype(np.float64)
+        self.slot = np.zeros(g * g, dtype=np.int64)
+        self.slot[occupied] = np.arange(len(occupied))
+        gx, gy = occupied // g, occupied % g
+        # far[a, b]: the node count of cell b if it isn't a neighbour of cell a
+        # (then b acts on a as one body), else 0
+        far = (np.abs(gx[:, None] - gx[None, :]) > 1) | (np.abs(gy[:, None] - gy[None, :]) > 1)
+        self.far = far * self.mass
+
+    def repulsion(self, x, y, k) -> tuple[np.ndarray, np.ndarray]:
+        n, i, j, order = self.n, self.i, self.j, self.order
+        xs, ys = x[order], y[order]
+        dx, dy = xs[i] - xs[j], ys[i] - ys[j]
+        d2 = dx * dx
+        d2 += dy * dy
+        np.maximum(d2, MIN_DIST, out=d2)
+        w = self.weight / d2
+        w[d2 >= self.reach * self.reach] = 0.0
+        dx *= w
+        dy *= w
+        fx, fy = np.empty(n), np.empty(n)
+        fx[order] = np.bincount(i, dx, n)
+        fy[order] = np.bincount(i, dy, n)
+
+        size = FAR_CELLS * FAR_CELLS
+        cx = np.bincount(self.cell, x, size)[self.occupied] / self.mass
+        cy = np.bincount(self.cell, y, size)[self.occupied] / self.mass
+        dx = cx[:, None] - cx[None, :]
+        dy = cy[:, None] - cy[None, :]
+        d2 = dx * dx
+        d2 += dy * dy
+        np.maximum(d2, MIN_DIST, out=d2)
+        w = self.far / d2
+        slot = self.slot[self.cell]
+        fx += (dx * w).sum(axis=1)[slot]
+        fy += (dy * w).sum(axis=1)[slot]
+        return fx * (k * k), fy * (k * k)
+
+
+def _fit(pos, box) -> tuple[np.ndarray, np.ndarray]:
+    bx, by, width, height = box
+    if len(pos) < 2:  # nothing to spread: the middle of the box
+        return np.full(len(pos), bx + width / 2), np.full(len(pos), by + height / 2)
+    lo = pos.min(axis=0)
+    span = np.maximum(pos.max(axis=0) - lo, MIN_DIST)
+    scale = min(width / span[0], height / span[1])
+    x = bx + (width - span[0] * scale) / 2 + (pos[:, 0] - lo[0]) * scale
+    y = by + (height - span[1] * scale) / 2 + (pos[:, 1] - lo[1]) * scale
+    return x, y
@@ -0,0 +1,143 @@
+"""
+backend/algorithms/mst.py
+Minimum spanning trees over a CSRGraph, treating every edge as undirected.
+
+    prim()     grows one tree at a time from a heap of crossing edges
+    kruskal()  merges components in weight order with a union-find
+
+Both return ``{"mst": [{"from", "to", "weight"}], "totalWeight"}`` like
+graph.js.  On a disconnected graph they return a minimum spanning forest
+(graph.js' prim() stopped at the first component).
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from itertools import repeat
+
+import numpy as np
+
+from .graph_core import as_csr
+
+
+def _edge(names, u: int, v: int, w) -> dict:
+    return {"from": names[u], "to": names[v], "weight": w}
+
+
+def prim(graph, start=None, end=None):
+    """
+    Step generator: one trace delta per node joining the tree, with ``"r"``
+    holding the improved connection costs of the nodes next to it.  The
+    first tree grows from ``start`` (the first node by default), later ones
+    from the lowest unreached id.  ``end`` is unused.
+
+    Keys are kept per node and stale heap entries skipped, so the heap holds
+    at most one live entry per node instead of one per edge.
+    """
+    graph = as_csr(graph)
+    s = graph.id_of(start) if start is not None else 0
+    return _prim_steps(graph, graph.reversed(), s)
+
+
+def _prim_steps(graph, reverse, s):
+    names = graph.names
+    n = len(graph)
+    key = [math.inf] * n
+    link = [-1] * n      # tree node each node would hang from
+    in_tree = bytearray(n)
+    mst, total = [], 0
+    root, scan = s, 0
+
+    while root < n:
+        key[root] = 0
+        heap = [(0, root)]
+        while heap:
+            _, u = heapq.heappop(heap)
+            if in_tree[u]:
+                continue  # stale entry, u joined through a cheaper edge
+            in_tree[u] = 1
+            if link[u] >= 0:
+                mst.append(_edge(names, link[u], u, key[u]))
+                total += key[u]
+
+            frontier, relaxed = [], []
+            for side in (graph, reverse):  # out- and in-edges: undirected
+                for v, w in side.edges(u):
+                    if not in_tree[v] and w < key[v]:
+                        if key[v] == math.inf:
+                            frontier.append(v)
+                        key[v] = w
+                        link[v] = u
+                        heapq.heappush(heap, (w, v))
+                        relaxed.append((v, w))
+            yield {"c": u, "f": frontier, "r": relaxed, "n": graph.neighbors(u)}
+
+        if len(mst) == n - 1:
+            break
+        while scan < n and in_tree[scan]:  # one pass over the ids for all trees
+            scan += 1
+        root = scan
+
+    return {"mst": mst, "totalWeight": total}
+
+
+def kruskal(graph, start=None, end=None):
+    """
+    Step generator: one trace delta per endpoint an accepted edge brings
+    into the forest (``"n"`` is the endpoint it was joined to).  ``start``
+    and ``end`` are unused.
+
+    Edges are ordered by one stable NumPy argsort of the weight array, and
+    the union-find uses path compression and union by rank, so checking an
+    edge is effectively O(1).  The scan stops once V - 1 edges are in.
+    """
+    graph = as_csr(graph)
+    return _kruskal_steps(graph)
+
+
+def _kruskal_steps(graph):
+    names = graph.names
+    n = len(graph)
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    sources = array("i")
+    for u in range(n):
+        sources.extend(repeat(u, offsets[u + 1] - offsets[u]))
+    order = np.argsort(np.asarray(weights), kind="stable").tolist()
+
+    parent = list(range(n))
+    rank = bytearray(n)  # ranks stay below log2(V) < 256
+
+    def find(x: int) -> int:
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:  # path compression
+            parent[x], x = root, parent[x]
+        return root
+
+    touched = bytearray(n)
+    mst, total = [], 0
+    for i in order:
+        if len(mst) == n - 1:
+            break
+        u, v = sources[i], targets[i]
+        ru, rv = find(u), find(v)
+        if ru == rv:
+            continue  # would close a cycle (covers self-loops and reverse twins)
+        if rank[ru] < rank[rv]:  # union by rank
+            ru, rv = rv, ru
+        parent[rv] = ru
+        if rank[ru] == rank[rv]:
+            rank[ru] += 1
+
+        w = weights[i]
+        mst.append(_edge(names, u, v, w))
+        total += w
+        # report the endpoints that are new to the forest; an edge joining
+        # two existing trees is reported on its ``to`` end
+        for a, b in [(a, b) for a, b in ((u, v), (v, u)) if not touched[a]] or [(v, u)]:
+            touched[a] = 1
+            yield {"c": a, "n": [b]}
+
+    return {"mst": mst, "totalWeight": total}
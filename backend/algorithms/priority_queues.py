@@ -0,0 +1,98 @@
+"""
+backend/algorithms/priority_queues.py
+Priority queues for Dijkstra-style searches.
+
+Both use lazy deletion: a decrease-key is just another push, and the search
+skips entries for nodes that were already settled when they come back out.
+
+    HeapQueue   binary heap (heapq), any non-negative weights
+    RadixHeap   monotone integer queue, O(log C) amortised per op for
+                integer weights -- what the visualizer produces via int()
+"""
+from __future__ import annotations
+
+import heapq
+
+QUEUE_KINDS = ("heap", "radix")
+
+
+class HeapQueue:
+    __slots__ = ("_heap",)
+
+    def __init__(self):
+        self._heap = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, key, item: int) -> None:
+        heapq.heappush(self._heap, (key, item))
+
+    def pop(self) -> tuple:
+        return heapq.heappop(self._heap)
+
+    def items(self):
+        """Queued items in no particular order (may include stale entries)."""
+        return (item for _, item in self._heap)
+
+
+class RadixHeap:
+    """
+    Monotone priority queue for non-negative integer keys.
+
+    Keys are bucketed by the highest bit in which they differ from the last
+    popped key.  Popping only redistributes the smallest non-empty bucket,
+    and every entry moves to a strictly lower bucket each time, so the total
+    work is O(log C) per entry.  Pushing a key below the last popped key is
+    not allowed, which Dijkstra never does with non-negative weights.
+    """
+
+    __slots__ = ("_buckets", "_last", "_size")
+
+    def __init__(self):
+        self._buckets = [[] for _ in range(65)]
+        self._last = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, key: int, item: int) -> None:
+        b = (key ^ self._last).bit_length()
+        if b >= len(self._buckets):  # python ints are unbounded
+            self._buckets.extend([] for _ in range(b + 1 - len(self._buckets)))
+        self._buckets[b].append((key, item))
+        self._size += 1
+
+    def pop(self) -> tuple:
+        buckets = self._buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            bucket = buckets[i]
+            last = self._last = min(key for key, _ in bucket)
+            for entry in bucket:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+            bucket.clear()
+        self._size -= 1
+        return buckets[0].pop()
+
+    def items(self):
+        return (item for bucket in self._buckets for _, item in bucket)
+
+
+def make_queue(kind: str, weights=None):
+    """
+    Build a queue by name.  ``radix`` needs integer weights, so ``weights``
+    (a CSRGraph weight array) is checked when given.
+    """
+    if kind == "heap":
+        return HeapQueue()
+    if kind == "radix":
+        if weights is not None and (
+            weights.typecode not in "bBhHiIlLqQ" or (len(weights) and min(weights) < 0)
+        ):
+            raise ValueError("The radix queue needs non-negative integer edge weights")
+        return RadixHeap()
+    raise ValueError(f"Unknown queue '{kind}', expected one of {', '.join(QUEUE_KINDS)}")
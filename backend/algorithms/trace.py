@@ -0,0 +1,154 @@
+"""
+backend/algorithms/trace.py
+Delta-encoded step traces.
+
+Step generators don't yield full ``visited`` / ``queue`` snapshots; each
+step only records what changed, keyed by node id:
+
+    "c"  current node -- expanded (and settled) in this step
+    "f"  node ids that entered the frontier (queue / stack / heap)
+    "r"  ``[id, distance]`` pairs whose tentative distance improved
+    "n"  out-neighbours of the current node (for highlighting)
+    "s"  1 on steps of the backward half of a bidirectional search
+
+Settling implies leaving the frontier, so a full run costs O(V + E) instead
+of O(V^2).  ``TraceState`` replays steps, and ``record`` adds a keyframe
+(the full state) every so often so clients can seek without replaying from
+step 0.  Keyframes hold ``visited`` as a base64 bitmap plus the frontier and
+its tentative distances; settled nodes' distances are final and come back
+in the run's result.
+"""
+from __future__ import annotations
+
+import base64
+
+TRACE_FORMAT = "delta-v1"
+# operation counters ``record`` can keep, read off each step's delta:
+#   steps     steps yielded, i.e. nodes expanded ("c")
+#   frontier  frontier insertions ("f"): queue / stack pushes, first heap pushes
+#   relaxed   improved tentative distances ("r"); each is a heap push for
+#             Dijkstra, A* and Prim
+#   scanned   out-edges looked at ("n")
+OP_COUNTERS = ("steps", "frontier", "relaxed", "scanned")
+MIN_KEYFRAME_EVERY = 1024
+KEYFRAMES_PER_RUN = 8  # aim: about this many keyframes for a full sweep
+
+
+def keyframe_interval(num_nodes: int) -> int:
+    return max(MIN_KEYFRAME_EVERY, num_nodes // KEYFRAMES_PER_RUN)
+
+
+def compact(step: dict) -> dict:
+    """Wire form of a generator step: drop empty fields, arrays -> lists."""
+    return {
+        k: (v if isinstance(v, int) else list(v))
+        for k, v in step.items() if isinstance(v, int) or len(v)
+    }
+
+
+class TraceState:
+    """Visual state reconstructed by applying deltas in order."""
+
+    __slots__ = ("current", "visited", "frontier", "distances", "neighbors", "step")
+
+    def __init__(self, num_nodes: int):
+        self.current = -1
+        self.visited = bytearray(num_nodes)
+        self.frontier = set()
+        self.distances = {}   # tentative distances of frontier nodes
+        self.neighbors = ()
+        self.step = -1        # index of the last applied step
+
+    def apply(self, step: dict) -> None:
+        c = step["c"]
+        self.current = c
+        self.visited[c] = 1
+        self.frontier.discard(c)
+        self.distances.pop(c, None)  # final now, the result carries it
+        self.frontier.update(step.get("f", ()))
+        for v, d in step.get("r", ()):
+            self.distances[v] = d
+        self.neighbors = frozenset(step.get("n", ()))
+        self.step += 1
+
+    # ── keyframes ───────────────────────────────────────────────────────
+    def keyframe(self) -> dict:
+        bits = bytearray((len(self.visited) + 7) // 8)
+        for v, seen in enumerate(self.visited):
+            if seen:
+                bits[v >> 3] |= 1 << (v & 7)
+        return {
+            "step": self.step,
+            "visited": base64.b64encode(bits).decode("ascii"),
+            "frontier": sorted(self.frontier),
+            "distances": sorted(self.distances.items()),
+        }
+
+    def restore(self, keyframe: dict, step: dict | None = None) -> None:
+        """Jump to a keyframe; ``step`` is the step it was taken after."""
+        bits = base64.b64decode(keyframe["visited"])
+        self.visited = bytearray((bits[v >> 3] >> (v & 7)) & 1 for v in range(len(self.visited)))
+        self.frontier = set(keyframe["frontier"])
+        self.distances = dict(keyframe["distances"])
+        self.current = step["c"] if step else -1
+        self.neighbors = frozenset(step.get("n", ())) if step else ()
+        self.step = keyframe["step"]
+
+    def seek(self, trace: dict, index: int) -> None:
+        """Move to the state after ``trace["steps"][index]``."""
+        steps = trace["steps"]
+        base = None
+        for kf in trace["keyframes"]:  # in step order, and there are few of them
+            if kf["step"] <= index:
+                base = kf
+        # replay from whichever is closer: where we are now or the keyframe
+        if index < self.step or (base is not None and base["step"] > self.step):
+            if base is None:
+                self.__init__(len(self.visited))
+            else:
+                self.restore(base, steps[base["step"]])
+        for i in range(self.step + 1, index + 1):
+            self.apply(steps[i])
+
+
+def record(steps, num_nodes: int, every: int | None = None, counts: dict | None = None):
+    """
+    Drive a step generator, yielding ``("step", compact_step)`` records and a
+    ``("keyframe", keyframe)`` record after every ``every`` steps.  Returns
+    the generator's own return value.  ``counts``, if given, gets the
+    OP_COUNTERS totals, also when the run stops early.
+    """
+    every = every or keyframe_interval(num_nodes)
+    state = TraceState(num_nodes)
+    frontier = relaxed = scanned = 0
+    try:
+        while True:
+            try:
+                step = next(steps)
+            except StopIteration as stop:
+                return stop.value
+            step = compact(step)
+            state.apply(step)
+            if counts is not None:
+                frontier += len(step.get("f", ()))
+                relaxed += len(step.get("r", ()))
+                scanned += len(step.get("n", ()))
+            yield "step", step
+            if (state.step + 1) % every == 0:
+                yield "keyframe", state.keyframe()
+    finally:
+        steps.close()  # closing the recorder (e.g. client gone) stops the algorithm too
+        if counts is not None:
+            counts.update(steps=state.step + 1, frontier=frontier, relaxed=relaxed, scanned=scanned)
+
+
+def encode_trace(steps, names: list, every: int | None = None, counts: dict | None = None):
+    """Run a step generator to completion; return ``(trace, result)``."""
+    trace = {"format": TRACE_FORMAT, "nodes": names, "steps": [], "keyframes": []}
+    records = record(steps, len(names), every, counts)
+    while True:
+        try:
+            kind, payload = next(records)
+        except StopIteration as stop:
+            return trace, stop.value
+        trace["steps" if kind == "step" else "keyframes"].append(payload)
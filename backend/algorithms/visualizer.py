@@ -1,8 +1,20 @@
-import pygame, sys, math
+# run from the repo root:  python -m backend.algorithms.visualizer
+# keys: E place edges, SPACE step, P auto-play (+ / - speed), R re-run Dijkstra,
+#       A / I point-to-point searches, G load a few thousand nodes, T timing overlay,
+#       L force-directed relayout (Shift+L refines the current one)
+import pygame, sys, math, time
 from collections import defaultdict
-from dijkstra import dijkstra  # Ensure this file has the correct implementation
-from DFS import dfs
-from BFS import bfs
+from functools import lru_cache
+from backend.algorithms.astar import astar
+from backend.algorithms.bidirectional import bidirectional_dijkstra
+from backend.algorithms.dijkstra import dijkstra
+from backend.algorithms.dfs import dfs
+from backend.algorithms.dynamic_sssp import DynamicSSSP
+from backend.algorithms.generators import BOX, generate, node_name, node_names
+from backend.algorithms.bfs import bfs
+from backend.algorithms.graph_core import CSRGraph
+from backend.algorithms.layout import force_layout
+from backend.algorithms.trace import TraceState
 
 pygame.init() # initialization
 
@@ -25,9 +37,15 @@ CARD_FONT = pygame.font.SysFont(None, 40) # font of card titles
 
 # ── graph data ──────────────────────────────────────────────────────────────
 nodes = []  # each node contains position name and color { "x","y","name","color" }
+node_index = {} # name -> node, so edges find their endpoints without a scan
 edges = defaultdict(dict) # store edges as a dictionary
 NODE_R = 20
 node_counter = 0 # num of nodes
+GENERATED_NODES = 2000 # size of the stress-test graph the G key loads
+
+# hit-testing grid: a click can only land on nodes centred in its 3x3 block of cells
+CELL = 2 * NODE_R
+grid = defaultdict(list) # (cell x, cell y) -> nodes centred in that cell
 
 # ── edge-weight input state ────────────────────────────────────────────────
 inputting_weight = False
@@ -46,17 +64,71 @@ waiting_for_DFS = False
 placing_edges = False
 selected_node = None
 
+# ── rendering state ─────────────────────────────────────────────────────────
+FPS = 60
+scene = pygame.Surface((WIDTH, HEIGHT)) # background, edges, weights and buttons
+scene_dirty = True  # graph or page changed: rebuild the scene and repaint everything
+DIRTY_MAX = 200     # more changed nodes than this in one frame: repaint everything instead
+overlays = []       # (surface, rect) of the prompt / timing text drawn on top last frame
+show_timing = False # T toggles the per-frame timing overlay
+frame_ms = 0.0      # CPU time of the last frame (events, steps, drawing), excluding the tick wait
+last_rects = 0      # rects repainted last frame, None after a full repaint
+back_rect = run_rect = None
+
+# ── auto-play ───────────────────────────────────────────────────────────────
+# steps are paced by elapsed time, not frames, so the replay speed is the
+# same at any frame rate; P toggles it, + / - double or halve the rate
+autoplay = False
+STEP_RATE = 8.0     # steps per second
+step_budget = 0.0   # fractional steps owed to the replay
+MAX_STEPS_PER_FRAME = 500
+
 # ── helper fns ──────────────────────────────────────────────────────────────
 def dist(p1, p2):
     return math.hypot(p1[0]-p2[0], p1[1]-p2[1]) # distance to calculate the edge
 
+# text surfaces are rendered once per (text, colour, font): FONT.render was
+# most of a frame when every label and weight was redrawn from scratch
+@lru_cache(maxsize=8192)
+def text(s, color, font=FONT):
+    return font.render(s, True, color)
+
+def cell_of(x, y):
+    return int(x) // CELL, int(y) // CELL
+
+def add_node(name, x, y):
+    n = {"x": x, "y": y, "name": name, "color": BLUE, "order": len(nodes)}
+    nodes.append(n)
+    node_index[name] = n
+    grid[cell_of(x, y)].append(n)
+    return n
+
+def clear_graph():
+    nodes.clear(); node_index.clear(); grid.clear(); edges.clear()
+
 # takes position from mouse click
 def node_at(pos):
-    for n in nodes:
-        if dist((n["x"], n["y"]), pos) <= NODE_R: # less than or equal to node radius
-            return n
+    cx, cy = cell_of(*pos)
+    for gx in (cx - 1, cx, cx + 1):
+        for gy in (cy - 1, cy, cy + 1):
+            for n in grid.get((gx, gy), ()):
+                if dist((n["x"], n["y"]), pos) <= NODE_R: # less than or equal to node radius
+                    return n
     return None
 
+def nodes_near(rect):
+    """Nodes whose drawn area may overlap ``rect``, in drawing order."""
+    x0, y0 = cell_of(rect.left - 2 * CELL, rect.top - 2 * CELL) # labels reach past the circle
+    x1, y1 = cell_of(rect.right + 2 * CELL, rect.bottom + CELL)
+    found = [n for gx in range(x0, x1 + 1) for gy in range(y0, y1 + 1)
+             for n in grid.get((gx, gy), ()) if n["rect"].colliderect(rect)]
+    found.sort(key=lambda n: n["order"])
+    return found
+
+# freeze the editable name-keyed edges into a CSR graph for the algorithms
+def build_graph():
+    return CSRGraph.from_adjacency(edges, nodes=(n["name"] for n in nodes))
+
 def draw_arrow(surface, start, end, color, width=2, arrow_size=8):
     pygame.draw.line(surface, color, start, end, width)
 
@@ -76,139 +148,202 @@ def draw_arrow(surface, start, end, color, width=2, arrow_size=8):
     )
     pygame.draw.polygon(surface, color, [arrow_tip, left, right])
 
-def draw():
-    screen.fill(WHITE)
-
-    edge_text = FONT.render("Toggle edge placing using E", True, BLACK)
-    screen.blit(edge_text, (WIDTH -20 - edge_text.get_width(), HEIGHT -20 - edge_text.get_height()))
-
-    # iterate over all nodes and check their state
-    for n in nodes:
-        name = n["name"]
-
-        # ➊ Highlight the first endpoint while placing an edge
-        if placing_edges and selected_node and name == selected_node["name"]:
-            n["color"] = YELLOW
-
-        # ➋ Existing colouring for algorithm visualisers
-        elif visualizing_dijkstra and current_step:
-            if name == current_step["current"]:
-                n["color"] = YELLOW
-            elif name in current_step["visited"]:
-                n["color"] = GREEN
-            elif name in current_step["neighbors"]:
-                n["color"] = (100, 180, 255)
-            elif name in current_step["queue"]:
-                n["color"] = RED
-            else:
-                n["color"] = BLUE
-
-        elif visualizing_dfs and current_step:
-            if name == current_step["current"]:
-                n["color"] = YELLOW
-            elif name in current_step["visited"]:
-                n["color"] = GREEN
-            elif name in current_step["neighbors"]:
-                n["color"] = (100, 180, 255)
-            elif name in current_step["stack"]:
-                n["color"] = RED
-            else:
-                n["color"] = BLUE
-        elif visualizing_bfs and current_step:
-            if name == current_step["current"]:
-                n["color"] = YELLOW
-            elif name in current_step["visited"]:
-                n["color"] = GREEN
-            elif name in current_step["neighbors"]:
-                n["color"] = (100, 180, 255)
-            elif name in current_step["queue"]:
-                n["color"] = RED
-            else:
-                n["color"] = BLUE
-
-        else:
-            # don’t overwrite the yellow highlight while placing_edges
-            if not (placing_edges and selected_node and name == selected_node["name"]):
-                n["color"] = BLUE
-
-        # draw the circle & label
-        pygame.draw.circle(screen, n["color"], (n["x"], n["y"]), NODE_R)
-        txt = FONT.render(name, True, WHITE)
-        screen.blit(txt, (n["x"] - 8, n["y"] - 8))
-
+def build_scene():
+    """Everything that only changes when the graph or page does, drawn once into ``scene``."""
+    global back_rect, run_rect, scene_dirty
+    scene.fill(WHITE)
 
+    hint = text("Toggle edge placing using E, timing using T", BLACK)
+    scene.blit(hint, (WIDTH -20 - hint.get_width(), HEIGHT -20 - hint.get_height()))
 
     for u in edges:
+        a = node_index[u]
         for v, w in edges[u].items():
-            ux, uy = next((n["x"], n["y"]) for n in nodes if n["name"] == u)
-            vx, vy = next((n["x"], n["y"]) for n in nodes if n["name"] == v)
+            b = node_index[v]
+            ux, uy, vx, vy = a["x"], a["y"], b["x"], b["y"]
 
             length = dist((ux, uy), (vx, vy))
+            if length <= NODE_R + 4:
+                continue # overlapping nodes: nothing to see
             offset_ratio = (NODE_R + 4) / length  # adjust the 4 for spacing
             vx_adj = ux + (vx - ux) * (1 - offset_ratio)
             vy_adj = uy + (vy - uy) * (1 - offset_ratio)
 
-            #draw_arrow(screen, (ux, uy), (vx - 4, vy 4), color=BLACK, width=2)
-            draw_arrow(screen, (ux+3, uy+3), (vx-3, vy-3), color=BLACK, width=2)
+            # nodes are drawn over the edges, so the arrow stops at v's rim
+            draw_arrow(scene, (ux, uy), (vx_adj, vy_adj), color=BLACK, width=2)
 
             mx, my = (ux + vx) // 2, (uy + vy) // 2
-            screen.blit(FONT.render(str(w), True, RED), (mx, my))
-
-
+            scene.blit(text(str(w), RED), (mx, my))
+
+    back_rect = draw_back_button(scene)
+    if selected_page == "Dijkstras Shortest Path":
+        run_rect = draw_run_dijkstra(scene)
+    elif selected_page == "Depth First Search":
+        run_rect = draw_run_DFS(scene)
+    else:
+        run_rect = draw_run_BFS(scene)
+    scene_dirty = False
+
+def node_look(n):
+    """(colour, distance label) node ``n`` should be drawn with right now."""
+    name = n["name"]
+    # ➊ Highlight the first endpoint while placing an edge
+    if placing_edges and selected_node is n:
+        color = YELLOW
+
+    # ➋ Colouring for the algorithm visualisers, replayed from trace deltas
+    elif (visualizing_dijkstra or visualizing_dfs or visualizing_bfs) and trace_state:
+        i = graph.index.get(name, -1)  # nodes added mid-run aren't in the snapshot
+        if i < 0:
+            color = BLUE
+        elif i == trace_state.current:
+            color = YELLOW
+        elif trace_state.visited[i]:
+            color = GREEN
+        elif i in trace_state.neighbors:
+            color = (100, 180, 255)
+        elif i in trace_state.frontier:  # queue / stack / heap
+            color = RED
+        else:
+            color = BLUE
+    else:
+        color = BLUE
+
+    # shortest distance from the last Dijkstra start, kept current across edits
+    label = None
+    if sssp is not None and name in sssp.dist:
+        d = sssp.dist[name]
+        label = "inf" if d == math.inf else str(d)
+    return color, label
+
+def node_rect(n, label):
+    rect = pygame.Rect(n["x"] - NODE_R, n["y"] - NODE_R, 2 * NODE_R + 1, 2 * NODE_R + 1)
+    if label is not None:
+        rect.union_ip(text(label, BLACK).get_rect(midtop=(n["x"], n["y"] + NODE_R + 2)))
+    return rect
+
+def draw_node(n):
+    color, label = n["look"]
+    pygame.draw.circle(screen, color, (n["x"], n["y"]), NODE_R)
+    screen.blit(text(n["name"], WHITE), (n["x"] - 8, n["y"] - 8))
+    if label is not None:
+        surf = text(label, BLACK)
+        screen.blit(surf, (n["x"] - surf.get_width() // 2, n["y"] + NODE_R + 2))
+
+def overlay_texts():
+    """Prompt line and timing overlay, drawn over everything else."""
+    texts = []
     if inputting_weight:
         msg = f"Weight {pending_edge[0]} -> {pending_edge[1]}: {weight_text}"
-        screen.blit(FONT.render(msg, True, BLACK), (200, HEIGHT-40))
-
-    if waiting_for_dijkstra or waiting_for_DFS or waiting_for_BFS:
-        text = FONT.render("Pick a starting node", True, BLACK)
-        screen.blit(text, (250, HEIGHT - 40))
+        texts.append((FONT.render(msg, True, BLACK), (200, HEIGHT-40)))
+    elif waiting_for_dijkstra or waiting_for_DFS or waiting_for_BFS:
+        texts.append((text("Pick a starting node", BLACK), (250, HEIGHT - 40)))
+    elif p2p_algo:
+        prompt = "Pick a starting node" if p2p_start is None else "Pick the end node"
+        texts.append((text(f"{p2p_algo}: {prompt}", BLACK), (250, HEIGHT - 40)))
+    elif last_result and "expanded" in last_result:
+        texts.append((text(f"Expanded {last_result['expanded']} nodes", BLACK), (250, HEIGHT - 40)))
+    if show_timing:
+        rects = "full" if last_rects is None else f"{last_rects} rects"
+        msg = (f"{clock.get_fps():4.0f} fps  {frame_ms:5.2f} ms/frame  {rects}  "
+               f"{len(nodes)} nodes  {sum(map(len, edges.values()))} edges"
+               + (f"  auto {STEP_RATE:g}/s" if autoplay else ""))
+        surf = FONT.render(msg, True, BLACK, WHITE) # changes every frame: not worth caching
+        texts.append((surf, (WIDTH - 10 - surf.get_width(), 70)))
+    return [(surf, surf.get_rect(topleft=pos)) for surf, pos in texts]
 
-
-    pygame.display.flip()
-
-def draw_card(y, text):
+def draw():
+    """
+    Bring the screen up to date.  After a scene rebuild everything is drawn
+    and flipped; otherwise only nodes whose look changed (and the overlay
+    text) are repainted from the cached scene, and only their rects are
+    pushed to the display.  Returns the number of rects updated (None for a
+    full repaint).
+    """
+    global overlays
+    full = scene_dirty
+    if full:
+        build_scene()
+
+    dirty = []
+    for n in nodes:
+        look = node_look(n)
+        if full or look != n.get("look"):
+            old = n.get("rect")
+            n["look"] = look; n["color"] = look[0]
+            n["rect"] = node_rect(n, look[1])
+            if not full:
+                dirty.append(old.union(n["rect"]) if old else n["rect"])
+
+    new_overlays = overlay_texts()
+    dirty.extend(rect for _, rect in overlays)
+    dirty.extend(rect for _, rect in new_overlays)
+    overlays = new_overlays
+
+    if full or len(dirty) > DIRTY_MAX:
+        screen.blit(scene, (0, 0))
+        for n in nodes:
+            draw_node(n)
+        for surf, rect in overlays:
+            screen.blit(surf, rect)
+        pygame.display.flip()
+        return None
+
+    for rect in dirty:
+        screen.set_clip(rect)
+        screen.blit(scene, rect, rect)
+        for n in nodes_near(rect):
+            draw_node(n)
+        for surf, orect in overlays:
+            if orect.colliderect(rect):
+                screen.blit(surf, orect)
+    screen.set_clip(None)
+    pygame.display.update(dirty)
+    return len(dirty)
+
+def draw_card(y, text_):
     card_rect = pygame.Rect(WIDTH//2 - 150, y, 300, 80)
     pygame.draw.rect(screen, BLUE, card_rect, border_radius=12)
-    label = CARD_FONT.render(text, True, WHITE)
+    label = text(text_, WHITE, CARD_FONT)
     label_rect = label.get_rect(center=card_rect.center)
     screen.blit(label, label_rect)
     return card_rect
 
-def draw_back_button():
+def draw_back_button(surface=screen):
     back_rect = pygame.Rect(20, 20, 100, 40)
-    pygame.draw.rect(screen, RED, back_rect, border_radius =8)
-    label = FONT.render("Back", True, WHITE)
+    pygame.draw.rect(surface, RED, back_rect, border_radius =8)
+    label = text("Back", WHITE)
     label_rect = label.get_rect(center=back_rect.center)
-    screen.blit(label, label_rect)
+    surface.blit(label, label_rect)
     return back_rect
 
-def draw_run_dijkstra():
+def draw_run_dijkstra(surface=screen):
     run_rect = pygame.Rect(20, HEIGHT - 40, 100, 40)
-    pygame.draw.rect(screen, GREEN, run_rect, border_radius = 8)
-    label = FONT.render("Run Dijkstras", True, WHITE)
+    pygame.draw.rect(surface, GREEN, run_rect, border_radius = 8)
+    label = text("Run Dijkstras", WHITE)
     label_rect = label.get_rect(center=run_rect.center)
-    screen.blit(label, label_rect)
+    surface.blit(label, label_rect)
     return run_rect
-def draw_run_BFS():
+def draw_run_BFS(surface=screen):
     run_rect = pygame.Rect(20, HEIGHT - 40, 100, 40)
-    pygame.draw.rect(screen, GREEN, run_rect, border_radius = 8)
-    label = FONT.render("Run BFS", True, WHITE)
+    pygame.draw.rect(surface, GREEN, run_rect, border_radius = 8)
+    label = text("Run BFS", WHITE)
     label_rect = label.get_rect(center=run_rect.center)
-    screen.blit(label, label_rect)
+    surface.blit(label, label_rect)
     return run_rect
 
-def draw_run_DFS():
+def draw_run_DFS(surface=screen):
     run_rect = pygame.Rect(20, HEIGHT - 40, 100, 40)
-    pygame.draw.rect(screen, GREEN, run_rect, border_radius = 8)
-    label = FONT.render("Run DFS", True, WHITE)
+    pygame.draw.rect(surface, GREEN, run_rect, border_radius = 8)
+    label = text("Run DFS", WHITE)
     label_rect = label.get_rect(center=run_rect.center)
-    screen.blit(label, label_rect)
+    surface.blit(label, label_rect)
     return run_rect
 def load_preset_graph(page_name):
-    global nodes, edges, node_counter
-    nodes.clear()
-    edges.clear()
+    global node_counter, scene_dirty
+    clear_graph()
     node_counter = 0
+    scene_dirty = True
 
     if page_name == "Dijkstras Shortest Path":
         positions = {
@@ -220,7 +355,7 @@ def load_preset_graph(page_name):
         }
 
         for name, (x, y) in positions.items():
-            nodes.append({"x": x, "y": y, "name": name, "color": BLUE})
+            add_node(name, x, y)
             node_counter += 1
 
         base_edges = [
@@ -241,7 +376,7 @@ def load_preset_graph(page_name):
         }
 
         for name, (x, y) in positions.items():
-            nodes.append({"x": x, "y": y, "name": name, "color": BLUE})
+            add_node(name, x, y)
             node_counter += 1
         base_edges = [
             ("A", "B", 2), ("A", "C", 4),
@@ -263,7 +398,7 @@ def load_preset_graph(page_name):
             "G": (550, 300)
         }
         for name, (x, y) in positions.items():
-            nodes.append({"x": x, "y": y, "name": name, "color": BLUE})
+            add_node(name, x, y)
             node_counter += 1
 
         base_edges = [
@@ -273,10 +408,68 @@ def load_preset_graph(page_name):
         for u, v, w in base_edges:
             edges[u][v] = w
 
-# ── main loop (clean, DFS + Dijkstra) ─────────────────────────
+# stress test: a random geometric graph scaled into the window.  Weights are
+# the edges' lengths before scaling.
+def load_generated_graph(n=GENERATED_NODES):
+    global node_counter, scene_dirty
+    g = generate("geometric", n, 2 * n, directed=True, seed=node_counter)
+    bx, by, bw, bh = BOX
+    top, bottom = 80, HEIGHT - 60 # clear of the buttons and the prompt line
+    scale = min(1.0, (WIDTH - 2 * NODE_R) / bw, (bottom - top) / bh)
+    clear_graph()
+    for name, x, y in zip(node_names(n), g.x.tolist(), g.y.tolist()):
+        add_node(name, round(NODE_R + (x - bx) * scale), round(top + (y - by) * scale))
+    names = [n["name"] for n in nodes]
+    for u, v, w in zip(g.src.tolist(), g.dst.tolist(), g.weight.tolist()):
+        edges[names[u]][names[v]] = w
+    node_counter = n
+    scene_dirty = True
+
+# L: force-directed positions for the graph on screen (Shift+L refines the
+# current drawing instead of starting over).  A* steers by the new positions;
+# astar.heuristic_scale rescales its heuristic to the smallest weight / length
+# ratio, so it stays admissible under any layout.
+def relayout(refine=False):
+    global scene_dirty
+    if not nodes:
+        return
+    graph = build_graph()
+    top, bottom = 80, HEIGHT - 60 # clear of the buttons and the prompt line
+    start = {n["name"]: (n["x"], n["y"]) for n in nodes} if refine else None
+    x, y = force_layout(graph, start, box=(NODE_R, top, WIDTH - 2 * NODE_R, bottom - top))
+    x, y = x.tolist(), y.tolist()
+    grid.clear()
+    for n in nodes:
+        i = graph.index[n["name"]]
+        n["x"], n["y"] = round(x[i]), round(y[i])
+        grid[cell_of(n["x"], n["y"])].append(n)
+    scene_dirty = True
+
+def step_once():
+    """Apply the running algorithm's next step; False once nothing is running."""
+    global visualizing_bfs, visualizing_dfs, visualizing_dijkstra, last_result
+    if visualizing_bfs:
+        try:
+            trace_state.apply(next(bfs_generator))
+        except StopIteration:
+            visualizing_bfs = False
+    elif visualizing_dfs:
+        try:
+            trace_state.apply(next(dfs_generator))
+        except StopIteration:
+            visualizing_dfs = False
+    elif visualizing_dijkstra:
+        try:
+            trace_state.apply(next(dijkstra_generator))
+        except StopIteration as stop:
+            visualizing_dijkstra = False
+            last_result = stop.value
+    return visualizing_bfs or visualizing_dfs or visualizing_dijkstra
+
 # ── main loop (Dijkstra + DFS + BFS) ─────────────────────────
 clock = pygame.time.Clock()
 running = True
+dt = 0.0 # seconds the last frame took, tick wait included
 
 # Generators
 dijkstra_generator = None
@@ -284,7 +477,16 @@ dfs_generator      = None
 bfs_generator      = None
 
 # Visual‑state flags
-current_step          = None
+graph                 = None   # CSR snapshot the running algorithm works on
+sssp                  = None   # Dijkstra tree from the last start, repaired on each edit
+last_start            = None
+last_result           = None   # return value of the last finished run
+
+# Point-to-point searches (A / I on the Dijkstra page): pick start, then end
+P2P_ALGOS             = {"A*": astar, "Bidirectional Dijkstra": bidirectional_dijkstra}
+p2p_algo              = None
+p2p_start             = None
+trace_state           = None   # replayed from the generator's step deltas
 visualizing_dijkstra  = False
 visualizing_dfs       = False
 visualizing_bfs       = False
@@ -295,6 +497,7 @@ waiting_for_DFS       = False
 waiting_for_BFS       = False
 
 while running:
+    frame_start = time.perf_counter()
     # ─────────────── HOME SCREEN ───────────────
     if screen_mode == "home":
         screen.fill(WHITE)
@@ -326,24 +529,23 @@ while running:
                 elif event.key == pygame.K_UP:
                     scroll_y = min(scroll_y + SCROLL_SPEED, 0)
 
-        title = FONT.render("Algorithm Visualizer", True, BLACK)
+        title = text("Algorithm Visualizer", BLACK)
         screen.blit(title, (WIDTH//2 - title.get_width()//2, 50 + scroll_y))
         pygame.display.flip()
 
     # ─────────────── GRAPH SCREEN ───────────────
     elif screen_mode == "graph":
-        # Draw first so rects exist
-        draw()
-        back_rect = draw_back_button()
-        if selected_page == "Dijkstras Shortest Path":
-            run_rect = draw_run_dijkstra()
-        elif selected_page == "Depth First Search":
-            run_rect = draw_run_DFS()
-        elif selected_page == "Breadth First Search":
-            run_rect = draw_run_BFS()
-        else:
-            run_rect = draw_run_BFS()
-        pygame.display.flip()
+        # steps owed for the time since the last frame, whatever the frame rate
+        if autoplay:
+            step_budget += dt * STEP_RATE
+            steps = min(int(step_budget), MAX_STEPS_PER_FRAME)
+            step_budget -= int(step_budget) # steps dropped by the cap aren't owed later
+            for _ in range(steps):
+                if not step_once():
+                    break
+
+        # Draw first so rects exist; one display update per frame
+        last_rects = draw()
 
         # Event loop
         for event in pygame.event.get():
@@ -355,11 +557,13 @@ while running:
                 # Back
                 if back_rect.collidepoint(event.pos):
                     screen_mode = "home"; selected_page = None
-                    nodes.clear(); edges.clear(); node_counter = 0
+                    clear_graph(); node_counter = 0
                     dijkstra_generator = dfs_generator = bfs_generator = None
-                    current_step = None
+                    graph = trace_state = sssp = last_start = last_result = None
+                    p2p_algo = p2p_start = None
                     visualizing_dijkstra = visualizing_dfs = visualizing_bfs = False
                     waiting_for_dijkstra = waiting_for_DFS = waiting_for_BFS = False
+                    autoplay = False
                     continue
 
                 # Run‑button click
@@ -375,23 +579,39 @@ while running:
 
                 pos = pygame.mouse.get_pos(); clicked = node_at(pos)
 
+                # Start / end selection for the point-to-point searches
+                if clicked and p2p_algo:
+                    if p2p_start is None:
+                        p2p_start = clicked["name"]
+                        continue
+                    graph = build_graph()
+                    kwargs = {}
+                    if p2p_algo == "A*":
+                        kwargs["positions"] = {n["name"]: (n["x"], n["y"]) for n in nodes}
+                    dijkstra_generator = P2P_ALGOS[p2p_algo](graph, p2p_start, clicked["name"], **kwargs)
+                    visualizing_dijkstra = True; visualizing_dfs = visualizing_bfs = False
+                    trace_state = TraceState(len(graph)); last_result = None
+                    p2p_algo = p2p_start = None
+                    continue
+
                 # Start‑node selection
                 if clicked and (waiting_for_dijkstra or waiting_for_DFS or waiting_for_BFS):
-                    start = clicked["name"]
+                    start = clicked["name"]; graph = build_graph()
                     if waiting_for_dijkstra:
-                        dijkstra_generator = dijkstra(edges, start)
+                        dijkstra_generator = dijkstra(graph, start)
+                        sssp = DynamicSSSP(edges, start, nodes=(n["name"] for n in nodes))
+                        last_start = start
                         visualizing_dijkstra = True; visualizing_dfs = visualizing_bfs = False
                         waiting_for_dijkstra = False
                     elif waiting_for_DFS:
-                        dfs_generator = dfs(edges, start)
+                        dfs_generator = dfs(graph, start)
                         visualizing_dfs = True; visualizing_dijkstra = visualizing_bfs = False
                         waiting_for_DFS = False
                     elif waiting_for_BFS:
-                        bfs_generator = bfs(edges, start)
+                        bfs_generator = bfs(graph, start)
                         visualizing_bfs = True; visualizing_dijkstra = visualizing_dfs = False
                         waiting_for_BFS = False
-                    current_step = None
-                    for n in nodes: n["color"] = BLUE
+                    trace_state = TraceState(len(graph))
                     continue
 
                 # ----- Graph editing -----
@@ -399,25 +619,28 @@ while running:
                     if placing_edges:
                         if clicked:
                             if selected_node is None:
-                                selected_node = clicked; clicked["color"] = YELLOW
+                                selected_node = clicked
                             elif clicked != selected_node:
                                 inputting_weight = True; weight_text = ""
                                 pending_edge = (selected_node["name"], clicked["name"])
                                 selected_node = None
                     else:
                         if clicked is None:
-                            name = chr(65 + node_counter)
-                            nodes.append({"x": pos[0], "y": pos[1], "name": name, "color": BLUE})
+                            name = node_name(node_counter)  # A .. Z, AA, AB, ...
+                            add_node(name, pos[0], pos[1])
                             node_counter += 1
+                            if sssp is not None:
+                                sssp.repair([("add_node", name, None, None)])
 
             # ───── Keyboard ─────
             elif event.type == pygame.KEYDOWN:
                 if inputting_weight:
                     if event.key == pygame.K_RETURN and weight_text:
-                        u, v = pending_edge; edges[u][v] = int(weight_text)
+                        u, v = pending_edge; old = edges[u].get(v); edges[u][v] = int(weight_text)
+                        if sssp is not None:  # only the affected part of the tree is redone
+                            sssp.repair([("add_edge", u, v, old)])
                         inputting_weight = False; weight_text = ""; pending_edge = None
-                        for n in nodes:
-                            if n["name"] in (u, v): n["color"] = BLUE
+                        scene_dirty = True  # new edge and weight label
                     elif event.key == pygame.K_BACKSPACE:
                         weight_text = weight_text[:-1]
                     elif pygame.K_0 <= event.key <= pygame.K_9:
@@ -425,7 +648,19 @@ while running:
                 else:
                     if event.key == pygame.K_e:
                         placing_edges = not placing_edges; selected_node = None
-                        for n in nodes: n["color"] = BLUE
+
+                    if event.key == pygame.K_t:
+                        show_timing = not show_timing
+
+                    # Replace the graph with a few thousand generated nodes
+                    if event.key == pygame.K_g:
+                        load_generated_graph()
+                        graph = trace_state = sssp = last_start = last_result = None
+                        visualizing_dijkstra = visualizing_dfs = visualizing_bfs = False
+                        selected_node = None
+
+                    if event.key == pygame.K_l:
+                        relayout(refine=bool(event.mod & pygame.KMOD_SHIFT))
 
                     # Hot‑keys to open waiting state directly
                     if event.key == pygame.K_d and selected_page == "Dijkstras Shortest Path":
@@ -435,25 +670,29 @@ while running:
                     if event.key == pygame.K_b and selected_page == "Breadth First Search":
                         waiting_for_BFS = True; waiting_for_dijkstra = waiting_for_DFS = False
 
-                    # Step algorithms
+                    if event.key == pygame.K_a and selected_page == "Dijkstras Shortest Path":
+                        p2p_algo, p2p_start = "A*", None
+                    if event.key == pygame.K_i and selected_page == "Dijkstras Shortest Path":
+                        p2p_algo, p2p_start = "Bidirectional Dijkstra", None
+
+                    # Re-run Dijkstra from the same start on the edited graph
+                    if event.key == pygame.K_r and last_start is not None:
+                        graph = build_graph(); trace_state = TraceState(len(graph))
+                        dijkstra_generator = dijkstra(graph, last_start)
+                        visualizing_dijkstra = True; visualizing_dfs = visualizing_bfs = False
+
+                    # Step algorithms: one step, or play them back at STEP_RATE
                     if event.key == pygame.K_SPACE:
-                        if visualizing_bfs:
-                            try:
-                                current_step = next(bfs_generator)
-                            except StopIteration:
-                                visualizing_bfs = False
-                        elif visualizing_dfs:
-                            try:
-                                current_step = next(dfs_generator)
-                            except StopIteration:
-                                visualizing_dfs = False
-                        elif visualizing_dijkstra:
-                            try:
-                                current_step = next(dijkstra_generator)
-                            except StopIteration:
-                                visualizing_dijkstra = False
-
-    clock.tick(60)
+                        step_once()
+                    if event.key == pygame.K_p:
+                        autoplay = not autoplay; step_budget = 0.0
+                    if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                        STEP_RATE = min(STEP_RATE * 2, 4096.0)
+                    if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        STEP_RATE = max(STEP_RATE / 2, 0.5)
+
+    frame_ms = (time.perf_counter() - frame_start) * 1000
+    dt = clock.tick(FPS) / 1000
 
 pygame.quit(); sys.exit()
 
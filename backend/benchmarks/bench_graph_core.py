@@ -0,0 +1,118 @@
+"""
+backend/benchmarks/bench_graph_core.py
+Memory per edge and traversal throughput: dict-of-dicts vs CSRGraph.
+
+Run from the repo root:
+    python -m backend.benchmarks.bench_graph_core --nodes 100000 --degree 8
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import tracemalloc
+from collections import defaultdict, deque
+
+from backend.algorithms.graph_core import CSRGraph
+
+
+def random_adjacency(n: int, degree: int, seed: int = 0) -> dict:
+    """The shape /api/run receives: ``{name: {name: weight}}``."""
+    rng = random.Random(seed)
+    names = [f"n{i}" for i in range(n)]
+    adjacency = defaultdict(dict)
+    for u in names:
+        adjacency[u]  # keep sinks as keys, like the API requires
+        for _ in range(degree):
+            adjacency[u][names[rng.randrange(n)]] = rng.randint(1, 10)
+    return dict(adjacency)
+
+
+def measure(build):
+    """Return (object, bytes it keeps alive); timed separately, tracing is slow."""
+    tracemalloc.start()
+    obj = build()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def bfs_dict(adjacency: dict, start) -> int:
+    seen = {start}
+    queue = deque([start])
+    edges = 0
+    while queue:
+        u = queue.popleft()
+        for v in adjacency[u]:
+            edges += 1
+            if v not in seen:
+                seen.add(v)
+                queue.append(v)
+    return edges
+
+
+def bfs_csr(graph: CSRGraph, start: int) -> int:
+    offsets, targets = graph.offsets, graph.targets
+    seen = bytearray(len(graph))
+    seen[start] = 1
+    queue = deque([start])
+    edges = 0
+    while queue:
+        u = queue.popleft()
+        for v in targets[offsets[u]:offsets[u + 1]]:
+            edges += 1
+            if not seen[v]:
+                seen[v] = 1
+                queue.append(v)
+    return edges
+
+
+def best_of(repeat: int, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--degree", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    source = random_adjacency(args.nodes, args.degree)
+    # copy via the edge list so the dict figure covers every inner dict
+    edge_list = [(u, v, w) for u, nbrs in source.items() for v, w in nbrs.items()]
+
+    def build_dict():
+        adjacency = {u: {} for u in source}
+        for u, v, w in edge_list:
+            adjacency[u][v] = w
+        return adjacency
+
+    adjacency, dict_bytes = measure(build_dict)
+    graph, csr_bytes = measure(lambda: CSRGraph.from_adjacency(source))
+    _, dict_build = best_of(args.repeat, build_dict)
+    _, csr_build = best_of(args.repeat, CSRGraph.from_adjacency, source)
+    m = graph.num_edges
+
+    start = next(iter(source))
+    walked, dict_time = best_of(args.repeat, bfs_dict, adjacency, start)
+    _, csr_time = best_of(args.repeat, bfs_csr, graph, graph.id_of(start))
+
+    print(f"graph: {len(graph):,} nodes, {m:,} edges (BFS walks {walked:,} edges)")
+    print(f"{'':14}{'bytes/edge':>12}{'build s':>10}{'BFS s':>10}{'Medges/s':>10}")
+    for label, nbytes, build, t in (
+        ("dict-of-dicts", dict_bytes, dict_build, dict_time),
+        ("CSRGraph", csr_bytes, csr_build, csr_time),
+    ):
+        print(f"{label:14}{nbytes / m:12.1f}{build:10.3f}{t:10.3f}{walked / t / 1e6:10.2f}")
+    print(f"CSR buffers alone: {graph.nbytes / m:.1f} bytes/edge "
+          f"(the rest is the name -> id table)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+backend/benchmarks/bench_suite.py
+Every ALGO_MAP algorithm on every graph family and size, direct and through /api/run.
+
+Run from the repo root:
+    python -m backend.benchmarks.bench_suite --sizes 1000,10000 -o bench.json
+    python -m backend.benchmarks.bench_suite --sizes 1000,10000 --baseline bench.json
+
+Families (undirected, weights 1..10, seeded so runs are comparable):
+
+    path         a chain of n nodes, the deepest graph there is
+    grid         a near-square lattice (generators.py)
+    sparse       G(n, 3n) random graph
+    dense        half of all pairs among sqrt(64 n) nodes (~16 n edges)
+    scale-free   Chung-Lu power law with 3n edges
+
+Each run goes from the first node to the last; A* gets the generated node
+positions and all-pairs is skipped above ALL_PAIRS_MAX_NODES.  ``direct``
+drains the step generator on a CSRGraph and nothing else (a reversed graph,
+built once per graph, is only paid for by the first algorithm that needs it);
+``api`` posts the request through the Flask test client (no result cache,
+no process pool) and also times its stages one by one, the way the handler
+does them:
+
+    parse      decode the JSON body
+    validate   pack the adjacency into a CSRGraph and check the query
+    compute    run the algorithm and encode its trace
+    serialize  encode the response body
+
+Times are the best of ``--repeat``; peak memory comes from one extra,
+untimed run under tracemalloc (tracing slows everything down).  With
+``--baseline`` the run is compared against an earlier ``--output`` file and
+exits with status 1 if any time grew by more than ``--threshold``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backend.algorithms.generators import Generated, generate, node_names
+from backend.algorithms.trace import encode_trace
+from backend.codec import JSON, dumps, loads
+from backend.executor import encode_body
+from backend.main import ALGO_MAP, _pack_graph, _query_error, create_app
+
+FAMILIES = ("path", "grid", "sparse", "dense", "scale-free")
+SIZES = (1000, 10_000)
+RESULTS_VERSION = 1
+THRESHOLD = 0.25           # a time that grows by more than this fraction is a regression
+MIN_DELTA = 0.002          # seconds; smaller changes are timer noise, never regressions
+ALL_PAIRS_MAX_NODES = 500  # all-pairs returns a V x V matrix: skip bigger graphs
+SEED = 0
+
+
+def family_graph(family: str, size: int) -> Generated:
+    """The ``family`` graph for a nominal ``size`` (node count; dense graphs get fewer nodes)."""
+    if family == "path":
+        src = np.arange(size - 1)
+        weight = np.random.default_rng(SEED).integers(1, 11, len(src))
+        return Generated(src, src + 1, weight, np.linspace(100.0, 900.0, size), np.full(size, 300.0), False)
+    if family == "grid":
+        return generate("grid", size, seed=SEED)
+    if family == "sparse":
+        return generate("erdos-renyi", size, 3 * size, seed=SEED)
+    if family == "dense":
+        n = math.isqrt(64 * size)
+        return generate("erdos-renyi", n, n * (n - 1) // 4, seed=SEED)
+    if family == "scale-free":
+        return generate("scale-free", size, 3 * size, seed=SEED)
+    raise ValueError(f"Unknown family '{family}', expected one of {', '.join(FAMILIES)}")
+
+
+def drain(steps):
+    """Run a step generator to the end and return its result."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def best_of(repeat: int, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def peak_bytes(fn, *args) -> int:
+    """Peak bytes Python allocated while ``fn`` ran, over what was live before."""
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+# ── one benchmark ───────────────────────────────────────────────────────
+
+def bench_direct(algo, csr, start, end, options: dict, repeat: int) -> dict:
+    run = lambda: drain(algo(csr, start, end, **options))  # noqa: E731
+    _, seconds = best_of(repeat, run)
+    return {"seconds": seconds, "peak_bytes": peak_bytes(run)}
+
+
+def bench_api(client, algo_name: str, body: bytes, repeat: int) -> dict:
+    """Whole request through the test client, then the handler's stages one at a time."""
+    def post():
+        return client.post("/api/run", data=body, content_type=JSON)
+
+    response, seconds = best_of(repeat, post)
+    data, parse = best_of(repeat, loads, body)
+    graph, start, end, options = data["graph"], data["start"], data["end"], data["options"]
+
+    def validate():
+        csr = _pack_graph(graph)
+        error = _query_error(algo_name, csr, start, end, options)
+        if error:
+            raise ValueError(error)
+        return csr
+
+    csr, validate_s = best_of(repeat, validate)
+    algo = ALGO_MAP[algo_name]
+    (trace, result), compute = best_of(repeat, lambda: encode_trace(algo(csr, start, end, **options), csr.names))
+    _, serialize = best_of(repeat, encode_body, trace, result)
+    return {
+        "seconds": seconds,
+        "status": response.status_code,
+        "response_bytes": len(response.get_data()),
+        "stages": {"parse": parse, "validate": validate_s, "compute": compute, "serialize": serialize},
+        "peak_bytes": peak_bytes(post),
+    }
+
+
+def run_suite(families, sizes, algos, repeat: int = 3, api: bool = True, log=print) -> list:
+    """One result dict per (family, size, algorithm) that isn't skipped."""
+    client = create_app({"RESULT_CACHE_BYTES": 0, "RUN_POOL_WORKERS": 0}).test_client() if api else None
+    results = []
+    for family in families:
+        for size in sizes:
+            generated = family_graph(family, size)
+            names = node_names(len(generated))
+            document = generated.adjacency(names)
+            graph = document["graph"]
+            csr = _pack_graph(graph)
+            start, end = names[0], names[-1]
+            for algo_name in algos:
+                if algo_name == "all-pairs" and len(csr) > ALL_PAIRS_MAX_NODES:
+                    continue
+                entry = {"family": family, "size": size, "nodes": len(csr),
+                         "edges": csr.num_edges, "algo": algo_name}
+                options = {"positions": document["positions"]} if algo_name == "astar" else {}
+                entry["direct"] = bench_direct(ALGO_MAP[algo_name], csr, start, end, options, repeat)
+                if api:
+                    body = dumps({"algo": algo_name, "graph": graph, "start": start, "end": end,
+                                  "options": options})
+                    entry["api"] = bench_api(client, algo_name, body, repeat)
+                results.append(entry)
+                log(format_row(entry))
+    return results
+
+
+# ── reporting ───────────────────────────────────────────────────────────
+
+def format_row(entry: dict) -> str:
+    row = (f"{entry['family']:11}{entry['nodes']:>9,}{entry['edges']:>11,}  {entry['algo']:23}"
+           f"{entry['direct']['seconds'] * 1e3:10.1f}{entry['direct']['peak_bytes'] / 2**20:9.1f}")
+    api = entry.get("api")
+    if api:
+        stages = api["stages"]
+        row += (f"{api['seconds'] * 1e3:10.1f}{api['peak_bytes'] / 2**20:9.1f}   "
+                + "/".join(f"{stages[k] * 1e3:.1f}" for k in ("parse", "validate", "compute", "serialize")))
+    return row
+
+
+HEADER = (f"{'family':11}{'nodes':>9}{'edges':>11}  {'algorithm':23}{'direct ms':>10}{'peak MiB':>9}"
+          f"{'api ms':>10}{'peak MiB':>9}   parse/validate/compute/serialize ms")
+
+
+def _timings(results: list) -> dict:
+    """``{(family, size, algo, "direct" | "api"): seconds}``."""
+    timings = {}
+    for entry in results:
+        for mode in ("direct", "api"):
+            if mode in entry:
+                timings[entry["family"], entry["size"], entry["algo"], mode] = entry[mode]["seconds"]
+    return timings
+
+
+def compare(results: list, baseline: list, threshold: float = THRESHOLD) -> list:
+    """
+    ``(key, before, after)`` for every time that grew by more than
+    ``threshold`` (and by more than MIN_DELTA) since ``baseline``.
+    Benchmarks missing from either side are ignored.
+    """
+    before = _timings(baseline)
+    regressions = []
+    for key, after in _timings(results).items():
+        old = before.get(key)
+        if old is not None and after > old * (1 + threshold) and after - old > MIN_DELTA:
+            regressions.append((key, old, after))
+    return regressions
+
+
+def _csv(value: str) -> list:
+    return [item for item in value.split(",") if item]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--families", type=_csv, default=list(FAMILIES), help="comma-separated")
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in _csv(s)], default=list(SIZES),
+                        help="comma-separated node counts")
+    parser.add_argument("--algos", type=_csv, default=list(ALGO_MAP), help="comma-separated")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-api", dest="api", action="store_false", help="skip the /api/run runs")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against an earlier --output file")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help=f"allowed slowdown as a fraction (default {THRESHOLD})")
+    args = parser.parse_args(argv)
+    for family in args.families:
+        if family not in FAMILIES:
+            parser.error(f"unknown family '{family}', expected one of {', '.join(FAMILIES)}")
+    for algo in args.algos:
+        if algo not in ALGO_MAP:
+            parser.error(f"unknown algorithm '{algo}'")
+
+    print(HEADER)
+    results = run_suite(args.families, args.sizes, args.algos, args.repeat, args.api)
+    if args.output:
+        document = {
+            "version": RESULTS_VERSION,
+            "meta": {
+                "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.platform(),
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=1)
+        print(f"wrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("version") != RESULTS_VERSION:
+            sys.exit(f"{args.baseline}: results version {baseline.get('version')}, expected {RESULTS_VERSION}")
+        regressions = compare(results, baseline["results"], args.threshold)
+        for (family, size, algo, mode), old, new in regressions:
+            print(f"REGRESSION {family} {size} {algo} {mode}: "
+                  f"{old * 1e3:.1f} ms -> {new * 1e3:.1f} ms ({new / old - 1:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+backend/codec.py
+Wire formats of the run endpoints, negotiated through Content-Type / Accept.
+
+    application/json             orjson when it is installed, else the stdlib
+    application/msgpack          the same documents as msgpack (needs msgpack)
+    application/x-algovis-edges  upload only: a packed edge list, see below
+
+For big graphs parsing and encoding used to cost more than the algorithm:
+orjson is several times faster than ``json`` both ways, and a packed edge
+list skips per-edge objects altogether -- the arrays go straight into a
+CSRGraph with a handful of NumPy calls.  Both libraries are optional.
+
+Edge-list layout (little-endian)::
+
+    4s    magic b"AVE1"
+    u32   node count n
+    u32   edge count m
+    u32   byte length p of the params block
+    i32   src[m]
+    i32   dst[m]
+    f32   weight[m]
+    p     params, a JSON object: {"names", "algo", "start", "end", "options", ...}
+
+``names`` (n strings) defaults to ``"0" .. "n-1"``; the other params are
+the fields a JSON request would carry.
+"""
+from __future__ import annotations
+
+import json
+import struct
+
+import numpy as np
+
+from backend.algorithms.graph_core import CSRGraph
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib codec works, just slower
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # optional: msgpack bodies are refused without it
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+EDGES = "application/x-algovis-edges"
+EDGES_MAGIC = b"AVE1"
+EDGES_HEADER = struct.Struct("<4sIII")
+
+
+class UnsupportedFormat(ValueError):
+    """The body's Content-Type can't be decoded by this server."""
+
+
+def response_types() -> list:
+    """Encodings ``dumps`` can produce here, preferred first."""
+    return [JSON, MSGPACK] if msgpack is not None else [JSON]
+
+
+def dumps(obj, fmt: str = JSON) -> bytes:
+    if fmt == MSGPACK:
+        return msgpack.packb(obj, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def loads(body: bytes, fmt: str = JSON):
+    """Decode a request body; malformed input raises ValueError."""
+    if fmt == MSGPACK:
+        if msgpack is None:
+            raise UnsupportedFormat("msgpack bodies need the 'msgpack' package on the server")
+        try:
+            return msgpack.unpackb(body, raw=False, strict_map_key=False)
+        except Exception as exc:  # msgpack raises several unrelated types
+            raise ValueError(f"Malformed msgpack body: {exc}") from None
+    if orjson is not None:
+        return orjson.loads(body)  # orjson.JSONDecodeError is a ValueError
+    return json.loads(body)
+
+
+def read_edges(body: bytes, max_nodes: int | None = None) -> tuple[dict, CSRGraph]:
+    """
+    ``(params, graph)`` from an edge-list upload; bad uploads, and more than
+    ``max_nodes`` nodes, raise ValueError.  Everything is checked before
+    the node names and the graph are built: a header alone can ask for
+    billions of nodes.
+    """
+    if len(body) < EDGES_HEADER.size:
+        raise ValueError("Edge-list upload is shorter than its header")
+    magic, n, m, params_len = EDGES_HEADER.unpack_from(body)
+    if magic != EDGES_MAGIC:
+        raise ValueError("Edge-list upload does not start with b'AVE1'")
+    if max_nodes is not None and n > max_nodes:
+        raise ValueError(f"Edge-list upload has {n} nodes, at most {max_nodes} are allowed")
+    expected = EDGES_HEADER.size + 12 * m + params_len
+    if len(body) != expected:
+        raise ValueError(f"Edge-list upload should be {expected} bytes, got {len(body)}")
+
+    at = EDGES_HEADER.size
+    src = np.frombuffer(body, "<i4", m, at)
+    dst = np.frombuffer(body, "<i4", m, at + 4 * m)
+    weights = np.frombuffer(body, "<f4", m, at + 8 * m)
+    params = loads(body[at + 12 * m:]) if params_len else {}
+    if not isinstance(params, dict):
+        raise ValueError("Edge-list params must be a JSON object")
+    if m and (min(src.min(), dst.min()) < 0 or max(src.max(), dst.max()) >= n):
+        raise ValueError(f"Edge endpoints must be node ids in [0, {n})")
+    if not np.isfinite(weights).all():
+        raise ValueError("Edge weights must be finite")
+
+    names = params.pop("names", None)
+    if names is None:
+        for field in ("start", "end"):
+            if not _is_default_name(params.get(field), n):
+                raise ValueError(f"Param '{field}' must be a node id in [0, {n}) (no 'names' given)")
+        names = [str(i) for i in range(n)]
+    elif not isinstance(names, list) or len(names) != n or not all(isinstance(x, str) for x in names):
+        raise ValueError(f"Param 'names' must list {n} strings")
+    elif len(set(names)) != n:
+        raise ValueError("Param 'names' has duplicates")
+    return params, CSRGraph.from_edges(names, src, dst, weights)
+
+
+def _is_default_name(value, n: int) -> bool:
+    """``value`` is absent or one of ``"0" .. "n-1"``."""
+    if value is None:
+        return True
+    return isinstance(value, str) and value.isdecimal() and str(int(value)) == value and int(value) < n
+
+
+def write_edges(n: int, src, dst, weights, params: dict | None = None) -> bytes:
+    """Pack an edge-list upload (the client side of ``read_edges``)."""
+    src = np.asarray(src, dtype="<i4")
+    dst = np.asarray(dst, dtype="<i4")
+    weights = np.asarray(weights, dtype="<f4")
+    blob = json.dumps(params, separators=(",", ":")).encode() if params else b""
+    header = EDGES_HEADER.pack(EDGES_MAGIC, n, len(src), len(blob))
+    return b"".join((header, src.tobytes(), dst.tobytes(), weights.tobytes(), blob))
@@ -0,0 +1,375 @@
+"""
+backend/executor.py
+Runs ALGO_MAP step generators inline or in a bounded process pool.
+
+Small graphs run inline in the request thread -- a round trip to another
+process costs more than the algorithm.  Bigger ones go to a
+``ProcessPoolExecutor`` so one huge run can't pin a Flask worker.  The graph
+travels through one ``SharedMemory`` block (CSR arrays + a packed name
+table), not as a pickled dict, and the block also carries a cancel flag.
+
+Every run gets a wall-clock deadline.  Steps check it (and the cancel flag)
+as they are produced, and so do the checkpoints of phases that yield no
+steps, so runs stop cooperatively and a timed-out pool worker frees its
+slot; pool workers additionally get an address-space limit.  Results come back as the encoded body (JSON
+or msgpack, see codec.py), encoded where the run happened.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+
+from backend.algorithms.checkpoint import set_check
+from backend.algorithms.graph_core import CSRGraph
+from backend.algorithms.trace import encode_trace
+from backend.codec import JSON, dumps
+
+CHECK_EVERY = 256        # steps between deadline / cancel checks
+RESULT_GRACE = 1.0       # seconds to wait past the deadline for the worker to notice
+CHUNKS_PER_WORKER = 4    # batch queries are sent in about this many chunks per worker
+
+
+class QueueFull(Exception):
+    """Every worker is busy and the pending queue is full."""
+
+
+class RunTimeout(Exception):
+    """The run passed its wall-clock deadline (or was cancelled)."""
+
+
+def encode_body(trace: dict, result, fmt: str = JSON) -> bytes:
+    return dumps({"trace": trace, "result": result}, fmt)
+
+
+def guarded(steps, deadline: float, cancel=None):
+    """
+    Re-yield ``steps``, stopping once past ``deadline`` or when ``cancel[0]``
+    is set.  Checked every CHECK_EVERY steps, and at every ``checkpoint()``
+    the algorithm reaches while producing a step (see checkpoint.py).
+    """
+    def check():
+        if time.time() > deadline or (cancel is not None and cancel[0]):
+            raise RunTimeout("Run exceeded its time limit")
+
+    n = 0
+    while True:
+        previous = set_check(check)
+        try:
+            step = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            set_check(previous)
+        n += 1
+        if n % CHECK_EVERY == 0:
+            try:
+                check()
+            except RunTimeout:
+                steps.close()
+                raise
+        yield step
+
+
+def run_inline(algo, graph: CSRGraph, start, end, options: dict, deadline: float,
+               fmt: str = JSON, stats: dict | None = None) -> bytes:
+    """
+    Run and encode in this thread.  ``stats``, if given, gets the
+    ``compute`` and ``serialize`` seconds and the run's operation
+    ``counts`` (trace.OP_COUNTERS).
+    """
+    counts = {} if stats is not None else None
+    t0 = time.perf_counter()
+    steps = algo(graph, start, end, **options)
+    trace, result = encode_trace(guarded(steps, deadline), graph.names, counts=counts)
+    t1 = time.perf_counter()
+    body = encode_body(trace, result, fmt)
+    if stats is not None:
+        stats.update(compute=t1 - t0, serialize=time.perf_counter() - t1, counts=counts)
+    return body
+
+
+def _query_entry(graph: CSRGraph, query, deadline: float, cancel=None) -> dict:
+    """
+    Run one batch query ``(algo, start, end, options, with_trace)`` to
+    completion.  Rejected option values become an ``error`` entry instead of
+    failing the whole batch; timeouts still raise.
+    """
+    algo, start, end, options, with_trace = query
+    try:
+        steps = guarded(algo(graph, start, end, **options), deadline, cancel)
+        if with_trace:
+            trace, result = encode_trace(steps, graph.names)
+            return {"trace": trace, "result": result}
+        while True:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                return {"result": stop.value}
+    except ValueError as exc:
+        return {"error": str(exc)}
+
+
+def run_batch_inline(graph: CSRGraph, queries: list, deadline: float):
+    """Yield ``(index, entry)`` for each query, in order, in this thread."""
+    for i, query in enumerate(queries):
+        yield i, _query_entry(graph, query, deadline)
+
+
+# ── shared-memory graph transport ───────────────────────────────────────
+# layout: [cancel flag: 8 bytes][offsets][targets][weights][name offsets][utf-8 names]
+#         [one claimed flag per batch chunk]
+
+def _share(graph: CSRGraph, chunks: int = 0) -> tuple[SharedMemory, tuple]:
+    blob = "".join(graph.names).encode()
+    name_offsets = array("q", [0])
+    pos = 0
+    for name in graph.names:
+        pos += len(name.encode())
+        name_offsets.append(pos)
+
+    parts = [graph.offsets, graph.targets, graph.weights, name_offsets]
+    size = 8 + sum(a.itemsize * len(a) for a in parts) + len(blob) + chunks
+    shm = SharedMemory(create=True, size=max(size, 1))
+    buf, at = shm.buf, 8
+    layout = []
+    for a in parts:
+        raw = memoryview(a).cast("B")
+        buf[at:at + len(raw)] = raw
+        layout.append((a.typecode, len(a)))
+        at += len(raw)
+    buf[at:at + len(blob)] = blob
+    at += len(blob)
+    buf[at:at + chunks] = bytes(chunks)
+    buf[0] = 0
+    return shm, (shm.name, tuple(layout), len(blob))
+
+
+def _claims_at(layout, blob_len: int) -> int:
+    """Offset of the batch chunks' claimed flags, just past the name table."""
+    return 8 + sum(array(typecode).itemsize * length for typecode, length in layout) + blob_len
+
+
+def _attach(name: str) -> SharedMemory:
+    # forkserver / spawn workers share the server's resource tracker, so the
+    # attach registration is the same entry the creator's unlink() removes
+    return SharedMemory(name)
+
+
+def _unpack(shm: SharedMemory, layout, blob_len: int) -> CSRGraph:
+    at, arrays = 8, []
+    for typecode, length in layout:
+        a = array(typecode)
+        nbytes = a.itemsize * length
+        a.frombytes(shm.buf[at:at + nbytes])  # one memcpy, no per-edge objects
+        arrays.append(a)
+        at += nbytes
+    offsets, targets, weights, name_offsets = arrays
+    raw = bytes(shm.buf[at:at + blob_len])  # offsets count utf-8 bytes, so slice before decoding
+    names = [raw[name_offsets[i]:name_offsets[i + 1]].decode() for i in range(len(name_offsets) - 1)]
+    graph = CSRGraph.__new__(CSRGraph)
+    graph.names = names
+    graph.index = {name: i for i, name in enumerate(names)}
+    graph.offsets, graph.targets, graph.weights = offsets, targets, weights
+    return graph
+
+
+_unpacked = (None, None)  # (block name, graph): a batch's chunks reuse the worker's copy
+
+
+def _worker_run(algo, handle, start, end, options, deadline, fmt) -> tuple[bytes, dict]:
+    global _unpacked
+    _unpacked = (None, None)  # a cancelled batch's copy, if any: free it before unpacking
+    name, layout, blob_len = handle
+    shm = _attach(name)
+    try:
+        graph = _unpack(shm, layout, blob_len)
+        stats: dict = {}
+        t0 = time.perf_counter()
+        steps = algo(graph, start, end, **options)
+        trace, result = encode_trace(guarded(steps, deadline, shm.buf), graph.names, counts=stats)
+        t1 = time.perf_counter()
+        body = encode_body(trace, result, fmt)
+        return body, {"compute": t1 - t0, "serialize": time.perf_counter() - t1, "counts": stats}
+    finally:
+        shm.close()
+
+
+def _worker_batch(queries, handle, deadline, chunk: int, chunks: int) -> list:
+    """
+    Run one chunk of a batch.  The unpacked graph is kept for the batch's
+    later chunks only while some chunk is still unclaimed and the batch
+    isn't cancelled, so a worker doesn't sit on it once the batch is done.
+    """
+    global _unpacked
+    name, layout, blob_len = handle
+    shm = _attach(name)
+    claims = _claims_at(layout, blob_len)
+    try:
+        shm.buf[claims + chunk] = 1
+        if _unpacked[0] != name:
+            _unpacked = (None, None)  # free the old copy before unpacking the new one
+            _unpacked = (name, _unpack(shm, layout, blob_len))
+        graph = _unpacked[1]
+        return [_query_entry(graph, query, deadline, shm.buf) for query in queries]
+    finally:
+        # a chunk claimed elsewhere right after this check, or cancelled
+        # after it, leaves the copy here until this worker's next task
+        if shm.buf[0] or 0 not in bytes(shm.buf[claims:claims + chunks]):
+            _unpacked = (None, None)
+        shm.close()
+
+
+def _limit_memory(max_bytes: int) -> None:
+    if not max_bytes:
+        return
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+    except (ImportError, ValueError, OSError):
+        pass  # not available on this platform; runs just go unlimited
+
+
+class RunExecutor:
+    """Bounded process pool: ``max_workers`` running plus ``max_pending`` queued."""
+
+    def __init__(self, max_workers: int, max_pending: int, memory_limit: int = 0):
+        self.max_workers = max_workers
+        self.memory_limit = memory_limit
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # never plain fork: the Flask server is multi-threaded
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_limit_memory,
+            initargs=(self.memory_limit,),
+        )
+
+    def _reset_pool(self) -> None:
+        with self._lock:          # a worker died (e.g. OOM-killed); start fresh
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._new_pool()
+
+    def run(self, algo, graph: CSRGraph, start, end, options: dict, timeout: float,
+            fmt: str = JSON, stats: dict | None = None) -> bytes:
+        """
+        Run in the pool and return the encoded body; raises QueueFull /
+        RunTimeout.  ``stats`` gets what the worker measured, as in run_inline.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull("All workers are busy")
+        shm = None
+        try:
+            shm, handle = _share(graph)
+            deadline = time.time() + timeout
+            with self._lock:
+                future = self._pool.submit(_worker_run, algo, handle, start, end, options, deadline, fmt)
+        except BaseException:
+            self._slots.release()
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            raise
+
+        def release(_future, shm=shm):
+            # the worker may still be reading until the future completes
+            shm.close()
+            shm.unlink()
+            self._slots.release()
+
+        future.add_done_callback(release)
+        try:
+            body, worker_stats = future.result(timeout=timeout + RESULT_GRACE)
+        except FutureTimeout:
+            if not future.cancel():   # already running: ask it to stop
+                try:
+                    shm.buf[0] = 1
+                except TypeError:     # finished (and released) in the meantime
+                    pass
+            raise RunTimeout("Run exceeded its time limit") from None
+        except BrokenProcessPool:
+            self._reset_pool()
+            raise
+        if stats is not None:
+            stats.update(worker_stats)
+        return body
+
+    def run_batch(self, graph: CSRGraph, queries: list, timeout: float):
+        """
+        Run batch queries in the pool against one shared copy of ``graph``.
+
+        The whole batch takes a single queue slot, and its queries are split
+        into chunks spread over the workers.  Raises QueueFull right away;
+        otherwise returns a generator of ``(index, entry)`` in completion
+        order that raises RunTimeout once past the deadline.  Closing the
+        generator early cancels the remaining chunks.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull("All workers are busy")
+        shm, futures = None, {}
+        try:
+            size = max(1, -(-len(queries) // (self.max_workers * CHUNKS_PER_WORKER)))
+            chunks = -(-len(queries) // size)
+            shm, handle = _share(graph, chunks)
+            deadline = time.time() + timeout
+            futures = {}
+            with self._lock:
+                for i, lo in enumerate(range(0, len(queries), size)):
+                    chunk = queries[lo:lo + size]
+                    futures[self._pool.submit(_worker_batch, chunk, handle, deadline, i, chunks)] = lo
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            self._slots.release()
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            raise
+
+        pending = [len(futures)]
+        pending_lock = threading.Lock()
+
+        def release(_future, shm=shm):
+            with pending_lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            shm.close()
+            shm.unlink()
+            self._slots.release()
+
+        for future in futures:
+            future.add_done_callback(release)
+        return self._batch_results(futures, shm, timeout)
+
+    def _batch_results(self, futures: dict, shm: SharedMemory, timeout: float):
+        try:
+            for future in as_completed(futures, timeout=timeout + RESULT_GRACE):
+                lo = futures[future]
+                for i, entry in enumerate(future.result(), lo):
+                    yield i, entry
+        except FutureTimeout:
+            raise RunTimeout("Run exceeded its time limit") from None
+        except BrokenProcessPool:
+            self._reset_pool()
+            raise
+        finally:
+            running = [f for f in futures if not f.cancel() and not f.done()]
+            if running:               # stop chunks that are already running
+                try:
+                    shm.buf[0] = 1
+                except TypeError:     # all finished (and released) in the meantime
+                    pass
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
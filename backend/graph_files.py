@@ -0,0 +1,500 @@
+"""
+backend/graph_files.py
+Bulk loading of large edge-list files into CSRGraphs.
+
+    snap    SNAP edge lists: "u v [weight]" per line, '#' / '%' comments
+    dimacs  DIMACS shortest-path files (.gr): "p sp n m", then "a u v w" arcs
+    csv     "source,target[,weight]" rows (also .tsv), header sniffed
+
+The file is memory-mapped and cut into chunks of whole lines.  Each chunk
+is tokenised with NumPy: a separator mask gives token starts and ends, and
+the tokens are gathered into a padded byte matrix that is read as integers
+or fixed-width strings in one go.  Nothing is built per line or per edge;
+only the node names end up as Python strs.  SNAP ids are compacted to the
+ones that occur, DIMACS keeps ids 1..n, CSV names are the fields as
+written, less one pair of enclosing double quotes (a quoted field still
+can't contain the delimiter).
+
+Each load saves ``<file>.avcsr`` next to the source: the CSR buffers and
+name table as raw bytes, tagged with the source's size and mtime.  Later
+loads of the unchanged file copy those buffers in instead of parsing.
+
+Run from the repo root:
+    python -m backend.graph_files USA-road-d.NY.gr --algo dijkstra --start 1 --end 264346
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import mmap
+import os
+import pathlib
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.algorithms.graph_core import CSRGraph
+
+FORMATS = ("snap", "dimacs", "csv")
+CHUNK_BYTES = 8 * 1024 * 1024    # parse this much of the file per NumPy pass
+CACHE_SUFFIX = ".avcsr"
+CACHE_MAGIC = b"AVG2"  # AVG1 caches may hold CSV names with their quotes
+CACHE_HEADER = struct.Struct("<4sI")  # magic, byte length of the JSON meta block
+HEADER_NAMES = {                      # CSV header columns, case-insensitive
+    "source": ("source", "src", "from", "u", "tail"),
+    "target": ("target", "dst", "to", "v", "head"),
+    "weight": ("weight", "cost", "length", "w"),
+}
+
+
+class GraphFileError(ValueError):
+    """The file isn't a graph in the format it was read as."""
+
+
+def detect_format(path) -> str:
+    suffix = pathlib.Path(path).suffix.lower()
+    if suffix == ".gr":
+        return "dimacs"
+    if suffix in (".csv", ".tsv"):
+        return "csv"
+    return "snap"
+
+
+def cache_path(path) -> pathlib.Path:
+    path = pathlib.Path(path)
+    return path.with_name(path.name + CACHE_SUFFIX)
+
+
+def load(path, fmt: str | None = None, undirected: bool = False, cache: bool = True) -> CSRGraph:
+    """
+    ``path`` as a CSRGraph, from its ``.avcsr`` cache when that matches the
+    file, else parsed (and, with ``cache``, saved for next time; a read-only
+    directory just means no cache).  ``undirected`` adds every edge in both
+    directions.  Bad files raise GraphFileError, missing ones OSError.
+    """
+    path = pathlib.Path(path)
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise GraphFileError(f"Unknown format '{fmt}', expected one of {', '.join(FORMATS)}")
+    st = path.stat()
+    meta = {"size": st.st_size, "mtime": st.st_mtime_ns, "format": fmt, "undirected": bool(undirected)}
+    if cache:
+        graph = read_cache(cache_path(path), meta)
+        if graph is not None:
+            return graph
+    graph = parse(path, fmt, undirected)
+    if cache:
+        try:
+            write_cache(cache_path(path), graph, meta)
+        except OSError:
+            pass
+    return graph
+
+
+# ── parsing ─────────────────────────────────────────────────────────────
+
+def parse(path, fmt: str, undirected: bool = False) -> CSRGraph:
+    """Parse ``path`` as ``fmt`` (see the module docstring); raises GraphFileError."""
+    path = pathlib.Path(path)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            if fmt == "dimacs":
+                raise GraphFileError(f"{path.name}: no 'p sp <nodes> <arcs>' line")
+            return CSRGraph.from_edges([], *np.empty((3, 0), np.int64))
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if fmt == "dimacs":
+                n = _dimacs_size(mm, path)
+                src, dst, weights = _read_columns(mm, 0, _skip_table(b"a", keep=True), _separator_table(),
+                                                  (1, 2, 3), True, int_ids=True)
+                for ids in (src, dst):
+                    if len(ids) and (ids.min() < 1 or ids.max() > n):
+                        raise GraphFileError(f"{path.name}: arc endpoints must be in 1..{n}")
+                names = list(map(str, range(1, n + 1)))
+                src, dst = src - 1, dst - 1
+            else:
+                if fmt == "csv":
+                    start, columns, delimiter = _csv_layout(mm)
+                    skip, separators = _skip_table(b"#"), _separator_table(delimiter)
+                else:
+                    start, columns = 0, (0, 1, 2)
+                    skip, separators = _skip_table(b"#%"), _separator_table()
+                src, dst, weights = _read_columns(mm, start, skip, separators, columns, None,
+                                                  int_ids=fmt == "snap")
+                names, ids = _intern(np.concatenate([src, dst]))
+                src, dst = ids[:len(src)], ids[len(src):]
+                try:
+                    names = list(map(str, names.tolist())) if fmt == "snap" else [
+                        name.decode() for name in names.tolist()
+                    ]
+                except UnicodeDecodeError:
+                    raise GraphFileError(f"{path.name}: node names must be UTF-8") from None
+    if weights is None:
+        weights = np.ones(len(src), np.int64)
+    elif not np.isfinite(weights).all():
+        raise GraphFileError(f"{path.name}: edge weights must be finite")
+    if undirected:
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        weights = np.concatenate([weights, weights])
+    return CSRGraph.from_edges(names, src, dst, weights)
+
+
+def _separator_table(extra: bytes = b"") -> np.ndarray:
+    table = np.zeros(256, dtype=bool)
+    table[list(b" \t\r\n" + extra)] = True
+    return table
+
+
+def _skip_table(first_bytes: bytes, keep: bool = False) -> np.ndarray:
+    """Lines whose first byte is flagged get dropped (``keep``: all the others do)."""
+    table = np.full(256, keep, dtype=bool)
+    table[list(first_bytes)] = not keep
+    table[ord("\n")] = False  # blank lines have no tokens anyway
+    return table
+
+
+def _chunks(mm, lo: int):
+    """``(lo, hi)`` spans of about CHUNK_BYTES that end on a line break."""
+    end = len(mm)
+    while lo < end:
+        hi = min(lo + CHUNK_BYTES, end)
+        if hi < end:
+            cut = mm.rfind(b"\n", lo, hi)
+            hi = cut + 1 if cut >= 0 else (mm.find(b"\n", hi) + 1 or end)
+        yield lo, hi
+        lo = hi
+
+
+def _tokenize(buf, skip, separators):
+    """
+    ``(starts, ends, lines, line_first)`` of the tokens in ``buf`` (whole
+    lines): byte offsets, the line each token is on, and the index of each
+    non-empty line's first token (a line's fields follow it in order).
+    """
+    newlines = np.flatnonzero(buf == 10)
+    token = ~separators[buf]
+    line_starts = np.concatenate(([0], newlines + 1))
+    line_starts = line_starts[line_starts < len(buf)]
+    dropped = line_starts[skip[buf[line_starts]]]
+    if len(dropped):
+        # mark each dropped line's bytes with a +1 / -1 pair and a running sum
+        at = np.searchsorted(newlines, dropped)
+        line_ends = np.append(newlines, len(buf))[at]
+        marks = np.zeros(len(buf) + 1, np.int8)
+        marks[dropped] = 1
+        marks[line_ends] -= 1
+        token &= ~np.cumsum(marks[:-1], dtype=np.int8).astype(bool)
+
+    edges = np.diff(token.view(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    lines = np.searchsorted(newlines, starts)
+    first = np.ones(len(starts), dtype=bool)
+    first[1:] = lines[1:] != lines[:-1]
+    return starts, ends, lines, np.flatnonzero(first)
+
+
+def _ints(buf, starts, ends):
+    """Non-negative integer tokens, a digit position at a time; GraphFileError(message, row) if not."""
+    lengths = ends - starts
+    width = int(lengths.max()) if len(lengths) else 0
+    value = np.zeros(len(starts), np.int64)
+    bad = lengths > 18
+    for k in range(min(width, 19)):
+        live = lengths > k
+        digit = (buf[np.where(live, starts + k, starts)] - ord("0")).astype(np.int64)  # non-digits wrap past 9
+        bad |= live & (digit > 9)
+        value = np.where(live, value * 10 + digit, value)
+    if bad.any():
+        raise GraphFileError("expected a non-negative integer", int(np.argmax(bad)))
+    return value
+
+
+def _strings(buf, starts, ends):
+    """
+    Tokens as a fixed-width bytes array (gathered into a NUL-padded byte
+    matrix), each without one pair of enclosing double quotes, so ``"A"``
+    and ``A`` are the same node.
+    """
+    quoted = (ends - starts >= 2) & (buf[starts] == ord('"')) & (buf[np.maximum(ends - 1, 0)] == ord('"'))
+    starts, ends = starts + quoted, ends - quoted
+    lengths = ends - starts
+    width = max(int(lengths.max()), 1) if len(lengths) else 1
+    rows = np.repeat(np.arange(len(starts)), lengths)
+    within = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    out = np.zeros((len(starts), width), np.uint8)
+    out[rows, within] = buf[starts[rows] + within]
+    return out.view(f"S{width}").ravel()
+
+
+def _numbers(buf, starts, ends):
+    """Weight tokens: the integer fast path, else a C-level bytes-to-float cast."""
+    try:
+        return _ints(buf, starts, ends)
+    except GraphFileError:
+        pass
+    strings = _strings(buf, starts, ends)
+    try:
+        return strings.astype(np.float64)
+    except ValueError:
+        for row, token in enumerate(strings.tolist()):  # only to say which one
+            try:
+                float(token)
+            except ValueError:
+                raise GraphFileError("expected a number", row) from None
+        raise
+
+
+def _read_columns(mm, start: int, skip, separators, columns: tuple, weighted, int_ids: bool):
+    """
+    ``(src, dst, weights)`` from the ``columns`` (source, target, weight
+    field indices) of every kept line from byte ``start`` on.  ``weighted``
+    None means "if the first data line has a weight field"; weights are then
+    None when it doesn't.
+    """
+    src_col, dst_col, weight_col = columns
+    need = max(src_col, dst_col) + 1
+    srcs, dsts, weights = [], [], []
+    line_base = mm[:start].count(b"\n")
+    for lo, hi in _chunks(mm, start):
+        buf = np.frombuffer(mm[lo:hi], np.uint8)  # a copy: a view would pin the mmap open
+        starts, ends, lines, line_first = _tokenize(buf, skip, separators)
+        if not len(starts):
+            line_base += int(np.count_nonzero(buf == 10))
+            continue
+        counts = np.diff(line_first, append=len(starts))
+        if weighted is None:
+            weighted = weight_col is not None and counts[0] > weight_col
+        required = max(need, weight_col + 1) if weighted else need
+        short = np.flatnonzero(counts < required)
+        if len(short):
+            line = line_base + int(lines[line_first[short[0]]]) + 1
+            raise GraphFileError(f"line {line}: expected at least {required} fields")
+        read = _ints if int_ids else _strings
+        fields = [(srcs, src_col, read), (dsts, dst_col, read)]
+        if weighted:
+            fields.append((weights, weight_col, _numbers))
+        for out, column, parse in fields:
+            at = line_first + column
+            try:
+                out.append(parse(buf, starts[at], ends[at]))
+            except GraphFileError as exc:
+                message, row = exc.args
+                line = line_base + int(lines[at[row]]) + 1
+                raise GraphFileError(f"line {line}, field {column + 1}: {message}") from None
+        line_base += int(np.count_nonzero(buf == 10))
+    empty = np.empty(0, np.int64 if int_ids else "S1")
+    return (
+        np.concatenate(srcs) if srcs else empty,
+        np.concatenate(dsts) if dsts else empty,
+        (np.concatenate(weights) if weights else np.empty(0)) if weighted else None,
+    )
+
+
+def _intern(keys):
+    """``(distinct keys, sorted; index of each key among them)``."""
+    order = np.argsort(keys)
+    ordered = keys[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = ordered[1:] != ordered[:-1]
+    index = np.empty(len(keys), np.int64)
+    index[order] = np.cumsum(first) - 1
+    return ordered[first], index
+
+
+def _dimacs_size(mm, path) -> int:
+    """Node count from the ``p sp <nodes> <arcs>`` line, which precedes the arcs."""
+    mm.seek(0)
+    for line in iter(mm.readline, b""):
+        if line.startswith(b"p"):
+            fields = line.split()
+            if len(fields) == 4 and fields[2].isdigit():
+                return int(fields[2])
+            break
+        if line.startswith(b"a"):
+            break
+    raise GraphFileError(f"{path.name}: no 'p sp <nodes> <arcs>' line before the arcs")
+
+
+def _csv_layout(mm):
+    """``(first data byte, (source, target, weight) columns, delimiter)`` of a CSV file."""
+    sample = mm[:64 * 1024].decode("utf-8", "replace")
+    if len(mm) > len(sample):
+        sample = sample[:sample.rfind("\n") + 1] or sample
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t ").delimiter
+    except csv.Error:  # one column, or too little to tell
+        delimiter = ","
+    first = sample.split("\n", 1)[0]
+    fields = [f.strip().strip('"').lower() for f in first.split(delimiter)]
+    found = {
+        role: next((i for i, f in enumerate(fields) if f in aliases), None)
+        for role, aliases in HEADER_NAMES.items()
+    }
+    if found["source"] is None and found["target"] is None:
+        try:  # no column names we know: fall back to guessing from the value types
+            header = csv.Sniffer().has_header(sample)
+        except csv.Error:
+            header = False
+        if not header:
+            return 0, (0, 1, 2), delimiter.encode()
+    source = found["source"] if found["source"] is not None else 0
+    target = found["target"] if found["target"] is not None else 1
+    weight = found["weight"] if found["weight"] is not None else (2 if len(fields) > 2 else None)
+    return len(first.encode()) + 1, (source, target, weight), delimiter.encode()
+
+
+# ── binary cache ────────────────────────────────────────────────────────
+
+def write_cache(path, graph: CSRGraph, meta: dict) -> None:
+    """Save ``graph`` as a ``.avcsr`` file tagged with ``meta`` (write-then-rename)."""
+    path = pathlib.Path(path)
+    names = "\n".join(graph.names).encode()
+    meta = {**meta, "nodes": len(graph), "edges": graph.num_edges,
+            "weights": graph.weights.typecode, "names": len(names)}
+    blob = json.dumps(meta, separators=(",", ":")).encode()
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(CACHE_HEADER.pack(CACHE_MAGIC, len(blob)))
+            f.write(blob)
+            for buffer in (graph.offsets, graph.targets, graph.weights):
+                buffer.tofile(f)
+            f.write(names)
+        os.replace(tmp, path)
+    except BaseException:
+        pathlib.Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def read_cache(path, meta: dict) -> CSRGraph | None:
+    """The graph in ``path`` if it's a ``.avcsr`` file saved with ``meta``, else None."""
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    with f:
+        head = f.read(CACHE_HEADER.size)
+        if len(head) < CACHE_HEADER.size:
+            return None
+        magic, length = CACHE_HEADER.unpack(head)
+        if magic != CACHE_MAGIC:
+            return None
+        try:
+            saved = json.loads(f.read(length))
+        except ValueError:
+            return None
+        if not isinstance(saved, dict) or any(saved.get(k) != v for k, v in meta.items()):
+            return None  # the source changed, or was read with other options
+        try:
+            n, m = saved["nodes"], saved["edges"]
+            offsets, targets, weights = array("q"), array("i"), array(saved["weights"])
+            offsets.fromfile(f, n + 1)
+            targets.fromfile(f, m)
+            weights.fromfile(f, m)
+            names = f.read(saved["names"]).decode()
+        except (EOFError, KeyError, TypeError, ValueError):  # truncated or damaged
+            return None
+    return CSRGraph(names.split("\n") if n else [], offsets, targets, weights)
+
+
+# ── server side ─────────────────────────────────────────────────────────
+
+class GraphFiles:
+    """
+    Graph files under one data directory, by relative path, with the last
+    few loaded graphs kept in memory (keyed by file size and mtime, so an
+    edited file is reloaded).  Thread-safe; two threads asking for the same
+    cold file may both load it.
+    """
+
+    def __init__(self, root, max_graphs: int = 4):
+        self.root = pathlib.Path(root).resolve()
+        self.max_graphs = max_graphs
+        self._graphs: OrderedDict[tuple, CSRGraph] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, relative: str) -> pathlib.Path:
+        """Absolute path of ``relative``; PermissionError if it leaves the root."""
+        path = (self.root / relative).resolve()
+        if not path.is_relative_to(self.root) or path == self.root:
+            raise PermissionError(f"'{relative}' is outside the graph data directory")
+        return path
+
+    def key(self, relative: str, fmt: str | None = None, undirected: bool = False) -> tuple:
+        """Identity of the graph ``get`` would return; changes when the file does."""
+        path = self.resolve(relative)
+        st = path.stat()
+        return str(path), st.st_size, st.st_mtime_ns, fmt or detect_format(path), bool(undirected)
+
+    def get(self, relative: str, fmt: str | None = None, undirected: bool = False) -> CSRGraph:
+        key = self.key(relative, fmt, undirected)
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self._graphs.move_to_end(key)
+                return graph
+        graph = load(key[0], key[3], undirected)
+        with self._lock:
+            self._graphs[key] = graph
+            while len(self._graphs) > self.max_graphs:
+                self._graphs.popitem(last=False)
+        return graph
+
+
+# ── CLI ─────────────────────────────────────────────────────────────────
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file suffix")
+    parser.add_argument("--undirected", action="store_true", help="add every edge both ways")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the .avcsr cache")
+    parser.add_argument("--algo", help="run an /api/run algorithm on the loaded graph")
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    args = parser.parse_args(argv)
+
+    t = time.perf_counter()
+    try:
+        graph = load(args.path, args.format, args.undirected, cache=not args.no_cache)
+    except (OSError, GraphFileError) as exc:
+        parser.exit(1, f"error: {exc}\n")
+    t = time.perf_counter() - t
+    print(f"{args.path}: {len(graph):,} nodes, {graph.num_edges:,} edges, "
+          f"{graph.nbytes / 2 ** 20:,.1f} MiB of CSR buffers, loaded in {t:.2f}s")
+    if not args.algo:
+        return
+
+    from backend.main import ALGO_MAP, _needs_start  # flask is only needed for this
+    algo = ALGO_MAP.get(args.algo)
+    if algo is None:
+        parser.exit(2, f"error: unknown algorithm '{args.algo}'\n")
+    for name in (args.start, args.end):
+        if name is not None and name not in graph:
+            parser.exit(2, f"error: node '{name}' not in graph\n")
+    if args.start is None and _needs_start(algo):
+        parser.exit(2, f"error: '{args.algo}' needs --start\n")
+    t = time.perf_counter()
+    steps = algo(graph, args.start, args.end)
+    try:
+        while True:
+            next(steps)
+    except StopIteration as stop:
+        result = stop.value
+    t = time.perf_counter() - t
+    print(f"{args.algo}: {t:.2f}s")
+    for field in ("path", "totalWeight", "negativeCycle", "cycle", "reachable"):
+        if result.get(field) is not None:
+            print(f"  {field}: {json.dumps(result[field])[:2000]}")
+    if args.end is not None and isinstance(result.get("distances"), dict):
+        print(f"  distance: {result['distances'].get(args.end)}")
+
+
+if __name__ == "__main__":
+    main()
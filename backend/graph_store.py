@@ -0,0 +1,280 @@
+"""
+backend/graph_store.py
+Server-side graph sessions for /api/graphs.
+
+A client uploads a graph once, then sends small edit batches (add / remove
+node or edge) and runs algorithms by id, so an edit costs O(change) in
+upload and parse time instead of resending the whole adjacency dict.
+
+Each session keeps a mutable ``{u: {v: weight}}`` adjacency plus a reverse
+index (so removing a node only touches its own edges) and a version number
+that every successful PATCH bumps.  The CSRGraph the algorithms run on is
+rebuilt lazily, at most once per version.
+
+Sessions also keep the last few edit batches, so Dijkstra trees kept per
+start node (DynamicSSSP) can be repaired instead of recomputed, and a
+client that says which version it last saw can get just the nodes that
+changed since.
+"""
+from __future__ import annotations
+
+import math
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+
+from backend.algorithms.dynamic_sssp import DynamicSSSP
+from backend.algorithms.graph_core import CSRGraph
+
+OPS = ("add_node", "remove_node", "add_edge", "remove_edge")
+LOG_VERSIONS = 64        # edit batches kept for repairing dynamic trees
+TREES_PER_SESSION = 8    # dynamic shortest-path trees kept per session (one per start)
+
+
+class SessionNotFound(KeyError):
+    """No session with that id (never created, deleted or evicted)."""
+
+
+class BadOperation(ValueError):
+    """An edit operation is malformed or doesn't fit the graph."""
+
+
+def is_weight(w) -> bool:
+    """A finite int or float edge weight (bools are ints to Python, not here)."""
+    return not isinstance(w, bool) and isinstance(w, (int, float)) and math.isfinite(w)
+
+
+class GraphSession:
+    """One uploaded graph: adjacency, reverse index and version, behind a lock."""
+
+    def __init__(self, graph_id: str, adjacency: dict):
+        self.id = graph_id
+        self.version = 1
+        self.lock = threading.Lock()
+        self.touched = time.monotonic()
+        self.adjacency = {u: dict(nbrs) for u, nbrs in adjacency.items()}
+        self.incoming = {u: set() for u in self.adjacency}
+        for u, nbrs in self.adjacency.items():
+            for v in nbrs:
+                self.incoming[v].add(u)
+        self._csr = None  # CSRGraph of the current version, built on demand
+        self.log = deque(maxlen=LOG_VERSIONS)  # (version, changes) of recent PATCHes
+        self.trees: OrderedDict[str, _Tree] = OrderedDict()  # start -> dynamic tree
+
+    @property
+    def num_edges(self) -> int:
+        return sum(len(nbrs) for nbrs in self.adjacency.values())
+
+    def csr(self) -> CSRGraph:
+        """The current version as a CSRGraph; call with ``lock`` held."""
+        if self._csr is None:
+            self._csr = CSRGraph.from_adjacency(self.adjacency)
+        return self._csr
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "version": self.version,
+            "nodeCount": len(self.adjacency),
+            "edgeCount": self.num_edges,
+        }
+
+    # ── edits ───────────────────────────────────────────────────────────
+    def apply(self, ops: list) -> list:
+        """
+        Apply ``ops`` in order, all or nothing; call with ``lock`` held.
+        Returns the applied changes as ``(op, u, v, old_weight)`` tuples
+        (``old_weight`` is None for new edges; ``v`` and ``old_weight`` are
+        None for node ops); removing a node first lists the removal of each of its
+        edges.  DynamicSSSP.repair() takes them as they are.
+        """
+        undo, changes = [], []
+        try:
+            for i, op in enumerate(ops):
+                try:
+                    self._apply_one(op, undo, changes)
+                except BadOperation as exc:
+                    raise BadOperation(f"Operation {i}: {exc}") from None
+        except BadOperation:
+            for action in reversed(undo):
+                action()
+            self.trees.clear()  # undoing a node removal moves it to the end: ids shift
+            raise
+        if changes:
+            self.version += 1
+            self._csr = None
+            self.log.append((self.version, changes))
+        return changes
+
+    def _apply_one(self, op, undo: list, changes: list) -> None:
+        if not isinstance(op, dict) or op.get("op") not in OPS:
+            raise BadOperation(f"expected an object with 'op' in {', '.join(OPS)}")
+        kind = op["op"]
+        adjacency, incoming = self.adjacency, self.incoming
+
+        if kind in ("add_node", "remove_node"):
+            u = op.get("node")
+            if not isinstance(u, str) or not u:
+                raise BadOperation("field 'node' must be a non-empty string")
+            if kind == "add_node":
+                if u in adjacency:
+                    raise BadOperation(f"node '{u}' already exists")
+                adjacency[u], incoming[u] = {}, set()
+                undo.append(lambda: (adjacency.pop(u), incoming.pop(u)))
+                changes.append((kind, u, None, None))
+                return
+            if u not in adjacency:
+                raise BadOperation(f"node '{u}' not present in graph")
+            # drop its edges first so every removal is undoable on its own
+            for v, w in list(adjacency[u].items()):
+                self._remove_edge(u, v, w, undo, changes)
+            for s in list(incoming[u]):
+                self._remove_edge(s, u, adjacency[s][u], undo, changes)
+            adjacency.pop(u), incoming.pop(u)
+            undo.append(lambda: (adjacency.__setitem__(u, {}), incoming.__setitem__(u, set())))
+            changes.append((kind, u, None, None))
+            return
+
+        u, v = op.get("from"), op.get("to")
+        for field, name in (("from", u), ("to", v)):
+            if not isinstance(name, str) or not name:
+                raise BadOperation(f"field '{field}' must be a non-empty string")
+            if name not in adjacency:
+                raise BadOperation(f"node '{name}' not present in graph")
+        if kind == "remove_edge":
+            if v not in adjacency[u]:
+                raise BadOperation(f"no edge '{u}' -> '{v}'")
+            self._remove_edge(u, v, adjacency[u][v], undo, changes)
+            return
+        w = op.get("weight", 1)
+        if not is_weight(w):
+            raise BadOperation("field 'weight' must be a finite number")
+        old = adjacency[u].get(v)
+        adjacency[u][v] = w
+        incoming[v].add(u)
+        if old is None:
+            undo.append(lambda: (adjacency[u].pop(v), incoming[v].discard(u)))
+        else:
+            undo.append(lambda: adjacency[u].__setitem__(v, old))
+        changes.append((kind, u, v, old))
+
+    def _remove_edge(self, u, v, w, undo: list, changes: list) -> None:
+        del self.adjacency[u][v]
+        self.incoming[v].discard(u)
+        undo.append(lambda: (self.adjacency[u].__setitem__(v, w), self.incoming[v].add(u)))
+        changes.append(("remove_edge", u, v, w))
+
+    # ── dynamic shortest paths ──────────────────────────────────────────
+    def dynamic_paths(self, start, end=None, base_version=None) -> dict:
+        """
+        Dijkstra result from ``start`` at the current version, repaired from
+        the edit log when a tree for ``start`` is kept; call with ``lock``
+        held.  With ``base_version`` (a version this start was last served
+        at) only nodes whose distance or predecessor changed since are
+        listed, plus ``removed`` ones; otherwise the result is complete.
+        """
+        entry = self._tree(start)
+        changed = entry.changed_since(base_version) if base_version is not None else None
+        if changed is None:
+            result = entry.tree.result(end)
+        else:
+            dist = entry.tree.dist
+            result = entry.tree.result(end, [v for v in changed if v in dist])
+            result.update(delta=True, baseVersion=base_version,
+                          removed=sorted(v for v in changed if v not in dist))
+        result["version"] = self.version
+        return result
+
+    def _tree(self, start) -> "_Tree":
+        entry = self.trees.get(start)
+        if entry is not None:
+            self.trees.move_to_end(start)
+            if entry.version == self.version:
+                return entry
+            # one repair over every batch since the tree's version
+            pending = [item for item in self.log if item[0] > entry.version]
+            if pending and pending[0][0] == entry.version + 1:
+                try:
+                    changed = entry.tree.repair([c for _, changes in pending for c in changes])
+                except ValueError:
+                    pass  # e.g. the start was removed: rebuilding reports it
+                else:
+                    entry.history.append((entry.version, self.version, changed))
+                    entry.version = self.version
+                    return entry
+            del self.trees[start]  # log no longer reaches back far enough
+        entry = _Tree(DynamicSSSP(self.adjacency, start, incoming=self.incoming), self.version)
+        self.trees[start] = entry
+        while len(self.trees) > TREES_PER_SESSION:
+            self.trees.popitem(last=False)
+        return entry
+
+
+class _Tree:
+    """A session's DynamicSSSP plus which nodes each repair changed."""
+
+    __slots__ = ("tree", "version", "history")
+
+    def __init__(self, tree: DynamicSSSP, version: int):
+        self.tree = tree
+        self.version = version
+        self.history = deque(maxlen=LOG_VERSIONS)  # (from_version, to_version, changed names)
+
+    def changed_since(self, version: int) -> set | None:
+        """Names changed after ``version``, or None if that's not a version this tree was at."""
+        if version == self.version:
+            return set()
+        changed = None
+        for lo, hi, names in self.history:
+            if changed is None:
+                if lo != version:
+                    continue
+                changed = set()
+            changed |= names
+        return changed
+
+
+class GraphStore:
+    """Thread-safe, LRU-bounded map of session id -> GraphSession with an idle TTL."""
+
+    def __init__(self, max_sessions: int, ttl: float):
+        self.max_sessions = max_sessions
+        self.ttl = ttl                       # seconds without use before a session expires
+        self._sessions: OrderedDict[str, GraphSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, adjacency: dict) -> GraphSession:
+        session = GraphSession(secrets.token_urlsafe(12), adjacency)
+        with self._lock:
+            self._expire()
+            self._sessions[session.id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, graph_id: str) -> GraphSession:
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(graph_id)
+            if session is None:
+                raise SessionNotFound(graph_id)
+            self._sessions.move_to_end(graph_id)
+            session.touched = time.monotonic()
+            return session
+
+    def delete(self, graph_id: str) -> None:
+        with self._lock:
+            if self._sessions.pop(graph_id, None) is None:
+                raise SessionNotFound(graph_id)
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))  # LRU order = touch order
+            if oldest.touched >= cutoff:
+                break
+            self._sessions.popitem(last=False)
@@ -9,8 +9,15 @@ or
 """
 from __future__ import annotations
 
+import hashlib
+import inspect
+import math
+import os
 import pathlib
-from flask import Flask, request, jsonify, send_from_directory
+import secrets
+import time
+from datetime import datetime, timezone
+from flask import Flask, Response, current_app, g, request, jsonify, send_from_directory
 from flask_cors import CORS
 
 # ── Paths ────────────────────────────────────────────────────────────
@@ -18,17 +25,314 @@ ROOT = pathlib.Path(__file__).resolve().parent
 FRONTEND_DIR = ROOT.parent / "frontend"
 
 # ── Import algorithms ────────────────────────────────────────────────
-# After you rename your algo files to snake_case (bfs.py, dfs.py, dijkstra.py)
-from algos.algorithms import bfs, dfs, dijkstra  # noqa: E402
+from backend.algorithms.all_pairs import all_pairs  # noqa: E402
+from backend.algorithms.analysis import analyze  # noqa: E402
+from backend.algorithms.astar import astar  # noqa: E402
+from backend.algorithms.bellman_ford import bellman_ford  # noqa: E402
+from backend.algorithms.bfs import bfs  # noqa: E402
+from backend.algorithms.bidirectional import bidirectional_bfs, bidirectional_dijkstra  # noqa: E402
+from backend.algorithms.dfs import dfs  # noqa: E402
+from backend.algorithms.dijkstra import dijkstra  # noqa: E402
+from backend.algorithms.generators import BOX, generate, node_names  # noqa: E402
+from backend.algorithms.graph_core import CSRGraph  # noqa: E402
+from backend.algorithms.layout import ITERATIONS, force_layout  # noqa: E402
+from backend.algorithms.mst import kruskal, prim  # noqa: E402
+from backend.algorithms.topological_sort import topological_sort  # noqa: E402
+from backend.algorithms.trace import TRACE_FORMAT, record  # noqa: E402
+from backend.codec import (  # noqa: E402
+    EDGES, JSON, MSGPACK, UnsupportedFormat, dumps, loads, read_edges, response_types,
+)
+from backend.executor import (  # noqa: E402
+    QueueFull, RunExecutor, RunTimeout, guarded, run_batch_inline, run_inline,
+)
+from backend.graph_files import FORMATS, GraphFileError, GraphFiles  # noqa: E402
+from backend.graph_store import BadOperation, GraphStore, SessionNotFound, is_weight  # noqa: E402
+from backend.metrics import PROMETHEUS_TEXT, Metrics, PhaseTimer, SamplingProfiler, format_profile  # noqa: E402
+from backend.result_cache import ResultCache, canonical_adjacency, run_key  # noqa: E402
 
 ALGO_MAP = {
     "bfs": bfs,
     "dfs": dfs,
     "dijkstra": dijkstra,
+    "all-pairs": all_pairs,
+    "astar": astar,
+    "bidirectional-dijkstra": bidirectional_dijkstra,
+    "bidirectional-bfs": bidirectional_bfs,
+    "bellman-ford": bellman_ford,
+    "topological-sort": topological_sort,
+    "prim": prim,
+    "kruskal": kruskal,
+    "analysis": analyze,
 }
 
+# /api/algorithms/<name> routes of the old Node server (server.js):
+# name -> (ALGO_MAP key, forced ``directed`` or None, result fields it returned)
+NODE_ALGOS = {
+    "dijkstra": ("dijkstra", None, ("distances", "path", "previous")),
+    "bellman-ford": ("bellman-ford", None, ("distances", "previous")),
+    "floyd-warshall": ("all-pairs", None, ("distances", "next")),
+    "topological-sort": ("topological-sort", True, ("order",)),
+    "bfs": ("bfs", None, ("traversal", "parent")),
+    "dfs": ("dfs", None, ("traversal", "parent")),
+    "prim": ("prim", False, ("mst", "totalWeight")),
+    "kruskal": ("kruskal", False, ("mst", "totalWeight")),
+}
+
+NDJSON = "application/x-ndjson"
+STREAM_CHUNK_BYTES = 16 * 1024  # coalesce small step lines into writes of about this size
+GENERATE_FORMATS = ("frontend", "adjacency", "columns")
+GENERATE_CHUNK_ROWS = 64 * 1024  # nodes / edges per line of a streamed /api/graph/generate
+
+
+def _needs_start(algo) -> bool:
+    """Algorithms whose ``start`` parameter defaults to None (e.g. all-pairs) don't need one."""
+    return inspect.signature(algo).parameters["start"].default is inspect.Parameter.empty
+
+
+def _has_negative_weight(graph) -> bool:
+    """Whether ``graph`` (a dict or CSRGraph) has an edge weighing less than zero."""
+    if isinstance(graph, CSRGraph):
+        return bool(len(graph.weights)) and min(graph.weights) < 0
+    return any(w < 0 for nbrs in graph.values() if isinstance(nbrs, dict) for w in nbrs.values())
+
+
+NEGATIVE_DIJKSTRA = "Dijkstra needs non-negative edge weights; use 'bellman-ford'"
+
+
+def _algo_name(value, default: str = "dijkstra") -> str | None:
+    """A request's lower-cased ``algo`` field (``default`` if absent), or None if it isn't a string."""
+    value = value or default
+    return value.lower() if isinstance(value, str) else None
+
+
+def _query_error(algo_name: str | None, graph, start, end, options) -> str | None:
+    """Why a single run's parameters are invalid for ``graph`` (a dict or CSRGraph), or None."""
+    if algo_name is None:
+        return "Field 'algo' must be a string"
+    if algo_name not in ALGO_MAP:
+        return f"Unknown algorithm '{algo_name}'"
+    for field, node in (("start", start), ("end", end)):
+        if node is not None and not isinstance(node, str):
+            return f"Field '{field}' must be a node name"
+    if not start and _needs_start(ALGO_MAP[algo_name]):
+        return "Fields 'graph' and 'start' are required"
+    if start is not None and start not in graph:
+        return f"Start node '{start}' not present in graph"
+    if end is not None and end not in graph:
+        return f"End node '{end}' not present in graph"
+    if not isinstance(options, dict):
+        return "Field 'options' must be an object"
+    try:
+        inspect.signature(ALGO_MAP[algo_name]).bind(graph, start, end, **options)
+    except TypeError as exc:
+        return f"Bad options for '{algo_name}': {exc}"
+    if algo_name == "dijkstra" and _has_negative_weight(graph):
+        return NEGATIVE_DIJKSTRA
+    return None
+
+
+def _has_undefined_targets(graph: dict) -> bool:
+    return any(neigh not in graph for nbrs in graph.values() for neigh in nbrs)
+
+
+def _parse_queries(queries: list, default_algo: str, graph):
+    """``(error, parsed)`` for a batch's queries: ``parsed`` holds ``(algo_name, start, end, options)``."""
+    parsed = []
+    for i, query in enumerate(queries):
+        if not isinstance(query, dict):
+            return f"Query {i} must be an object", None
+        algo_name = _algo_name(query.get("algo"), default_algo)
+        start, end = query.get("start"), query.get("end")
+        options = query.get("options") or {}
+        error = _query_error(algo_name, graph, start, end, options)
+        if error:
+            return f"Query {i}: {error}", None
+        parsed.append((algo_name, start, end, options))
+    return None, parsed
+
+
+def _is_node_id(value) -> bool:
+    """server.js node ids are JSON strings or numbers."""
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+
+def _node_graph(nodes, edges, directed: bool) -> dict:
+    """
+    ``{id: {id: weight}}`` from server.js' request shape: ``nodes`` with an
+    ``id`` and ``edges`` whose ``from`` / ``to`` are nodes (or bare ids).
+    Undirected edges go both ways; of parallel edges the lightest wins.
+    """
+    if not isinstance(nodes, list) or not isinstance(edges, list):
+        raise ValueError("Fields 'nodes' and 'edges' must be lists")
+    graph = {}
+    for node in nodes:
+        if not isinstance(node, dict) or node.get("id") is None:
+            raise ValueError("Every node needs an 'id'")
+        if not _is_node_id(node["id"]):
+            raise ValueError("Node ids must be strings or numbers")
+        graph.setdefault(node["id"], {})
+
+    def end_id(edge, side):
+        ref = edge.get(side)
+        ref = ref.get("id") if isinstance(ref, dict) else ref
+        if ref is None:
+            raise ValueError(f"Every edge needs a '{side}' node")
+        if not _is_node_id(ref):
+            raise ValueError("Node ids must be strings or numbers")
+        graph.setdefault(ref, {})  # like graph.js, unknown ends become nodes
+        return ref
+
+    for edge in edges:
+        if not isinstance(edge, dict):
+            raise ValueError("Every edge must be an object")
+        u, v = end_id(edge, "from"), end_id(edge, "to")
+        w = edge.get("weight", 1)
+        if isinstance(w, bool) or not isinstance(w, (int, float)):
+            raise ValueError(f"Edge {u} -> {v} has a non-numeric weight")
+        for a, b in ((u, v),) if directed else ((u, v), (v, u)):
+            if w < graph[a].get(b, math.inf):
+                graph[a][b] = w
+    return graph
+
+
+def _node_error(result: dict) -> str | None:
+    """server.js reported these as errors rather than results."""
+    if result.get("negativeCycle"):
+        return "Graph contains negative weight cycle: " + " -> ".join(map(str, result["negativeCycle"]))
+    if result.get("cycle"):
+        return "Graph contains a cycle: " + " -> ".join(map(str, result["cycle"]))
+    return None
+
+
+GRAPH_SHAPE_ERROR = "Field 'graph' must map node names to {neighbour: weight} or [neighbour, ...]"
+
+
+def _read_run_request():
+    """
+    ``(data, csr)`` from a run request: a JSON (default) or msgpack document
+    with ``csr`` None, or an edge-list upload whose params are ``data`` and
+    whose graph arrives already packed.  Raises ValueError / UnsupportedFormat.
+    """
+    mimetype = request.mimetype
+    if mimetype == EDGES:
+        return read_edges(request.get_data(), current_app.config["UPLOAD_MAX_NODES"])
+    if mimetype in (MSGPACK, "application/x-msgpack"):
+        data = loads(request.get_data(), MSGPACK)
+    elif request.is_json:
+        data = loads(request.get_data() or b"{}")
+    else:
+        return {}, None  # like get_json(silent=True): ends as a "required" error
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be an object")
+    return data, None
+
+
+def _response_type() -> str:
+    """JSON unless the client's Accept prefers another encoding this server has."""
+    return request.accept_mimetypes.best_match(response_types()) or JSON
+
+
+def _pack_graph(graph) -> CSRGraph:
+    """
+    Check and pack an adjacency object in one pass.  The CSR build interns
+    every target it meets, so a target that isn't a key shows up as an
+    extra node instead of needing its own scan.  Raises ValueError.
+    """
+    if not isinstance(graph, dict):
+        raise ValueError(GRAPH_SHAPE_ERROR)
+    try:
+        csr = CSRGraph.from_adjacency(graph)
+    except (TypeError, OverflowError):  # e.g. a number for a neighbour list, or a string weight
+        raise ValueError(GRAPH_SHAPE_ERROR) from None
+    if len(csr) > len(graph):
+        raise ValueError("Graph contains edges to undefined nodes")
+    return csr
+
+
+def _int_field(data: dict, key: str, default):
+    value = data.get(key, default)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+        raise ValueError(f"Field '{key}' must be an integer")
+    return value
+
+
+def _stream_generated(generated, names: list, header: dict):
+    """NDJSON body: ``start``, ``nodes`` / ``edges`` column chunks by node id, then ``end``."""
+    yield _ndjson({"type": "start", **header})
+    for kind, columns in generated.chunks(names, GENERATE_CHUNK_ROWS):
+        yield _ndjson({"type": kind, **columns})
+    yield _ndjson({"type": "end"})
+
+
+def _run_size(algo_name: str, graph: CSRGraph) -> int:
+    """Rough work estimate that decides between inline and the process pool."""
+    n = len(graph)
+    return n * n if algo_name == "all-pairs" else n + graph.num_edges
+
+
+def _ndjson(obj) -> bytes:
+    return dumps(obj) + b"\n"
+
+
+def _stream_run(steps, num_nodes: int, header: dict, logger, on_result=None):
+    """
+    NDJSON body for a streamed run: a ``start`` line, then ``step`` and
+    ``keyframe`` lines as the generator produces them, then ``result`` (or
+    ``error``).  Node ids index the request graph's keys in order.
+    ``on_result(counts)`` gets the run's operation counts once it finished.
+
+    The WSGI server only pulls the next chunk once the previous one was
+    written, so a slow client pauses the algorithm instead of piling steps
+    up in memory, and a disconnect closes this generator, which closes the
+    algorithm's generator with it.
+    """
+    counts = {}
+    records = record(steps, num_nodes, counts=counts)
+    try:
+        yield _ndjson({"type": "start", **header})
+        buf, size, flush_now = [], 0, True  # first step goes out on its own
+        while True:
+            try:
+                kind, payload = next(records)
+            except StopIteration as stop:
+                buf.append(_ndjson({"type": "result", "result": stop.value}))
+                if on_result is not None:
+                    on_result(counts)
+                break
+            line = _ndjson({"type": kind, **payload})
+            buf.append(line)
+            size += len(line)
+            if flush_now or size >= STREAM_CHUNK_BYTES:
+                yield b"".join(buf)
+                buf, size, flush_now = [], 0, False
+        yield b"".join(buf)
+    except RunTimeout:
+        yield b"".join(buf) + _ndjson({"type": "error", "error": "Run exceeded its time limit"})
+    except Exception as exc:
+        logger.exception(exc)
+        yield _ndjson({"type": "error", "error": "Internal server error"})
+    finally:
+        records.close()
+
+
+def _stream_batch(entries, header: dict, logger):
+    """NDJSON body for a batch: ``start``, one ``result`` line per query as it finishes, ``end``."""
+    try:
+        yield _ndjson({"type": "start", **header})
+        for i, entry in entries:
+            yield _ndjson({"type": "result", "index": i, **entry})
+        yield _ndjson({"type": "end"})
+    except RunTimeout:
+        yield _ndjson({"type": "error", "error": "Batch exceeded its time limit"})
+    except Exception as exc:
+        logger.exception(exc)
+        yield _ndjson({"type": "error", "error": "Internal server error"})
+    finally:
+        entries.close()
+
+
 # ── Factory so tests and prod share the same app instance ────────────
-def create_app() -> Flask:
+def create_app(config: dict | None = None) -> Flask:
     app = Flask(
         __name__,
         static_folder=str(FRONTEND_DIR),  # serves everything in /frontend
@@ -36,32 +340,720 @@ def create_app() -> Flask:
     )
     CORS(app)  # tighten origins in prod
 
+    # result cache: 0 bytes disables it; set a directory to keep entries across restarts
+    app.config.update(
+        RESULT_CACHE_BYTES=64 * 1024 * 1024,
+        RESULT_CACHE_DIR=os.environ.get("ALGOVIS_CACHE_DIR"),
+        RESULT_CACHE_DISK_BYTES=1024 * 1024 * 1024,
+        # runs bigger than RUN_INLINE_MAX_SIZE (nodes + edges, V^2 for all-pairs)
+        # go to a process pool; 0 workers keeps everything inline
+        RUN_POOL_WORKERS=min(4, os.cpu_count() or 1),
+        RUN_POOL_PENDING=8,
+        RUN_INLINE_MAX_SIZE=200_000,
+        RUN_TIMEOUT=30.0,                       # seconds, wall clock
+        RUN_STREAM_TIMEOUT=300.0,               # seconds for a streamed run, client pacing included
+        RUN_MEMORY_LIMIT=4 * 1024 ** 3,         # bytes of address space per pool worker
+        RUN_BATCH_MAX_QUERIES=4096,
+        RUN_BATCH_TIMEOUT=120.0,                # seconds for a whole /api/run/batch
+        GRAPH_SESSIONS_MAX=256,                 # least recently used sessions go first
+        GRAPH_SESSION_TTL=3600.0,               # seconds a session may sit unused
+        UPLOAD_MAX_NODES=1_000_000,             # edge-list uploads (whose header alone sets n)
+        GENERATE_MAX_NODES=5_000_000,           # /api/graph/generate limits
+        GENERATE_MAX_EDGES=10_000_000,
+        LAYOUT_MAX_NODES=100_000,               # /api/graph/layout limits (runs inline)
+        LAYOUT_MAX_ITERATIONS=500,
+        # graph files the API may load by "path", relative to this directory
+        # (unset: loading by path is off); the last few loaded stay in memory
+        GRAPH_DATA_DIR=os.environ.get("ALGOVIS_DATA_DIR"),
+        GRAPH_FILES_MAX=4,
+        # sample the stacks of requests in flight and report those that took
+        # longer than this many seconds (unset: profiler off); the collapsed
+        # stacks go to PROFILE_DIR if set, else a summary to the log
+        PROFILE_SLOW_SECONDS=None,
+        PROFILE_INTERVAL=0.005,
+        PROFILE_DIR=None,
+    )
+    app.config.update(config or {})
+    cache = None
+    if app.config["RESULT_CACHE_BYTES"]:
+        cache = ResultCache(
+            app.config["RESULT_CACHE_BYTES"],
+            app.config["RESULT_CACHE_DIR"],
+            app.config["RESULT_CACHE_DISK_BYTES"],
+        )
+    store = GraphStore(app.config["GRAPH_SESSIONS_MAX"], app.config["GRAPH_SESSION_TTL"])
+    files = None
+    if app.config["GRAPH_DATA_DIR"]:
+        files = GraphFiles(app.config["GRAPH_DATA_DIR"], app.config["GRAPH_FILES_MAX"])
+    executor = None
+    if app.config["RUN_POOL_WORKERS"]:
+        executor = RunExecutor(
+            app.config["RUN_POOL_WORKERS"],
+            app.config["RUN_POOL_PENDING"],
+            app.config["RUN_MEMORY_LIMIT"],
+        )
+    metrics = Metrics()
+    profiler = None
+    if app.config["PROFILE_SLOW_SECONDS"] is not None:
+        profiler = SamplingProfiler(app.config["PROFILE_INTERVAL"])
+
+    # ── Instrumentation ──────────────────────────────────────────────
+    # handlers charge their phases to g.timer (see metrics.PhaseTimer); every
+    # response gets them as Server-Timing and feeds the /metrics histograms
+    @app.before_request
+    def start_timer():
+        g.timer = PhaseTimer()
+        if profiler is not None:
+            profiler.begin()
+
+    @app.after_request
+    def record_timing(response):
+        timer = g.get("timer")
+        if timer is None:
+            return response
+        total = timer.elapsed()
+        response.headers["Server-Timing"] = timer.header(total)
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe_request(endpoint, request.method, response.status_code, total,
+                                request.content_length or 0, timer.phases)
+        if profiler is not None:
+            samples = profiler.end()
+            if total >= app.config["PROFILE_SLOW_SECONDS"] and samples:
+                metrics.count_slow(endpoint)
+                report_slow(endpoint, total, samples)
+        return response
+
+    @app.teardown_request
+    def stop_profiler(_exc):
+        if profiler is not None:
+            profiler.end()  # no-op unless the request failed before after_request
+
+    def report_slow(endpoint: str, total: float, samples) -> None:
+        directory = app.config["PROFILE_DIR"]
+        if directory:
+            path = pathlib.Path(directory) / f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(4)}.folded"
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(format_profile(samples))
+            except OSError as exc:  # never fail the request over its profile
+                app.logger.warning("Could not write profile %s: %s", path, exc)
+            else:
+                app.logger.warning("Slow request %s %s: %.0f ms, profile in %s",
+                                   request.method, endpoint, total * 1e3, path)
+        else:
+            app.logger.warning("Slow request %s %s: %.0f ms, most sampled stacks:\n%s",
+                               request.method, endpoint, total * 1e3, format_profile(samples, 10))
+
+    def open_graph_file(data: dict):
+        """
+        ``(csr, identity, None)`` for the graph file a request names by
+        ``path`` (under GRAPH_DATA_DIR; ``format`` and ``undirected`` as in
+        graph_files.load), or ``(None, None, error response)``.
+        """
+        path, fmt = data.get("path"), data.get("format")
+        undirected = bool(data.get("undirected"))
+        if files is None:
+            return None, None, (jsonify(error="Loading graphs by path is disabled on this server"), 403)
+        if not isinstance(path, str) or not path:
+            return None, None, (jsonify(error="Field 'path' must be a relative file path"), 400)
+        if fmt is not None and fmt not in FORMATS:
+            return None, None, (jsonify(error=f"Field 'format' must be one of {', '.join(FORMATS)}"), 400)
+        try:
+            identity = files.key(path, fmt, undirected)
+            csr = files.get(path, fmt, undirected)
+        except PermissionError as exc:
+            return None, None, (jsonify(error=str(exc)), 403)
+        except GraphFileError as exc:
+            return None, None, (jsonify(error=f"{path}: {exc}"), 400)
+        except OSError:
+            return None, None, (jsonify(error=f"No graph file '{path}'"), 404)
+        return csr, identity, None
+
     # ── API route ────────────────────────────────────────────────────
     @app.post("/api/run")
     def run_algorithm():
-        data = request.get_json(silent=True) or {}
+        """
+        Run one algorithm.  The body is JSON, msgpack or an edge-list upload
+        (see codec.py); the response is JSON or msgpack as ``Accept`` asks.
+        Instead of ``graph`` a request may name a server-side graph file by
+        ``path`` (see graph_files.py).
+        """
+        timer = g.timer
+        try:
+            data, csr = _read_run_request()
+        except UnsupportedFormat as exc:
+            return jsonify(error=str(exc)), 415
+        except ValueError as exc:
+            return jsonify(error=str(exc)), 400
+        timer.lap("parse")
         graph = data.get("graph")
+        graph_id = data.get("graphId")         # run a /api/graphs session instead of "graph"
+        path = data.get("path")                # or a graph file under GRAPH_DATA_DIR
+        dynamic = bool(data.get("dynamic"))    # session Dijkstra, repaired after edits
         start = data.get("start")
-        algo_name = (data.get("algo") or "dijkstra").lower()
+        end = data.get("end")                  # optional target, enables early exit
+        options = data.get("options") or {}    # extra keyword args, e.g. {"queue": "radix"}
+        algo_name = _algo_name(data.get("algo"))
+        stream = bool(data.get("stream")) or request.accept_mimetypes.best == NDJSON
+        fmt = _response_type()
+        uploaded = csr is not None             # an edge list, already packed
+        file_key = None
 
         # ---- Validation ------------------------------------------------
-        if not graph or not start:
-            return jsonify(error="Fields 'graph' and 'start' are required"), 400
+        if algo_name is None:
+            return jsonify(error="Field 'algo' must be a string"), 400
         if algo_name not in ALGO_MAP:
             return jsonify(error=f"Unknown algorithm '{algo_name}'"), 400
-        if start not in graph:
-            return jsonify(error=f"Start node '{start}' not present in graph"), 400
-        if any(neigh not in graph for nbrs in graph.values() for neigh in nbrs):
-            return jsonify(error="Graph contains edges to undefined nodes"), 400
+        if graph_id is not None and not isinstance(graph_id, str):
+            return jsonify(error="Field 'graphId' must be a string"), 400
+        if graph_id is not None:
+            try:
+                session = store.get(graph_id)
+            except SessionNotFound:
+                return jsonify(error=f"Unknown graph '{graph_id}'"), 404
+            with session.lock:  # sessions are always consistent, only the query needs checking
+                error = _query_error(algo_name, session.adjacency, start, end, options)
+                if error:
+                    return jsonify(error=error), 400
+                if dynamic:
+                    if algo_name != "dijkstra":
+                        return jsonify(error="Field 'dynamic' only applies to 'dijkstra'"), 400
+                    try:
+                        result = session.dynamic_paths(start, end, data.get("baseVersion"))
+                    except ValueError as exc:
+                        return jsonify(error=str(exc)), 400
+                    return Response(dumps({"result": result}, fmt), mimetype=fmt)
+                csr, version = session.csr(), session.version
+        elif dynamic:
+            return jsonify(error="Field 'dynamic' needs a 'graphId'"), 400
+        elif path is not None and not uploaded:
+            timer.lap("validate")
+            csr, file_key, failure = open_graph_file(data)
+            if failure:
+                return failure
+            timer.lap("load")
+        elif not uploaded and (not graph or not isinstance(graph, dict)):
+            return jsonify(error="Fields 'graph' and 'start' are required"), 400
+        timer.lap("validate")
+
+        # ---- Cache lookup ----------------------------------------------
+        # cached runs use the canonical (sorted) node order, so a hit doesn't
+        # depend on how the client ordered its keys; node ids follow trace.nodes.
+        # Session runs are keyed by id and version, uploads by their bytes,
+        # graph files by path, size and mtime.
+        # A request that fails validation below never produced an entry, so
+        # looking up first is safe
+        key = None
+        if cache is not None and not stream:
+            encoding = None if fmt == JSON else fmt
+            if graph_id is not None:
+                key = run_key(["session", graph_id, version], start, end, algo_name, options, encoding)
+            elif file_key is not None:
+                key = run_key(["file", *file_key], start, end, algo_name, options, encoding)
+            elif uploaded:
+                digest = hashlib.blake2b(request.get_data(), digest_size=16).hexdigest()
+                key = run_key(["edges", digest], start, end, algo_name, options, encoding)
+            else:
+                try:
+                    graph = canonical_adjacency(graph)
+                except TypeError:
+                    return jsonify(error=GRAPH_SHAPE_ERROR), 400
+                key = run_key(graph, start, end, algo_name, options, encoding)
+            body = cache.get(key)
+            timer.lap("cache")
+            if body is not None:
+                return Response(body, mimetype=fmt, headers={"X-Cache": "hit"})
+
+        # intern names and check every edge's target in the same pass that
+        # packs the adjacency; the algorithms only see int ids
+        if csr is None:
+            try:
+                csr = _pack_graph(graph)
+            except ValueError as exc:
+                return jsonify(error=str(exc)), 400
+        if graph_id is None:
+            error = _query_error(algo_name, csr, start, end, options)
+            if error:
+                return jsonify(error=error), 400
+        timer.lap("validate")
 
         # ---- Run the algorithm ----------------------------------------
+        stats = {}  # compute / serialize seconds and operation counts of the run
         try:
-            result = ALGO_MAP[algo_name](graph, start)
-            return jsonify(result)
+            algo = ALGO_MAP[algo_name]
+            if stream:
+                # streams stay inline (they are paced by the client and end on
+                # disconnect) but get a deadline like any other run
+                header = {"format": TRACE_FORMAT, "algo": algo_name, "nodeCount": len(csr)}
+                steps = guarded(algo(csr, start, end, **options), time.time() + app.config["RUN_STREAM_TIMEOUT"])
+                body = _stream_run(steps, len(csr), header, app.logger,
+                                   lambda counts: metrics.count_run(algo_name, counts))
+                return Response(body, mimetype=NDJSON, headers={"X-Accel-Buffering": "no"})
+            timeout = app.config["RUN_TIMEOUT"]
+            if executor is not None and _run_size(algo_name, csr) > app.config["RUN_INLINE_MAX_SIZE"]:
+                body = executor.run(algo, csr, start, end, options, timeout, fmt, stats)
+            else:
+                body = run_inline(algo, csr, start, end, options, time.time() + timeout, fmt, stats)
+        except QueueFull:
+            return jsonify(error="Server busy, try again shortly"), 503, {"Retry-After": "1"}
+        except RunTimeout:
+            return jsonify(error=f"Run exceeded the {app.config['RUN_TIMEOUT']:g}s time limit"), 504
+        except MemoryError:
+            return jsonify(error="Run exceeded the memory limit"), 413
+        except ValueError as exc:              # rejected option values
+            return jsonify(error=str(exc)), 400
         except Exception as exc:
             app.logger.exception(exc)      # full stack-trace in the server log
             return jsonify(error="Internal server error"), 500
 
+        timer.add("compute", stats["compute"])
+        timer.add("serialize", stats["serialize"])
+        timer.lap("dispatch")  # the rest: pool queueing and the graph's trip to the worker
+        metrics.count_run(algo_name, stats["counts"])
+
+        headers = {}
+        if key is not None:
+            cache.put(key, body)
+            headers["X-Cache"] = "miss"
+        return Response(body, mimetype=fmt, headers=headers)
+
+    @app.post("/api/run/batch")
+    def run_batch():
+        """
+        Many ``{algo, start, end, options}`` queries against one graph: the
+        graph is validated and packed once.  Results come back in query order
+        as ``{"results": [...]}``, each ``{"result": ...}`` (plus ``trace``
+        when ``"trace": true``) or ``{"error": ...}``.  With ``stream`` they
+        are NDJSON ``result`` lines carrying their ``index``, in completion
+        order.  Bodies, responses and ``path`` work like /api/run.
+        """
+        try:
+            data, csr = _read_run_request()
+        except UnsupportedFormat as exc:
+            return jsonify(error=str(exc)), 415
+        except ValueError as exc:
+            return jsonify(error=str(exc)), 400
+        graph = data.get("graph")
+        graph_id = data.get("graphId")
+        path = data.get("path")
+        queries = data.get("queries")
+        default_algo = _algo_name(data.get("algo"))
+        with_trace = bool(data.get("trace"))
+        stream = bool(data.get("stream")) or request.accept_mimetypes.best == NDJSON
+
+        # ---- Validation ------------------------------------------------
+        if not (graph or graph_id is not None or path is not None or csr is not None) \
+                or not isinstance(queries, list) or not queries:
+            return jsonify(error="Fields 'graph' and 'queries' are required"), 400
+        if default_algo is None:
+            return jsonify(error="Field 'algo' must be a string"), 400
+        if len(queries) > app.config["RUN_BATCH_MAX_QUERIES"]:
+            return jsonify(error=f"At most {app.config['RUN_BATCH_MAX_QUERIES']} queries per batch"), 400
+        if graph_id is not None and not isinstance(graph_id, str):
+            return jsonify(error="Field 'graphId' must be a string"), 400
+        if graph_id is not None:
+            try:
+                session = store.get(graph_id)
+            except SessionNotFound:
+                return jsonify(error=f"Unknown graph '{graph_id}'"), 404
+            with session.lock:
+                error, parsed = _parse_queries(queries, default_algo, session.adjacency)
+                csr = session.csr()
+        else:
+            if csr is None and path is not None:
+                csr, _, failure = open_graph_file(data)
+                if failure:
+                    return failure
+            elif csr is None:
+                try:
+                    csr = _pack_graph(graph)
+                except ValueError as exc:
+                    return jsonify(error=str(exc)), 400
+            error, parsed = _parse_queries(queries, default_algo, csr)
+        if error:
+            return jsonify(error=error), 400
+
+        # ---- Run the queries --------------------------------------------
+        work = [(ALGO_MAP[a], start, end, options, with_trace) for a, start, end, options in parsed]
+        timeout = app.config["RUN_BATCH_TIMEOUT"]
+        try:
+            size = sum(_run_size(a, csr) for a, *_ in parsed)
+            if executor is not None and size > app.config["RUN_INLINE_MAX_SIZE"]:
+                entries = executor.run_batch(csr, work, timeout)
+            else:
+                entries = run_batch_inline(csr, work, time.time() + timeout)
+            if stream:
+                header = {"format": TRACE_FORMAT, "count": len(work), "nodeCount": len(csr)}
+                return Response(_stream_batch(entries, header, app.logger),
+                                mimetype=NDJSON, headers={"X-Accel-Buffering": "no"})
+            results = [None] * len(work)
+            for i, entry in entries:
+                results[i] = entry
+        except QueueFull:
+            return jsonify(error="Server busy, try again shortly"), 503, {"Retry-After": "1"}
+        except RunTimeout:
+            return jsonify(error=f"Batch exceeded the {timeout:g}s time limit"), 504
+        except MemoryError:
+            return jsonify(error="Run exceeded the memory limit"), 413
+        except Exception as exc:
+            app.logger.exception(exc)
+            return jsonify(error="Internal server error"), 500
+        fmt = _response_type()
+        return Response(dumps({"results": results}, fmt), mimetype=fmt)
+
+    # ── Node server compatibility ────────────────────────────────────
+    @app.get("/health")
+    def health():
+        now = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        return jsonify(status="OK", timestamp=now.replace("+00:00", "Z"))
+
+    @app.post("/api/algorithms/<name>")
+    def node_algorithm(name: str):
+        """
+        server.js' API: ``{nodes, edges, startId, endId, directed}`` in,
+        ``{"success": true, "result": {...}}`` with its result fields out,
+        or ``{"success": false, "error"}`` with a 400.  Runs inline under
+        RUN_TIMEOUT; no trace and no cache, the frontend only wants results.
+        """
+        if name not in NODE_ALGOS:
+            return jsonify(success=False, error=f"Unknown algorithm '{name}'"), 404
+        algo_name, forced, fields = NODE_ALGOS[name]
+        data = request.get_json(silent=True) or {}
+        directed = bool(data.get("directed")) if forced is None else forced
+        start, end = data.get("startId"), data.get("endId")
+        algo = ALGO_MAP[algo_name]
+
+        try:
+            graph = _node_graph(data.get("nodes"), data.get("edges"), directed)
+        except ValueError as exc:
+            return jsonify(success=False, error=str(exc)), 400
+        if start is None and _needs_start(algo):
+            return jsonify(success=False, error="Field 'startId' is required"), 400
+        for field, node in (("startId", start), ("endId", end)):
+            if node is not None and not _is_node_id(node):
+                return jsonify(success=False, error=f"{field} must be a string or number"), 400
+            if node is not None and node not in graph:
+                return jsonify(success=False, error=f"{field} {node!r} not present in graph"), 400
+        if algo_name == "dijkstra" and _has_negative_weight(graph):
+            return jsonify(success=False, error=NEGATIVE_DIJKSTRA), 400
+
+        timeout = app.config["RUN_TIMEOUT"]
+        try:
+            csr = CSRGraph.from_adjacency(graph)
+            query = (algo, start, end if "path" in fields else None, {}, False)
+            [(_, entry)] = run_batch_inline(csr, [query], time.time() + timeout)
+        except RunTimeout:
+            return jsonify(success=False, error=f"Run exceeded the {timeout:g}s time limit"), 504
+        except MemoryError:
+            return jsonify(success=False, error="Run exceeded the memory limit"), 413
+        except Exception as exc:
+            app.logger.exception(exc)
+            return jsonify(success=False, error="Internal server error"), 500
+        error = entry.get("error") or _node_error(entry["result"])
+        if error:
+            return jsonify(success=False, error=error), 400
+        result = {field: entry["result"][field] for field in fields}
+        # dumps rather than jsonify, whose key sorting fails on mixed int / str ids
+        return Response(dumps({"success": True, "result": result}), mimetype=JSON)
+
+    @app.post("/api/graph/generate")
+    def generate_graph():
+        """
+        Synthetic graph from ``{model, nodeCount, edgeCount, maxWeight,
+        directed, seed, exponent}`` (see generators.py); the defaults match
+        server.js.  ``format`` picks server.js' ``{nodes, edges}``
+        ("frontend"), an /api/run ``graph`` plus ``positions``
+        ("adjacency") or id-indexed column lists ("columns").  The ``seed``
+        used comes back with the graph, so any run can be reproduced.
+        ``stream`` sends NDJSON column chunks instead.
+        """
+        data = request.get_json(silent=True) or {}
+        model = data.get("model") or "erdos-renyi"
+        fmt = data.get("format") or "frontend"
+        stream = bool(data.get("stream")) or request.accept_mimetypes.best == NDJSON
+        try:
+            n = _int_field(data, "nodeCount", 8)
+            m = _int_field(data, "edgeCount", None if model == "grid" else 12)
+            max_weight = _int_field(data, "maxWeight", 10)
+            seed = _int_field(data, "seed", None)
+            exponent = data.get("exponent", 2.5)
+            if fmt not in GENERATE_FORMATS:
+                raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(GENERATE_FORMATS)}")
+            if isinstance(exponent, bool) or not isinstance(exponent, (int, float)):
+                raise ValueError("Field 'exponent' must be a number")
+            if n is None:
+                raise ValueError("Field 'nodeCount' must be an integer")
+            if n > app.config["GENERATE_MAX_NODES"]:
+                raise ValueError(f"Field 'nodeCount' must be at most {app.config['GENERATE_MAX_NODES']}")
+            if m is not None and m > app.config["GENERATE_MAX_EDGES"]:
+                raise ValueError(f"Field 'edgeCount' must be at most {app.config['GENERATE_MAX_EDGES']}")
+            if seed is None:
+                seed = secrets.randbits(32)
+            generated = generate(model, n, m, bool(data.get("directed")), max_weight, seed, exponent)
+        except ValueError as exc:
+            return jsonify(success=False, error=str(exc)), 400
+
+        names = node_names(len(generated))
+        header = {"model": model, "seed": seed, "directed": generated.directed,
+                  "nodeCount": len(generated), "edgeCount": generated.num_edges}
+        if stream:
+            return Response(_stream_generated(generated, names, header),
+                            mimetype=NDJSON, headers={"X-Accel-Buffering": "no"})
+        graph = getattr(generated, fmt)(names)
+        return Response(dumps({"success": True, **header, "graph": graph}), mimetype=JSON)
+
+    def run_analysis(csr: CSRGraph, start) -> dict:
+        """One untraced ``analyze`` run; big graphs go to the pool like /api/run."""
+        query = (analyze, start, None, {}, False)
+        timeout = app.config["RUN_TIMEOUT"]
+        if executor is not None and _run_size("analysis", csr) > app.config["RUN_INLINE_MAX_SIZE"]:
+            entries = executor.run_batch(csr, [query], timeout)
+        else:
+            entries = run_batch_inline(csr, [query], time.time() + timeout)
+        [(_, entry)] = entries
+        return entry["result"]
+
+    @app.post("/api/graph/analyze")
+    def analyze_graph():
+        """
+        Components, reachability and degree histograms of ``graph`` (or the
+        session ``graphId``, or the graph file ``path``) in one O(V + E)
+        sweep; see analysis.py.  Unlike
+        /api/run, edges to undefined nodes are reported rather than refused:
+        they are listed in ``undefinedTargets`` and treated as sinks.
+        """
+        data = request.get_json(silent=True) or {}
+        graph = data.get("graph")
+        graph_id = data.get("graphId")
+        start = data.get("start")
+        if graph_id is not None and not isinstance(graph_id, str):
+            return jsonify(error="Field 'graphId' must be a string"), 400
+        if graph_id is not None:
+            try:
+                session = store.get(graph_id)
+            except SessionNotFound:
+                return jsonify(error=f"Unknown graph '{graph_id}'"), 404
+            with session.lock:
+                csr = session.csr()
+            undefined = []
+        elif data.get("path") is not None:
+            csr, _, failure = open_graph_file(data)
+            if failure:
+                return failure
+            undefined = []
+        elif isinstance(graph, dict) and all(isinstance(n, (dict, list)) for n in graph.values()):
+            try:
+                csr = CSRGraph.from_adjacency(graph)
+            except (TypeError, OverflowError):  # e.g. a string weight, as in _pack_graph
+                return jsonify(error=GRAPH_SHAPE_ERROR), 400
+            undefined = csr.names[len(graph):]  # sink targets are interned after the keys
+        else:
+            return jsonify(error="Field 'graph' must be an adjacency object"), 400
+        if start is not None and not isinstance(start, str):
+            return jsonify(error="Field 'start' must be a node name"), 400
+        if start is not None and start not in csr:
+            return jsonify(error=f"Start node '{start}' not present in graph"), 400
+
+        try:
+            result = run_analysis(csr, start)
+        except QueueFull:
+            return jsonify(error="Server busy, try again shortly"), 503, {"Retry-After": "1"}
+        except RunTimeout:
+            return jsonify(error=f"Run exceeded the {app.config['RUN_TIMEOUT']:g}s time limit"), 504
+        except MemoryError:
+            return jsonify(error="Run exceeded the memory limit"), 413
+        except Exception as exc:
+            app.logger.exception(exc)
+            return jsonify(error="Internal server error"), 500
+        result["undefinedTargets"] = undefined
+        return Response(dumps({"result": result}), mimetype=JSON)
+
+    @app.post("/api/graph/layout")
+    def layout_graph():
+        """
+        Force-directed positions (see layout.py) for ``graph``, the session
+        ``graphId``, the graph file ``path`` or an edge-list upload:
+        ``{nodeCount, positions: {name: [x, y]}}``, fitted into ``box``
+        ``[x, y, width, height]`` (default: the generators' box).  Given
+        ``positions``, the drawing is refined from there; ``iterations``
+        and ``seed`` as in ``force_layout``.
+        """
+        timer = g.timer
+        try:
+            data, csr = _read_run_request()
+        except UnsupportedFormat as exc:
+            return jsonify(error=str(exc)), 415
+        except ValueError as exc:
+            return jsonify(error=str(exc)), 400
+        timer.lap("parse")
+        graph = data.get("graph")
+        graph_id = data.get("graphId")
+        box = data.get("box", BOX)
+        try:
+            iterations = _int_field(data, "iterations", ITERATIONS)
+            seed = _int_field(data, "seed", 0)
+            if iterations is None or not 0 <= iterations <= app.config["LAYOUT_MAX_ITERATIONS"]:
+                raise ValueError(f"Field 'iterations' must be 0 to {app.config['LAYOUT_MAX_ITERATIONS']}")
+            if seed is None or seed < 0:
+                raise ValueError("Field 'seed' must be a non-negative integer")
+            if (not isinstance(box, (list, tuple)) or len(box) != 4
+                    or not all(isinstance(b, (int, float)) and not isinstance(b, bool) and math.isfinite(b)
+                               for b in box)
+                    or box[2] <= 0 or box[3] <= 0):
+                raise ValueError("Field 'box' must be [x, y, width, height] with a positive size")
+        except ValueError as exc:
+            return jsonify(error=str(exc)), 400
+        if graph_id is not None and not isinstance(graph_id, str):
+            return jsonify(error="Field 'graphId' must be a string"), 400
+
+        if csr is not None:
+            pass                               # an edge list, already packed
+        elif graph_id is not None:
+            try:
+                session = store.get(graph_id)
+            except SessionNotFound:
+                return jsonify(error=f"Unknown graph '{graph_id}'"), 404
+            with session.lock:
+                csr = session.csr()
+        elif data.get("path") is not None:
+            timer.lap("validate")
+            csr, _, failure = open_graph_file(data)
+            if failure:
+                return failure
+            timer.lap("load")
+        else:
+            try:
+                csr = _pack_graph(graph)
+            except ValueError as exc:
+                return jsonify(error=str(exc)), 400
+        if len(csr) > app.config["LAYOUT_MAX_NODES"]:
+            return jsonify(error=f"Layouts are limited to {app.config['LAYOUT_MAX_NODES']} nodes"), 413
+        timer.lap("validate")
+
+        try:
+            x, y = force_layout(csr, data.get("positions"), iterations, seed, tuple(box))
+        except ValueError as exc:              # bad positions
+            return jsonify(error=str(exc)), 400
+        except MemoryError:
+            return jsonify(error="Layout exceeded the memory limit"), 413
+        except Exception as exc:
+            app.logger.exception(exc)
+            return jsonify(error="Internal server error"), 500
+        timer.lap("compute")
+        positions = dict(zip(csr.names, zip(x.round(2).tolist(), y.round(2).tolist())))
+        fmt = _response_type()
+        body = dumps({"nodeCount": len(csr), "positions": positions}, fmt)
+        timer.lap("serialize")
+        return Response(body, mimetype=fmt)
+
+    @app.post("/api/graph/validate")
+    def validate_graph():
+        """
+        server.js' ``{nodes, edges, directed}`` -> ``{success, validation}``,
+        with ``componentCount`` now always the number of weakly connected
+        components (server.js answered "Multiple components detected").
+        """
+        data = request.get_json(silent=True) or {}
+        directed = bool(data.get("directed"))
+        try:
+            graph = _node_graph(data.get("nodes"), data.get("edges"), directed)
+        except ValueError as exc:
+            return jsonify(success=False, error=str(exc)), 400
+        if not graph:
+            return jsonify(success=True, validation={
+                "isEmpty": True, "isConnected": False, "componentCount": 0, "strongComponentCount": 0,
+            })
+        # inline like the other server.js routes: the pool's transport wants string names
+        timeout = app.config["RUN_TIMEOUT"]
+        query = (analyze, None, None, {}, False)
+        try:
+            [(_, entry)] = run_batch_inline(CSRGraph.from_adjacency(graph), [query], time.time() + timeout)
+        except RunTimeout:
+            return jsonify(success=False, error=f"Run exceeded the {timeout:g}s time limit"), 504
+        except Exception as exc:
+            app.logger.exception(exc)
+            return jsonify(success=False, error="Internal server error"), 500
+        result = entry["result"]
+        return jsonify(success=True, validation={
+            "isEmpty": False,
+            "isConnected": result["weak"]["count"] == 1,
+            "componentCount": result["weak"]["count"],
+            "strongComponentCount": result["strong"]["count"],
+        })
+
+    # ── Graph sessions ───────────────────────────────────────────────
+    @app.post("/api/graphs")
+    def create_graph():
+        """Upload a graph once; edit it with PATCH and run it via ``graphId``."""
+        data = request.get_json(silent=True) or {}
+        graph = data.get("graph")
+        if not isinstance(graph, dict) or not all(isinstance(n, (dict, list)) for n in graph.values()):
+            return jsonify(error="Field 'graph' must be an adjacency object"), 400
+        for nbrs in graph.values():
+            if isinstance(nbrs, dict):
+                if not all(map(is_weight, nbrs.values())):
+                    return jsonify(error="Edge weights must be finite numbers"), 400
+            elif not all(isinstance(v, str) for v in nbrs):
+                return jsonify(error="Neighbour lists must hold node names"), 400
+        if _has_undefined_targets(graph):
+            return jsonify(error="Graph contains edges to undefined nodes"), 400
+        graph = {u: nbrs if isinstance(nbrs, dict) else dict.fromkeys(nbrs, 1) for u, nbrs in graph.items()}
+        session = store.create(graph)
+        return jsonify(session.summary()), 201, {"Location": f"/api/graphs/{session.id}"}
+
+    @app.get("/api/graphs/<graph_id>")
+    def get_graph(graph_id: str):
+        try:
+            session = store.get(graph_id)
+        except SessionNotFound:
+            return jsonify(error=f"Unknown graph '{graph_id}'"), 404
+        with session.lock:
+            return jsonify(**session.summary(), graph=session.adjacency)
+
+    @app.patch("/api/graphs/<graph_id>")
+    def patch_graph(graph_id: str):
+        """
+        Apply ``{"ops": [...]}`` atomically, e.g. ``{"op": "add_edge", "from":
+        "A", "to": "B", "weight": 4}`` (add_node / remove_node take
+        ``node``).  Pass the ``version`` the edits were made against to get
+        a 409 instead of overwriting someone else's changes.
+        """
+        data = request.get_json(silent=True) or {}
+        ops = data.get("ops")
+        expected = data.get("version")
+        if not isinstance(ops, list):
+            return jsonify(error="Field 'ops' must be a list"), 400
+        try:
+            session = store.get(graph_id)
+        except SessionNotFound:
+            return jsonify(error=f"Unknown graph '{graph_id}'"), 404
+        with session.lock:
+            if expected is not None and expected != session.version:
+                return jsonify(error=f"Graph is at version {session.version}, not {expected}",
+                               version=session.version), 409
+            try:
+                changes = session.apply(ops)
+            except BadOperation as exc:
+                return jsonify(error=str(exc)), 400
+            return jsonify(**session.summary(), changed=len(changes))
+
+    @app.delete("/api/graphs/<graph_id>")
+    def delete_graph(graph_id: str):
+        try:
+            store.delete(graph_id)
+        except SessionNotFound:
+            return jsonify(error=f"Unknown graph '{graph_id}'"), 404
+        return "", 204
+
+    @app.get("/metrics")
+    def prometheus_metrics():
+        """Request latency / size histograms and algorithm counters, Prometheus text format."""
+        return Response(metrics.render(), content_type=PROMETHEUS_TEXT)
+
+    @app.get("/api/cache/stats")
+    def cache_stats():
+        return jsonify(cache.stats() if cache is not None else {"enabled": False})
+
     # ── Single-Page-App fall-through routes ──────────────────────────
     @app.route("/")
     def index():
@@ -80,4 +1072,4 @@ def create_app() -> Flask:
 
 # ── CLI convenience ─────────────────────────────────────────────────
 if __name__ == "__main__":
-    create_app().run(debug=True)
+    create_app().run(debug=True, port=int(os.environ.get("PORT", 5000)))
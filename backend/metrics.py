@@ -0,0 +1,224 @@
+"""
+backend/metrics.py
+Request instrumentation: phase timers, Prometheus metrics and a sampling profiler.
+
+    PhaseTimer        per-request phase durations (parse, validate, compute,
+                      ...), sent back as a ``Server-Timing`` header
+    Metrics           request latency / size histograms and per-algorithm
+                      operation counters, rendered in the Prometheus text
+                      format for ``/metrics``
+    SamplingProfiler  samples the stacks of in-flight request threads; the
+                      samples of a request are kept only if it turned out slow
+
+Everything is in-process and thread-safe; with several server processes
+each one serves its own ``/metrics`` (sum them in the queries).
+"""
+from __future__ import annotations
+
+import bisect
+import sys
+import threading
+import time
+from collections import Counter
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(256 * 4 ** k for k in range(11))  # 256 B .. 256 MiB
+PROMETHEUS_TEXT = "text/plain; version=0.0.4; charset=utf-8"
+PROFILE_INTERVAL = 0.005    # seconds between stack samples
+PROFILE_MAX_DEPTH = 64      # innermost frames kept per sample
+
+
+class PhaseTimer:
+    """
+    Time spent per phase of one request.  ``lap(name)`` charges the time
+    since the previous lap (or the start) to ``name``.  ``add`` charges
+    time measured elsewhere during the current lap, e.g. by a pool worker,
+    and the lap then only gets the rest, so the phases add up to the
+    wall-clock time.  Repeated phases accumulate.
+    """
+
+    __slots__ = ("started", "_last", "_added", "phases")
+
+    def __init__(self):
+        self.started = self._last = time.perf_counter()
+        self._added = 0.0
+        self.phases: dict = {}
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self._charge(name, max(0.0, now - self._last - self._added))
+        self._last, self._added = now, 0.0
+
+    def add(self, name: str, seconds: float) -> None:
+        self._charge(name, seconds)
+        self._added += seconds
+
+    def _charge(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def header(self, total: float) -> str:
+        """``Server-Timing`` value: every phase plus ``total``, in milliseconds."""
+        parts = [f"{name};dur={seconds * 1e3:.2f}" for name, seconds in self.phases.items()]
+        parts.append(f"total;dur={total * 1e3:.2f}")
+        return ", ".join(parts)
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n") for v in values)
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(names, escaped)) + "}"
+
+
+class _Histogram:
+    """Cumulative-bucket histogram per label set, as Prometheus expects."""
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self.series: dict = {}  # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, values: tuple, amount: float) -> None:
+        series = self.series.get(values)
+        if series is None:
+            series = self.series[values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, amount)] += 1
+        series[-1] += amount
+
+    def render(self, lines: list) -> None:
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} histogram")
+        for values, series in sorted(self.series.items()):
+            running = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                running += count
+                le = str(bound)
+                lines.append(f"{self.name}_bucket{_labels((*self.labels, 'le'), (*values, le))} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {running}")
+
+
+class _Counter:
+    def __init__(self, name: str, help: str, labels: tuple):
+        self.name, self.help, self.labels = name, help, labels
+        self.series: dict = {}  # label values -> total
+
+    def inc(self, values: tuple, amount: float = 1) -> None:
+        self.series[values] = self.series.get(values, 0) + amount
+
+    def render(self, lines: list) -> None:
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} counter")
+        for values, total in sorted(self.series.items()):
+            lines.append(f"{self.name}{_labels(self.labels, values)} {total}")
+
+
+class Metrics:
+    """The server's metrics; one instance per app, updated from request threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = _Histogram("algovis_request_duration_seconds",
+                                  "Time to the response headers (streams keep running after).",
+                                  ("endpoint", "method"), LATENCY_BUCKETS)
+        self.size = _Histogram("algovis_request_size_bytes", "Request body size.",
+                               ("endpoint", "method"), SIZE_BUCKETS)
+        self.requests = _Counter("algovis_requests_total", "Requests by response status.",
+                                 ("endpoint", "method", "status"))
+        self.phases = _Counter("algovis_phase_seconds_total", "Time spent per request phase.",
+                               ("endpoint", "phase"))
+        self.runs = _Counter("algovis_algorithm_runs_total", "Algorithm runs that produced a result.",
+                             ("algo",))
+        self.operations = _Counter("algovis_algorithm_operations_total",
+                                   "Operations counted from the runs' steps (see trace.OP_COUNTERS).",
+                                   ("algo", "op"))
+        self.slow = _Counter("algovis_slow_requests_profiled_total",
+                             "Requests over the profiling threshold.", ("endpoint",))
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float,
+                        size: int, phases: dict) -> None:
+        key = (endpoint, method)
+        with self._lock:
+            self.latency.observe(key, seconds)
+            self.size.observe(key, size)
+            self.requests.inc((endpoint, method, str(status)))
+            for phase, spent in phases.items():
+                self.phases.inc((endpoint, phase), spent)
+
+    def count_run(self, algo: str, counts: dict) -> None:
+        with self._lock:
+            self.runs.inc((algo,))
+            for op, amount in counts.items():
+                self.operations.inc((algo, op), amount)
+
+    def count_slow(self, endpoint: str) -> None:
+        with self._lock:
+            self.slow.inc((endpoint,))
+
+    def render(self) -> str:
+        lines: list = []
+        with self._lock:
+            for metric in (self.latency, self.size, self.requests, self.phases,
+                           self.runs, self.operations, self.slow):
+                metric.render(lines)
+        return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for request threads.  ``begin()`` registers the
+    calling thread and ``end()`` returns its samples as collapsed stacks
+    (``{"outer;...;inner": count}``, the flame-graph input format).  One
+    daemon thread samples every registered thread each ``interval`` and
+    sleeps while no request is in flight.  Work done in pool workers shows
+    up as the request thread waiting on its future.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self._active: dict = {}   # thread id -> Counter of stacks
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def begin(self) -> None:
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="algovis-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def end(self) -> Counter:
+        with self._lock:
+            return self._active.pop(threading.get_ident(), Counter())
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                if not self._active:
+                    self._wake.clear()
+                    continue
+                for ident, samples in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        samples[_collapse(frame)] += 1
+
+
+def _collapse(frame) -> str:
+    stack = []
+    while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+def format_profile(samples: Counter, top: int = 0) -> str:
+    """Collapsed stacks, one ``stack count`` line each, most sampled first."""
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common(top or None))
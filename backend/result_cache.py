@@ -0,0 +1,177 @@
+"""
+backend/result_cache.py
+LRU cache of serialized /api/run responses.
+
+Keys are a hash of the run's canonical form -- node keys and neighbour
+lists sorted -- so the same graph posted in a different order hits the same
+entry.  Values are the encoded JSON body, so a hit skips both the algorithm
+and the serializer.  An optional directory tier keeps entries across
+restarts: one file per key (no suffix, since bodies may be JSON or
+msgpack), trimmed least recently used first against a byte total kept in
+memory.  Disk errors only cost the disk tier, never a response.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+
+def canonical_adjacency(graph: Mapping) -> dict:
+    """
+    Same graph, with node keys and each neighbour list in sorted order.
+    Raises TypeError for neighbours that are neither a mapping nor a list.
+    """
+    return {u: _canonical_neighbours(nbrs) for u, nbrs in sorted(graph.items())}
+
+
+def _canonical_neighbours(nbrs):
+    if isinstance(nbrs, Mapping):
+        return dict(sorted(nbrs.items()))
+    if isinstance(nbrs, (list, tuple)):
+        return sorted(nbrs)
+    raise TypeError("Neighbours must be a mapping or a list")  # sorted("BC") would pass
+
+
+def run_key(graph: Mapping, start, end, algo: str, options: Mapping, encoding: str | None = None) -> str:
+    """Hash of a run; ``graph`` must already be canonical.  ``encoding`` names a non-JSON body."""
+    parts = [graph, start, end, algo, options] + ([encoding] if encoding else [])
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(blob.encode(), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """Thread-safe, byte-bounded LRU of ``key -> bytes`` with an optional disk tier."""
+
+    def __init__(self, max_bytes: int, directory: str | None = None, max_disk_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes   # 0 = unbounded
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._dir = pathlib.Path(directory) if directory else None
+        self._disk: OrderedDict[str, int] = OrderedDict()  # key -> file size, least recent first
+        self._disk_size = 0
+        self._disk_lock = threading.Lock()
+        if self._dir:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            self._scan_disk()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+        body = self._read_disk(key)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._insert(key, body)
+        return body
+
+    def put(self, key: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return  # would evict everything else and still not fit
+        with self._lock:
+            self._insert(key, body)
+        self._write_disk(key, body)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk": str(self._dir) if self._dir else None,
+            }
+
+    # ── internals ───────────────────────────────────────────────────────
+    def _insert(self, key: str, body: bytes) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = body
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self._dir / key
+
+    def _scan_disk(self) -> None:
+        """Index the entries a previous run left behind, oldest first."""
+        found = []
+        for path in self._dir.iterdir():
+            if path.suffix:  # temp files (and anything else that isn't an entry)
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            found.append((st.st_mtime, path.name, st.st_size))
+        for _, key, size in sorted(found):
+            self._disk[key] = size
+            self._disk_size += size
+
+    def _read_disk(self, key: str) -> bytes | None:
+        if not self._dir:
+            return None
+        path = self._path(key)
+        try:
+            body = path.read_bytes()
+            os.utime(path)  # keep mtime order in line with use for the next scan
+        except OSError:
+            return None
+        with self._disk_lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+        return body
+
+    def _write_disk(self, key: str, body: bytes) -> None:
+        if not self._dir:
+            return
+        # write-then-rename so a crash never leaves a truncated entry behind
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp, self._path(key))
+        except OSError:  # full or read-only disk: keep serving from memory
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+            return
+        with self._disk_lock:
+            self._disk_size += len(body) - self._disk.pop(key, 0)
+            self._disk[key] = len(body)
+            if self.max_disk_bytes:
+                self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        """Drop least recently used files until under ``max_disk_bytes``; call with ``_disk_lock`` held."""
+        while self._disk_size > self.max_disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            try:
+                self._path(key).unlink(missing_ok=True)
+            except OSError:
+                pass